@@ -1,3 +1,9 @@
 from django.contrib import admin
 
-# Register your models here.
+from api.models import ApiToken
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    list_display = ('id', '__str__', 'create_date')
+    readonly_fields = ('key_hash',)
@@ -0,0 +1,49 @@
+import base64
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+
+from api.models import ApiToken
+from api.views import GetTags
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает пропускную способность API с Basic-авторизацией и с токеном'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Количество запросов в каждом прогоне')
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        username, password = f'bench_api_auth_{time.time_ns()}', 'bench-password'
+        user = User.objects.create_user(username=username, password=password)
+        try:
+            key, _ = ApiToken.issue(user)
+            basic = base64.b64encode(f'{username}:{password}'.encode()).decode()
+            results = [
+                ('Basic', self._run(f'Basic {basic}', count)),
+                ('Token', self._run(f'Token {key}', count)),
+            ]
+        finally:
+            user.delete()
+
+        for name, elapsed in results:
+            self.stdout.write(f'{name}: {elapsed / count * 1000:.2f} мс на запрос, {count / elapsed:.0f} запросов/с')
+        (_, basic_time), (_, token_time) = results
+        self.stdout.write(self.style.SUCCESS(f'Ускорение: {basic_time / token_time:.1f}x'))
+
+    @staticmethod
+    def _run(authorization, count):
+        factory = APIRequestFactory()
+        view = GetTags.as_view({'get': 'list'})
+        url = reverse('api:tags')
+        started = time.perf_counter()
+        for _ in range(count):
+            response = view(factory.get(url, HTTP_AUTHORIZATION=authorization))
+            response.render()
+            if response.status_code != 200:
+                raise RuntimeError(f'{authorization.split()[0]}: ответ {response.status_code}')
+        return time.perf_counter() - started
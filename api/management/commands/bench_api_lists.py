@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.serializers import QuestionSerializer, AnswerSerializer, QuestionRowSerializer, AnswerRowSerializer
+from questions.models import Questions, Answers
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает сериализацию страниц списков API по строкам .values() и через модели'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100, help='Количество вопросов и ответов на странице')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество прогонов, берется лучший')
+
+    def handle(self, *args, **options):
+        size, repeat = options['size'], options['repeat']
+        # без request аватарки отдаются относительными адресами, ALLOWED_HOSTS не нужен
+        context = {}
+        questions = Questions.objects.order_by('create_date')[:size]
+        answers = Answers.objects.order_by('create_date')[:size]
+        if not questions.exists():
+            self.stdout.write(self.style.WARNING('В базе нет вопросов'))
+            return
+        results = [
+            ('Модели', self._best(repeat, lambda: (
+                QuestionSerializer(list(questions.with_author_and_tags()), many=True, context=context).data,
+                AnswerSerializer(list(answers.select_related('author__userprofile')), many=True, context=context).data,
+            ))),
+            ('.values()', self._best(repeat, lambda: (
+                QuestionRowSerializer(questions.values(*QuestionRowSerializer.values()), context).data,
+                AnswerRowSerializer(answers.values(*AnswerRowSerializer.values()), context).data,
+            ))),
+        ]
+        for name, elapsed in results:
+            self.stdout.write(f'{name}: {elapsed * 1000:.1f} мс на страницу')
+        (_, slow), (_, fast) = results
+        self.stdout.write(self.style.SUCCESS(f'Ускорение: {slow / fast:.1f}x'))
+
+    @staticmethod
+    def _best(repeat, serialize):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -1,3 +1,36 @@
+import hashlib
+import secrets
+
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+
+class ApiToken(models.Model):
+    """
+    Токен доступа к API. Хранится только SHA-256 токена: сам токен случайный и длинный,
+    поэтому медленный хэш вроде PBKDF2 не нужен, а поиск идет по уникальному индексу
+    """
+
+    class Meta:
+        verbose_name = 'API token'
+        verbose_name_plural = 'API tokens'
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+    )
+    key_hash = models.CharField(max_length=64, unique=True)
+    create_date = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'API token of {self.user.username}'
+
+    @staticmethod
+    def hash_key(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def issue(cls, user):
+        """Создает токен пользователя, возвращает (токен, запись); токен больше нигде не сохраняется"""
+        key = secrets.token_urlsafe(32)
+        return key, cls.objects.create(user=user, key_hash=cls.hash_key(key))
@@ -1,6 +1,33 @@
+from collections import defaultdict
+
 from rest_framework import serializers
 
-from questions.models import Questions, Answers
+from questions.models import Questions, Answers, TagStats
+from registration.models import UserProfile
+from registration.thumbnails import thumbnail_urls
+
+
+def avatar_url(photo, thumbnail, request=None):
+    """Адрес уменьшенной копии аватарки (JPEG 75x75), пока ее нет - исходного файла; photo и thumbnail - имена"""
+    if not photo:
+        return None
+    url = thumbnail_urls(thumbnail)['jpeg'] if thumbnail else UserProfile._meta.get_field('photo').storage.url(photo)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+class AvatarField(serializers.Field):
+    """Аватарка автора"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'author')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, author):
+        profile = getattr(author, 'userprofile', None)
+        if profile is None:
+            return None
+        return avatar_url(profile.photo.name, profile.thumbnail, self.context.get('request'))
 
 
 class QuestionSerializer(serializers.HyperlinkedModelSerializer):
@@ -10,6 +37,7 @@ class QuestionSerializer(serializers.HyperlinkedModelSerializer):
         read_only=True,
         slug_field='username'
     )
+    author_avatar = AvatarField()
     tags = serializers.SlugRelatedField(
         many=True,
         read_only=True,
@@ -18,7 +46,7 @@ class QuestionSerializer(serializers.HyperlinkedModelSerializer):
 
     class Meta:
         model = Questions
-        fields = ['title', 'body', 'create_date', 'author', 'tags']
+        fields = ['title', 'body', 'create_date', 'author', 'author_avatar', 'tags']
 
 
 class TrendsSerializer(serializers.Serializer):
@@ -34,7 +62,131 @@ class AnswerSerializer(serializers.HyperlinkedModelSerializer):
         read_only=True,
         slug_field='username'
     )
+    author_avatar = AvatarField()
 
     class Meta:
         model = Answers
-        fields = ['body', 'author', 'create_date', 'correct']
+        fields = ['body', 'author', 'author_avatar', 'create_date', 'correct']
+
+
+class TagStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор статистики тегов"""
+
+    class Meta:
+        model = TagStats
+        fields = ['name', 'question_count', 'vote_count', 'last_activity']
+
+
+class RowListSerializer:
+    """
+    Быстрая сериализация страниц списков по строкам .values(): автор и его профиль приходят
+    JOIN в той же выборке, модели и поля DRF на каждую строку не создаются.
+    Без fields и include вывод совпадает с выводом обычного сериализатора с many=True.
+    fields - поля вывода (по умолчанию все из columns), выбираются только нужные для них колонки;
+    include - дополнительные данные: 'vote_counts' (поля из vote_columns) и вложения подклассов
+    """
+    # поле вывода -> колонки .values(), из которых оно строится
+    columns = {}
+    # счетчики голосов для include=vote_counts
+    vote_columns = ()
+    # выбираются всегда: id для вложений, create_date для курсоров keyset-пагинации
+    key_columns = ('id', 'create_date')
+    includes = ('vote_counts',)
+
+    def __init__(self, rows, context=None, fields=None, include=()):
+        self.rows = list(rows)
+        self.context = context or {}
+        self.include = include
+        self.fields = [name for name in self.columns if fields is None or name in fields]
+        if 'vote_counts' in include:
+            self.fields += self.vote_columns
+        self.date_field = serializers.DateTimeField()
+        self.getters = [(name, getattr(self, f'get_{name}', None)) for name in self.fields]
+
+    @classmethod
+    def values(cls, fields=None, include=()):
+        """Колонки .values() для полей fields и вложений include"""
+        columns = dict.fromkeys(cls.key_columns)
+        for name, field_columns in cls.columns.items():
+            if fields is None or name in fields:
+                columns.update(dict.fromkeys(field_columns))
+        if 'vote_counts' in include:
+            columns.update(dict.fromkeys(cls.vote_columns))
+        return tuple(columns)
+
+    def to_representation(self, row):
+        return {name: getter(row) if getter else row[name] for name, getter in self.getters}
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
+
+    def get_author(self, row):
+        return row['author__username']
+
+    def get_author_avatar(self, row):
+        return avatar_url(
+            row['author__userprofile__photo'], row['author__userprofile__thumbnail'], self.context.get('request'),
+        )
+
+    def get_create_date(self, row):
+        return self.date_field.to_representation(row['create_date'])
+
+
+AVATAR_COLUMNS = ('author__userprofile__photo', 'author__userprofile__thumbnail')
+
+
+class AnswerRowSerializer(RowListSerializer):
+    """Строки AnswerSerializer"""
+    columns = {
+        'body': ('body',),
+        'author': ('author__username',),
+        'author_avatar': AVATAR_COLUMNS,
+        'create_date': ('create_date',),
+        'correct': ('correct',),
+    }
+    vote_columns = ('score',)
+
+
+class QuestionRowSerializer(RowListSerializer):
+    """
+    Строки QuestionSerializer. Теги всей страницы читаются одним запросом, если запрошено поле tags;
+    include=answers вкладывает ответы всех вопросов страницы, прочитанные одним запросом,
+    answer_fields выбирает их поля
+    """
+    columns = {
+        'title': ('title',),
+        'body': ('body',),
+        'create_date': ('create_date',),
+        'author': ('author__username',),
+        'author_avatar': AVATAR_COLUMNS,
+        'tags': (),
+    }
+    vote_columns = ('vote_count', 'answer_count')
+    includes = ('vote_counts', 'answers')
+
+    def __init__(self, rows, context=None, fields=None, include=(), answer_fields=None):
+        super().__init__(rows, context, fields, include)
+        ids = [row['id'] for row in self.rows]
+        self.tags = defaultdict(list)
+        if ids and 'tags' in self.fields:
+            links = Questions.tags.through.objects.filter(
+                questions_id__in=ids,
+            ).order_by('tags_id').values_list('questions_id', 'tags__name')
+            for question_id, name in links:
+                self.tags[question_id].append(name)
+        self.answers = defaultdict(list)
+        if 'answers' in include:
+            self.fields.append('answers')
+            self.getters.append(('answers', self.get_answers))
+            columns = AnswerRowSerializer.values(answer_fields, include) + ('question_id',)
+            answers = Answers.objects.filter(question_id__in=ids).order_by('create_date').values(*columns) if ids else ()
+            serializer = AnswerRowSerializer(answers, context, answer_fields, include)
+            for row, data in zip(serializer.rows, serializer.data):
+                self.answers[row['question_id']].append(data)
+
+    def get_tags(self, row):
+        return self.tags[row['id']]
+
+    def get_answers(self, row):
+        return self.answers[row['id']]
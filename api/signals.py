@@ -0,0 +1,18 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from api.authentication import get_token_cache
+from api.models import ApiToken
+
+
+@receiver(post_delete, sender=ApiToken)
+def forget_revoked_token(sender, instance, **kwargs):
+    get_token_cache().discard(instance.key_hash)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_tokens(sender, instance, **kwargs):
+    """Блокировка пользователя сразу действует в этом процессе, в остальных - через TTL кэша токенов"""
+    get_token_cache().discard_user(instance.pk)
@@ -0,0 +1,76 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.authentication import TokenCache
+from api.models import ApiToken
+
+
+class TokenAuthenticationTest(APITestCase):
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user('test', password='test')
+
+    def login(self, password='test'):
+        return self.client.post(reverse('api:token'), {'username': 'test', 'password': password}, format='json')
+
+    def get_tags(self, key):
+        return self.client.get(reverse('api:tags'), HTTP_AUTHORIZATION=f'Token {key}')
+
+    def test_login_issues_hashed_token(self):
+        response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        key = response.data['token']
+        token = ApiToken.objects.get()
+        self.assertEqual(token.user, self.user)
+        self.assertEqual(token.key_hash, hashlib.sha256(key.encode()).hexdigest())
+
+    def test_login_wrong_password(self):
+        response = self.login(password='wrong')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ApiToken.objects.exists())
+
+    def test_token_authenticates(self):
+        key = self.login().data['token']
+        self.assertEqual(self.get_tags(key).status_code, status.HTTP_200_OK)
+
+    def test_verified_token_cached(self):
+        key = self.login().data['token']
+        self.get_tags(key)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.get_tags(key).status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in context.captured_queries if 'api_apitoken' in query['sql']])
+
+    def test_invalid_token(self):
+        response = self.get_tags('invalid')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke(self):
+        key = self.login().data['token']
+        self.get_tags(key)
+        response = self.client.delete(reverse('api:token'), HTTP_AUTHORIZATION=f'Token {key}')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ApiToken.objects.exists())
+        self.assertEqual(self.get_tags(key).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_inactive_user(self):
+        key = self.login().data['token']
+        self.get_tags(key)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_tags(key).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cache_ttl(self):
+        cache = TokenCache(ttl=-1)
+        cache.set('hash', self.user)
+        self.assertIsNone(cache.get('hash'))
+        cache = TokenCache(ttl=60, maxsize=1)
+        cache.set('first', self.user)
+        cache.set('second', self.user)
+        self.assertIsNone(cache.get('first'))
+        self.assertEqual(cache.get('second'), self.user)
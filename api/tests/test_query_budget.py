@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIRequestFactory, force_authenticate
+
+from api.tests.test_views import UserFactory, QuestionFactory, AnswersFactory, TagFactory
+from api.views import GetQuestion, GetSearchQuestion, GetAnswers
+from hasker.test_utils import QueryBudgetMixin
+
+
+class ApiQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Количество запросов API не зависит от размера страницы"""
+
+    def setUp(self) -> None:
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create_user(
+            'test',
+            email='testuser@test.com',
+            password='test'
+        )
+        tags = [TagFactory() for _ in range(3)]
+        for i in range(25):
+            user = UserFactory(username=f'Test_user_{i}')
+            question = QuestionFactory(title='Test_name', author=user)
+            question.tags.add(*tags)
+            AnswersFactory(question_id=1, author=user)
+
+    def get(self, view, url, **kwargs):
+        request = self.factory.get(url)
+        force_authenticate(request, user=self.user)
+        response = view(request, **kwargs)
+        response.render()
+        return response
+
+    def test_index(self):
+        with self.assertMaxQueries(4):
+            self.get(GetQuestion.as_view({'get': 'list'}), reverse('api:index') + '?page_size=100')
+
+    def test_get_question(self):
+        # первый запрос - Questions.modified для ETag
+        with self.assertMaxQueries(3):
+            self.get(GetQuestion.as_view({'get': 'retrieve'}), reverse('api:getquestion', args=(1,)), pk=1)
+
+    def test_search(self):
+        # индекс в памяти без снимка строится по БД при первом поиске, в бюджет это не входит
+        self.get(GetSearchQuestion.as_view({'get': 'list'}), reverse('api:searchresult') + '?search=Warmup')
+        with self.assertMaxQueries(3):
+            self.get(GetSearchQuestion.as_view({'get': 'list'}), reverse('api:searchresult') + '?search=Test')
+
+    def test_get_answers(self):
+        with self.assertMaxQueries(3):
+            self.get(GetAnswers.as_view({'get': 'list'}), reverse('api:getanswers', args=(1,)), pk=1)
@@ -0,0 +1,144 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models.signals import pre_init
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIRequestFactory
+
+from api.serializers import QuestionRowSerializer, AnswerRowSerializer
+from questions.models import Questions, Answers, Tags
+from registration.models import UserProfile
+
+
+class RowSerializerTest(APITestCase):
+    """Быстрые сериализаторы списков отдают то же, что и обычные"""
+
+    @classmethod
+    def setUpTestData(cls):
+        tags = [Tags.objects.create(name=name) for name in ('python', 'django', 'sql')]
+        for i in range(100):
+            user = User.objects.create(username=f'test_user_{i}')
+            if i % 3 == 0:
+                thumbnail = f'avatars/{i}/abc' if i % 2 else ''
+                UserProfile.objects.create(user=user, photo=f'users/{i}.png', thumbnail=thumbnail)
+            question = Questions.objects.create(title=f'title {i}', body='test body', author=user)
+            question.tags.add(*reversed(tags[:i % 4]))
+            Answers.objects.create(body=f'answer {i}', author=user, correct=i == 0, question=Questions.objects.first())
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.first())
+        self.request = APIRequestFactory().get('/')
+
+    def fetch(self, url):
+        with override_settings(API_FAST_LISTS=True):
+            fast = self.client.get(url).json()
+        with override_settings(API_FAST_LISTS=False):
+            slow = self.client.get(url).json()
+        return fast, slow
+
+    def test_questions(self):
+        fast, slow = self.fetch(reverse('api:index') + '?page_size=100')
+        self.assertEqual(len(fast['results']), 100)
+        self.assertEqual(fast, slow)
+
+    def test_search(self):
+        fast, slow = self.fetch(reverse('api:searchresult') + '?search=tag:python')
+        self.assertEqual(fast['count'], 75)
+        self.assertEqual(fast, slow)
+
+    def test_answers(self):
+        fast, slow = self.fetch(reverse('api:getanswers', args=(Questions.objects.first().pk,)) + '?page_size=100')
+        self.assertEqual(fast, slow)
+
+    def test_keyset(self):
+        url = reverse('api:index') + '?page_size=30&cursor='
+        fast, slow = self.fetch(url)
+        self.assertEqual(fast, slow)
+        fast, slow = self.fetch(fast['next'])
+        self.assertEqual(fast, slow)
+
+    def test_rows_without_models(self):
+        """Страница из 100 вопросов и 100 ответов: три запроса и ни одного экземпляра модели"""
+        created = []
+
+        def count_instances(sender, **kwargs):
+            created.append(sender)
+
+        context = {'request': self.request}
+        pre_init.connect(count_instances)
+        try:
+            # вопросы, теги всех вопросов страницы, ответы
+            with self.assertNumQueries(3):
+                questions = QuestionRowSerializer(
+                    Questions.objects.order_by('create_date').values(*QuestionRowSerializer.values()), context,
+                ).data
+                answers = AnswerRowSerializer(
+                    Answers.objects.order_by('create_date').values(*AnswerRowSerializer.values()), context,
+                ).data
+        finally:
+            pre_init.disconnect(count_instances)
+        self.assertEqual((len(questions), len(answers)), (100, 100))
+        self.assertEqual(created, [])
+
+
+class SparseFieldsTest(APITestCase):
+    """?fields= и ?include= на списках и вопросе"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='test_user')
+        tag = Tags.objects.create(name='python')
+        for i in range(5):
+            question = Questions.objects.create(title=f'title {i}', body='test body', author=cls.user)
+            question.tags.add(tag)
+            for j in range(3):
+                Answers.objects.create(body=f'answer {j}', author=cls.user, correct=False, question=question)
+        cls.question = Questions.objects.first()
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_fields(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('api:index') + '?fields=title,author')
+        self.assertEqual(response.json()['results'][0], {'title': 'title 0', 'author': 'test_user'})
+        sql = [query['sql'] for query in context.captured_queries if '"questions_questions"."title"' in query['sql']]
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('"questions_questions"."body"', sql[0])
+        self.assertNotIn('registration_userprofile', sql[0])
+        self.assertFalse(any('questions_tags' in query['sql'] for query in context.captured_queries))
+
+    def test_include_answers(self):
+        url = reverse('api:index') + '?fields=title&include=answers,vote_counts&fields[answers]=body'
+        # количество, вопросы, ответы всех вопросов страницы, тренды
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        question = response.json()['results'][0]
+        self.assertEqual(question['vote_count'], 0)
+        self.assertEqual(question['answer_count'], 3)
+        self.assertEqual(question['answers'], [
+            {'body': 'answer 0', 'score': 0}, {'body': 'answer 1', 'score': 0}, {'body': 'answer 2', 'score': 0},
+        ])
+
+    def test_answers(self):
+        url = reverse('api:getanswers', args=(self.question.pk,)) + '?fields=body,correct&include=vote_counts'
+        response = self.client.get(url)
+        self.assertEqual(response.json()['results'][0], {'body': 'answer 0', 'correct': False, 'score': 0})
+
+    def test_retrieve(self):
+        url = reverse('api:getquestion', args=(self.question.pk,)) + '?fields=title,tags&include=answers'
+        response = self.client.get(url).json()
+        self.assertEqual(response['title'], 'title 0')
+        self.assertEqual(response['tags'], ['python'])
+        self.assertEqual(len(response['answers']), 3)
+        self.assertEqual(set(response), {'title', 'tags', 'answers'})
+        response = self.client.get(reverse('api:getquestion', args=(100,)) + '?fields=title')
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown(self):
+        response = self.client.get(reverse('api:index') + '?fields=title,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['fields'])
+        response = self.client.get(reverse('api:getanswers', args=(self.question.pk,)) + '?include=answers')
+        self.assertEqual(response.status_code, 400)
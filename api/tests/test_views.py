@@ -6,8 +6,13 @@ from rest_framework import status
 from rest_framework.test import APITestCase, APIRequestFactory, force_authenticate
 from django.contrib.auth import get_user_model
 
-from questions.models import Questions, Answers, Tags
-from api.views import GetQuestion, GetSearchQuestion, GetAnswers
+from questions.models import Questions, Answers, Tags, QuestionVotes, AnswerVotes
+from registration.models import UserProfile
+from registration.thumbnails import thumbnail_prefix
+from api.views import (
+    GetQuestion, GetSearchQuestion, GetAnswers, GetTags,
+    QuestionVoteApi, QuestionUnVoteApi, AnswerVoteApi, AnswerUnVoteApi, AnswerSelectRightApi,
+)
 
 
 class TagFactory(factory.django.DjangoModelFactory):
@@ -31,7 +36,7 @@ class AnswersFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Answers
 
-    correct = True
+    correct = False
 
 
 class IndexApiTest(APITestCase):
@@ -104,6 +109,24 @@ class GetQuestionApiTest(APITestCase):
         response_dict = json.loads(response.content)
         self.assertEqual(response_dict['title'], 'Test_name')
         self.assertEqual(len(response_dict['tags']), 3)
+        self.assertIsNone(response_dict['author_avatar'])
+
+    def test_get_question_author_avatar(self):
+        author = User.objects.get(username='Test_user')
+        profile = UserProfile.objects.create(user=author, photo='users/avatar.png')
+        request = self.factory.get(self.url)
+        force_authenticate(request, user=self.user)
+        response = self.view(request, pk=1)
+        response.render()
+        self.assertEqual(json.loads(response.content)['author_avatar'], 'http://testserver/media/users/avatar.png')
+        profile.thumbnail = thumbnail_prefix(profile)
+        profile.save()
+        response = self.view(request, pk=1)
+        response.render()
+        self.assertEqual(
+            json.loads(response.content)['author_avatar'],
+            f'http://testserver/media/{profile.thumbnail}_75.jpeg',
+        )
 
 
 class GetSearchRequestApiTest(APITestCase):
@@ -175,3 +198,113 @@ class GetAnswersApiTest(APITestCase):
         response_dict = json.loads(response.content)
         self.assertGreater(len(response_dict['next']), 1)
         self.assertEqual(response_dict['count'], 25)
+
+
+class VoteApiTest(APITestCase):
+    def setUp(self) -> None:
+        self.factory = APIRequestFactory()
+        self.user = self.setup_user()
+        self.question = QuestionFactory(title='Test_name', author=self.user)
+        self.answer = AnswersFactory(question=self.question, author=self.user, correct=False)
+
+    @staticmethod
+    def setup_user():
+        User = get_user_model()
+        return User.objects.create_user(
+            'test',
+            email='testuser@test.com',
+            password='test'
+        )
+
+    def post(self, view, url, **kwargs):
+        request = self.factory.post(url)
+        force_authenticate(request, user=self.user)
+        response = view(request, **kwargs)
+        response.render()
+        return response
+
+    def test_question_vote_unauthorized(self):
+        request = self.factory.post(reverse('api:questionvote', args=(self.question.pk,)))
+        response = QuestionVoteApi.as_view()(request, pk=self.question.pk)
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_question_vote_get_not_allowed(self):
+        request = self.factory.get(reverse('api:questionvote', args=(self.question.pk,)))
+        force_authenticate(request, user=self.user)
+        response = QuestionVoteApi.as_view()(request, pk=self.question.pk)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_question_vote_and_unvote(self):
+        url = reverse('api:questionvote', args=(self.question.pk,))
+        response = self.post(QuestionVoteApi.as_view(), url, pk=self.question.pk)
+        self.assertEqual(json.loads(response.content), {'count': 1, 'voted': True})
+        response = self.post(QuestionVoteApi.as_view(), url, pk=self.question.pk)
+        self.assertEqual(json.loads(response.content), {'count': 1, 'voted': True})
+        url = reverse('api:questionunvote', args=(self.question.pk,))
+        response = self.post(QuestionUnVoteApi.as_view(), url, pk=self.question.pk)
+        self.assertEqual(json.loads(response.content), {'count': 0, 'voted': False})
+        self.assertEqual(QuestionVotes.objects.count(), 0)
+
+    def test_question_vote_not_found(self):
+        url = reverse('api:questionvote', args=(100,))
+        response = self.post(QuestionVoteApi.as_view(), url, pk=100)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_answer_vote_and_unvote(self):
+        args = (self.question.pk, self.answer.pk)
+        kwargs = {'pk': self.question.pk, 'id_answer': self.answer.pk}
+        response = self.post(AnswerVoteApi.as_view(), reverse('api:answervote', args=args), **kwargs)
+        self.assertEqual(json.loads(response.content), {'count': 1, 'voted': True})
+        self.assertEqual(AnswerVotes.objects.count(), 1)
+        response = self.post(AnswerUnVoteApi.as_view(), reverse('api:answerunvote', args=args), **kwargs)
+        self.assertEqual(json.loads(response.content), {'count': 0, 'voted': False})
+
+    def test_answer_vote_other_question(self):
+        other = QuestionFactory(title='Other', author=self.user)
+        args = (other.pk, self.answer.pk)
+        kwargs = {'pk': other.pk, 'id_answer': self.answer.pk}
+        for view, name in ((AnswerVoteApi, 'api:answervote'), (AnswerUnVoteApi, 'api:answerunvote')):
+            response = self.post(view.as_view(), reverse(name, args=args), **kwargs)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(AnswerVotes.objects.count(), 0)
+
+    def test_set_correct_answer(self):
+        args = (self.question.pk, self.answer.pk)
+        response = self.post(
+            AnswerSelectRightApi.as_view(), reverse('api:setcorrectanswer', args=args),
+            pk=self.question.pk, id_answer=self.answer.pk
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(Answers.objects.get(pk=self.answer.pk).correct)
+
+    def test_set_correct_answer_not_author(self):
+        other = UserFactory(username='Other_user')
+        question = QuestionFactory(title='Other', author=other)
+        answer = AnswersFactory(question=question, author=other, correct=False)
+        response = self.post(
+            AnswerSelectRightApi.as_view(), reverse('api:setcorrectanswer', args=(question.pk, answer.pk)),
+            pk=question.pk, id_answer=answer.pk
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Answers.objects.get(pk=answer.pk).correct)
+
+
+class GetTagsApiTest(APITestCase):
+    def setUp(self) -> None:
+        self.factory = APIRequestFactory()
+        self.view = GetTags.as_view({'get': 'list'})
+        self.url = reverse('api:tags')
+        self.user = UserFactory(username='Test_user')
+        python, django = TagFactory(name='python'), TagFactory(name='django')
+        TagFactory(name='unused')
+        for i in range(3):
+            QuestionFactory(title='Test_name', author=self.user).tags.add(python)
+        QuestionFactory(title='Test_name', author=self.user).tags.add(django, python)
+
+    def test_tags_by_popularity(self):
+        request = self.factory.get(self.url)
+        force_authenticate(request, user=self.user)
+        response = self.view(request)
+        response.render()
+        results = json.loads(response.content)['results']
+        self.assertEqual([(tag['name'], tag['question_count']) for tag in results], [('python', 4), ('django', 1)])
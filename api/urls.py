@@ -10,6 +10,16 @@ urlpatterns = [
     path('index/', GetQuestion.as_view({'get': 'list'}), name='index'),
     path('searchresult/', GetSearchQuestion.as_view({'get': 'list'}), name='searchresult'),
     path('getanswers/<int:pk>/', GetAnswers.as_view({'get': 'list'}), name='getanswers'),
+    path('question/<int:pk>/vote/', QuestionVoteApi.as_view(), name='questionvote'),
+    path('question/<int:pk>/unvote/', QuestionUnVoteApi.as_view(), name='questionunvote'),
+    path('question/<int:pk>/<int:id_answer>/vote/', AnswerVoteApi.as_view(), name='answervote'),
+    path('question/<int:pk>/<int:id_answer>/unvote/', AnswerUnVoteApi.as_view(), name='answerunvote'),
+    path('question/<int:pk>/<int:id_answer>/setcorrectanswer/',
+         AnswerSelectRightApi.as_view(), name='setcorrectanswer'),
+    path('tags/', GetTags.as_view({'get': 'list'}), name='tags'),
+    path('tags/autocomplete/', TagAutocompleteApi.as_view(), name='tagautocomplete'),
+    path('auth/token/', TokenLoginApi.as_view(), name='token'),
+    path('pagecache/stats/', PageCacheStatsApi.as_view(), name='pagecachestats'),
     path('openapi/', get_schema_view(
             title="Hasker",
             description="API"
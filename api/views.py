@@ -1,28 +1,153 @@
-from django.db.models import Count
-from rest_framework.authentication import BasicAuthentication
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db.models import QuerySet
+
+from rest_framework.authentication import BasicAuthentication, SessionAuthentication
+from rest_framework.exceptions import NotFound, NotAuthenticated, ValidationError
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
-from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework import status, viewsets
 
-from api.serializers import QuestionSerializer, TrendsSerializer, AnswerSerializer
-from questions.models import Questions, Answers
+from api.authentication import TokenAuthentication
+from api.models import ApiToken
+from api.serializers import (
+    QuestionSerializer, TrendsSerializer, AnswerSerializer, TagStatsSerializer,
+    QuestionRowSerializer, AnswerRowSerializer,
+)
+from questions.conditional import ConditionalGetMixin
+from questions.models import Questions, Answers, TagStats
+from questions.page_cache import page_cache_stats
+from questions.pagination import KeysetPaginator, InvalidCursor, use_keyset
+from questions.voting import (
+    vote_question, unvote_question, vote_answer, unvote_answer, set_correct_answer,
+    current_question_votes, current_answer_score,
+)
+from search.autocomplete import get_tag_autocomplete
+from search.engine import RankedQuestions, search_result_ids, search_suggestions
 
 
 class StandardResultsSetPagination(PageNumberPagination):
-    """Pagination для index запроса"""
+    """
+    Pagination для index запроса.
+    В keyset-режиме (PAGINATION_MODE или параметр cursor) отдает next/previous курсоры без count
+    """
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
+    cursor_query_param = 'cursor'
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = use_keyset(request.query_params) and isinstance(queryset, QuerySet)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.get_page_size(request))
+        try:
+            self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor as e:
+            raise NotFound(str(e))
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def _cursor_link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        return self._cursor_link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        return self._cursor_link(self.page.previous_cursor)
+
+
+def parse_list_param(request, name, allowed):
+    """Значения через запятую из query string, None - если параметр не передан"""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    names = list(dict.fromkeys(filter(None, (part.strip() for part in value.split(',')))))
+    unknown = [item for item in names if item not in allowed]
+    if unknown:
+        raise ValidationError({name: f'Неизвестные значения: {", ".join(unknown)}. Допустимые: {", ".join(allowed)}'})
+    return names
+
+
+class FastListMixin:
+    """
+    list() по строкам .values() и row_serializer_class вместо моделей и serializer_class.
+    ?fields=title,author выбирает поля, ненужные колонки не читаются из БД;
+    ?include=vote_counts,answers добавляет счетчики и вложенные ответы, fields[answers] - поля ответов.
+    API_FAST_LISTS = False возвращает обычные сериализаторы для запросов без этих параметров
+    """
+    row_serializer_class = None
+
+    def get_row_options(self):
+        serializer_class = self.row_serializer_class
+        options = {
+            'fields': parse_list_param(self.request, 'fields', serializer_class.columns),
+            'include': parse_list_param(self.request, 'include', serializer_class.includes) or (),
+        }
+        if 'answers' in serializer_class.includes:
+            options['answer_fields'] = parse_list_param(self.request, 'fields[answers]', AnswerRowSerializer.columns)
+        return options
+
+    def get_row_queryset(self, options):
+        queryset = self.filter_queryset(self.get_queryset())
+        if isinstance(queryset, QuerySet):
+            queryset = queryset.select_related(None).prefetch_related(None)
+        return queryset.values(*self.row_serializer_class.values(options['fields'], options['include']))
+
+    def list(self, request, *args, **kwargs):
+        options = self.get_row_options()
+        if not settings.API_FAST_LISTS and not any(options.values()):
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(self.get_row_queryset(options))
+        serializer = self.row_serializer_class(page, self.get_serializer_context(), **options)
+        return self.get_paginated_response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        options = self.get_row_options()
+        if not any(options.values()):
+            return super().retrieve(request, *args, **kwargs)
+        rows = list(self.get_row_queryset(options).filter(pk=kwargs['pk']))
+        if not rows:
+            raise NotFound()
+        return Response(self.row_serializer_class(rows, self.get_serializer_context(), **options).data[0])
 
 
-class GetQuestion(viewsets.ModelViewSet):
+class GetQuestion(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     """Standart view for Question"""
     serializer_class = QuestionSerializer
-    queryset = Questions.objects.all()
-    authentication_classes = (BasicAuthentication,)
+    row_serializer_class = QuestionRowSerializer
+    queryset = Questions.objects.with_author_and_tags().order_by('create_date')
+    authentication_classes = (BasicAuthentication, TokenAuthentication)
     permission_classes = (IsAuthenticated, )
     pagination_class = StandardResultsSetPagination
 
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_get(request, partial(super().retrieve, request, *args, **kwargs))
+
     def list(self, request, *args, **kwargs):
         response = super().list(request)
         trends = Questions.get_trends()
@@ -31,33 +156,163 @@ class GetQuestion(viewsets.ModelViewSet):
         return response
 
 
-class GetSearchQuestion(viewsets.ModelViewSet):
+class GetSearchQuestion(FastListMixin, viewsets.ModelViewSet):
     serializer_class = QuestionSerializer
-    authentication_classes = (BasicAuthentication,)
+    row_serializer_class = QuestionRowSerializer
+    authentication_classes = (BasicAuthentication, TokenAuthentication)
     permission_classes = (IsAuthenticated,)
     pagination_class = StandardResultsSetPagination
 
     def get_queryset(self):
-        search_string = self.request.GET.get('search')
-        if search_string[:4] == 'tag:':
-            queryset = Questions.objects.filter(tags__name__contains=search_string[4:]).annotate(
-                count_votes=Count('questionvotes', distinct=True),
-                count_answers=Count('answers', distinct=True)
-            ).order_by('-count_votes', '-create_date')
-        else:
-            queryset = Questions.objects.filter(title__contains=search_string).annotate(
-                count_votes=Count('questionvotes', distinct=True),
-                count_answers=Count('answers', distinct=True)
-            ).order_by('-count_votes', '-create_date')
-        return queryset
-
-
-class GetAnswers(viewsets.ModelViewSet):
+        return RankedQuestions(search_result_ids(self.request.GET.get('search', '')))
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request)
+        if not response.data['count']:
+            suggestions = search_suggestions(request.GET.get('search', ''))
+            questions = RankedQuestions(suggestions['questions'])[:]
+            response.data['suggestions'] = QuestionSerializer(questions, many=True, context={'request': request}).data
+            response.data['tag_suggestions'] = suggestions['tags']
+        return response
+
+
+class GetAnswers(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = AnswerSerializer
-    authentication_classes = (BasicAuthentication,)
+    row_serializer_class = AnswerRowSerializer
+    authentication_classes = (BasicAuthentication, TokenAuthentication)
     permission_classes = (IsAuthenticated,)
     pagination_class = StandardResultsSetPagination
 
+    def list(self, request, *args, **kwargs):
+        return self.conditional_get(request, partial(super().list, request, *args, **kwargs))
+
     def get_queryset(self):
         pk = self.kwargs.get('pk')
-        return Answers.objects.filter(question_id=pk)
+        return Answers.objects.filter(question_id=pk).select_related('author__userprofile').order_by('create_date')
+
+
+class GetTags(viewsets.ModelViewSet):
+    """Теги по популярности из TagStats, без обращения к связующей таблице"""
+    serializer_class = TagStatsSerializer
+    queryset = TagStats.objects.filter(question_count__gt=0).order_by('-question_count', '-vote_count')
+    authentication_classes = (BasicAuthentication, TokenAuthentication)
+    permission_classes = (IsAuthenticated,)
+    pagination_class = StandardResultsSetPagination
+
+
+class VoteApiView(APIView):
+    """
+    Базовый класс для голосования через POST: вместо редиректа и перерисовки
+    страницы вопроса возвращает только новый счетчик и состояние голоса пользователя
+    """
+    authentication_classes = (SessionAuthentication, BasicAuthentication, TokenAuthentication)
+    permission_classes = (IsAuthenticated,)
+    voted = True
+
+    def write(self, user, **kwargs):
+        raise NotImplementedError
+
+    def count(self, user, **kwargs):
+        raise NotImplementedError
+
+    def post(self, request, *args, **kwargs):
+        self.write(request.user, **kwargs)
+        return Response({
+            'count': self.count(request.user, **kwargs),
+            'voted': self.voted,
+        })
+
+
+class QuestionVoteApi(VoteApiView):
+    """Голос за вопрос"""
+
+    def write(self, user, pk):
+        vote_question(user.pk, pk)
+
+    def count(self, user, pk):
+        return current_question_votes(user, pk)
+
+
+class QuestionUnVoteApi(QuestionVoteApi):
+    """Отзыв голоса за вопрос"""
+    voted = False
+
+    def write(self, user, pk):
+        unvote_question(user.pk, pk)
+
+
+class AnswerVoteApi(VoteApiView):
+    """Голос за ответ"""
+
+    def write(self, user, pk, id_answer):
+        vote_answer(user.pk, pk, id_answer)
+
+    def count(self, user, pk, id_answer):
+        return current_answer_score(user, id_answer)
+
+
+class AnswerUnVoteApi(AnswerVoteApi):
+    """Отзыв голоса за ответ"""
+    voted = False
+
+    def write(self, user, pk, id_answer):
+        unvote_answer(user.pk, pk, id_answer)
+
+
+class AnswerSelectRightApi(APIView):
+    """Выбор верного ответа автором вопроса"""
+    authentication_classes = (SessionAuthentication, BasicAuthentication, TokenAuthentication)
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, pk, id_answer):
+        if not set_correct_answer(request.user, pk, id_answer):
+            return Response({'correct': False}, status=status.HTTP_403_FORBIDDEN)
+        return Response({'correct': True, 'answer': id_answer})
+
+
+class PageCacheStatsApi(APIView):
+    """Статистика попаданий кэша страниц для анонимных пользователей"""
+    authentication_classes = (SessionAuthentication, BasicAuthentication, TokenAuthentication)
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(page_cache_stats())
+
+
+class TagAutocompleteApi(APIView):
+    """Подсказки имен тегов по префиксу: ?q=py&limit=10"""
+    authentication_classes = (SessionAuthentication, BasicAuthentication, TokenAuthentication)
+    permission_classes = (IsAuthenticated,)
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request):
+        prefix = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        results = get_tag_autocomplete().complete(prefix, max(limit, 1)) if prefix.strip() else []
+        return Response({'results': results})
+
+
+class TokenLoginApi(APIView):
+    """
+    POST {"username": ..., "password": ...} - выдает токен для заголовка Authorization: Token <токен>.
+    Пароль проверяется один раз при выдаче. DELETE с токеном отзывает его
+    """
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = ()
+
+    def post(self, request):
+        user = authenticate(request, username=request.data.get('username'), password=request.data.get('password'))
+        if user is None:
+            return Response({'detail': 'Неверный логин или пароль'}, status=status.HTTP_400_BAD_REQUEST)
+        key, _ = ApiToken.issue(user)
+        return Response({'token': key}, status=status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        if not request.user.is_authenticated:
+            raise NotAuthenticated()
+        ApiToken.objects.filter(key_hash=request.auth).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
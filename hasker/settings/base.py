@@ -1,10 +1,23 @@
 import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.utils import get_random_secret_key
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # SECURITY WARNING: keep the secret key used in production secret!
-with open('./etc/secret_key.txt') as f:
-    SECRET_KEY = f.read().strip()
+# Ключ берется из etc/secret_key.txt (в репозиторий не попадает) или из DJANGO_SECRET_KEY,
+# для manage.py test без ключа генерируется случайный
+if os.path.exists('./etc/secret_key.txt'):
+    with open('./etc/secret_key.txt') as f:
+        SECRET_KEY = f.read().strip()
+elif os.environ.get('DJANGO_SECRET_KEY'):
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+elif sys.argv[1:2] == ['test']:
+    SECRET_KEY = get_random_secret_key()
+else:
+    raise ImproperlyConfigured('Нет SECRET_KEY: создайте etc/secret_key.txt или задайте DJANGO_SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -17,6 +30,7 @@ INSTALLED_APPS = [
     'questions',
     'registration',
     'api',
+    'search',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -49,6 +63,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'questions.context_processors.popular_tags',
+                'registration.context_processors.profile',
             ],
         },
     },
@@ -111,6 +127,32 @@ MEDIA_ROOT = os.path.join(BASE_DIR, '../../media/')
 LOGIN_URL = '/auth/login/'
 LOGIN_REDIRECT_URL = '/'
 
+# Пользователь сессии загружается вместе с профилем одним запросом. Поля профиля кэшируются в USER_CACHE на TIMEOUT
+# секунд, а сам пользователь читается из БД на каждом запросе: смена пароля и блокировка действуют сразу.
+# ModelBackend оставлен для сессий, созданных до его появления
+AUTHENTICATION_BACKENDS = [
+    'registration.backends.ProfileModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+USER_CACHE = {
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+}
+
+# Сессии нужны только для входа на сайт: читаются из кэша, в БД пишутся лишь при изменении (вход и выход)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Проверенные токены API кэшируются в памяти каждого процесса на TIMEOUT секунд (не более SIZE штук):
+# отзыв токена в другом процессе вступает в силу не позже чем через TIMEOUT
+API_TOKEN_CACHE = {
+    'TIMEOUT': 60,
+    'SIZE': 10000,
+}
+
+# Качество уменьшенных копий аватарок (WebP и JPEG)
+AVATAR_THUMBNAIL_QUALITY = 85
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
     'TEST_REQUEST_DEFAULT_FORMAT': 'json',
@@ -121,3 +163,111 @@ REST_FRAMEWORK = {
         ]
 
 }
+
+# Отложенная запись голосов: намерения копятся в памяти процесса
+# и пишутся пачкой раз в FLUSH_INTERVAL_MS или при накоплении MAX_BATCH штук
+VOTE_BUFFER = {
+    'ENABLED': False,
+    'FLUSH_INTERVAL_MS': 200,
+    'MAX_BATCH': 100,
+}
+
+# 'offset' - постраничная навигация по номерам страниц, 'keyset' - по курсорам (sort key, id).
+# Клиент может включить keyset-режим для отдельного запроса, передав параметр cursor
+PAGINATION_MODE = 'offset'
+
+# Кэш страниц для анонимных пользователей. Точечно сбрасывается сигналами при изменении
+# вопросов, ответов, голосов и тегов; блок трендов на чужих страницах может отставать на TIMEOUT.
+# При нескольких процессах gunicorn CACHE должен указывать на общий бэкенд (memcached, redis)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+PAGE_CACHE = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'TIMEOUT': 60,
+}
+
+# Полнотекстовый поиск вопросов:
+# 'search.backends.memory.MemoryBackend' - BM25 по индексу в памяти каждого процесса, снимок и журнал
+#     изменений в SEARCH_INDEX_PATH; процессы догоняют журнал друг друга, rebuild_search_index его сворачивает
+# 'search.backends.sqlite.SQLiteBackend' - FTS5, таблицу заполняют триггеры
+# 'search.backends.postgres.PostgresBackend' - tsvector с GIN-индексом и ts_rank, колонку заполняют триггеры
+# Таблица, колонка и триггеры создаются только для бэкенда в БД; после смены бэкенда нужен migrate
+SEARCH_BACKEND = 'search.backends.memory.MemoryBackend'
+SEARCH_INDEX_PATH = os.path.join(BASE_DIR, '../../search_index/')
+SEARCH_MAX_RESULTS = 1000
+
+# Нечеткий поиск по триграммам, когда обычный поиск ничего не нашел: pg_trgm в PostgreSQL,
+# индекс в памяти процесса для остальных бэкендов. SIMILARITY - порог для имен тегов,
+# WORD_SIMILARITY - для заголовков вопросов; MAX_SCANNED и TIMEOUT_MS ограничивают время запроса.
+# CACHE хранит версию индекса, по которой процессы догружают новые записи: при нескольких процессах - общий бэкенд
+SEARCH_FUZZY = {
+    'CACHE': 'default',
+    'LIMIT': 10,
+    'SIMILARITY': 0.25,
+    'WORD_SIMILARITY': 0.5,
+    'MAX_SCANNED': 200000,
+    'TIMEOUT_MS': 200,
+}
+
+# Кэш идентификаторов результатов поиска по нормализованной строке запроса.
+# Сбрасывается целиком при изменении вопросов, ответов и тегов; порядок по голосам может отставать на TIMEOUT
+SEARCH_CACHE = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+}
+
+TEST_RUNNER = 'hasker.test_runner.HaskerTestRunner'
+
+# Кэш id тегов по имени в памяти каждого процесса (LRU на SIZE имен): популярные теги при создании вопроса
+# не стоят запросов. CACHE хранит поколение, которое сбрасывает кэши всех процессов при удалении и переименовании тегов.
+# CACHE должен указывать на общий бэкенд (memcached, redis): с locmem другие процессы не увидят сброс и после
+# удаления тега будут ссылаться на его id, вставка вопроса упадет на внешнем ключе. Поэтому по умолчанию кэш
+# выключен; включенный на кэше процесса он дает предупреждение questions.W001 в manage.py check
+TAG_CACHE = {
+    'ENABLED': False,
+    'CACHE': 'default',
+    'SIZE': 10000,
+}
+
+# Автодополнение имен тегов: префиксное дерево в памяти каждого процесса. CACHE хранит версию и поколение дерева,
+# по которым процессы догружают новые теги и перестраивают его после удаления и переименования: при нескольких
+# процессах - общий бэкенд
+TAG_AUTOCOMPLETE = {
+    'CACHE': 'default',
+}
+
+# Облако популярных тегов в боковой панели: LIMIT тегов из TagStats, кэшируется на TIMEOUT секунд
+TAG_STATS = {
+    'CACHE': 'default',
+    'TIMEOUT': 60,
+    'LIMIT': 20,
+}
+
+# Уведомления авторам вопросов о новых ответах. Запрос только ставит письмо в очередь (таблица AnswerNotification),
+# отправляет их команда send_notifications --loop (один экземпляр). Ответы, пришедшие за DIGEST_DELAY секунд,
+# уходят одним письмом; неудачная отправка повторяется через RETRY_DELAY * 2^n секунд, не более MAX_ATTEMPTS раз
+NOTIFICATIONS = {
+    'FROM_EMAIL': 'info@homework.ru',
+    'DIGEST_DELAY': 60,
+    'RETRY_DELAY': 60,
+    'MAX_ATTEMPTS': 5,
+    'BATCH': 100,
+}
+
+# Условные GET (ETag, Last-Modified, ответ 304) для страницы вопроса и API вопроса и ответов по Questions.modified,
+# который обновляется при изменении вопроса, его ответов и голосов. Тренды и облако тегов на странице вопроса
+# могут отставать на SIDEBAR_TIMEOUT секунд, смена аватарки автора - до следующего изменения вопроса
+CONDITIONAL_GET = {
+    'ENABLED': True,
+    'SIDEBAR_TIMEOUT': 60,
+}
+
+# Списки API (index, поиск, ответы) сериализуются по строкам .values() без создания моделей и полей DRF на строку,
+# вывод тот же. False - обычные сериализаторы для запросов без ?fields= и ?include=
+API_FAST_LISTS = True
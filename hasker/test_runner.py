@@ -0,0 +1,25 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class HaskerTestRunner(DiscoverRunner):
+    """
+    Кэш страниц, кэш результатов поиска и кэш id тегов переживают откат транзакций между тестами
+    и подменили бы ответы, поэтому в тестах они включаются только явно.
+    Поисковый индекс пишется во временный каталог, а не в рабочий
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.PAGE_CACHE = dict(settings.PAGE_CACHE, ENABLED=False)
+        settings.SEARCH_CACHE = dict(settings.SEARCH_CACHE, ENABLED=False)
+        settings.TAG_CACHE = dict(settings.TAG_CACHE, ENABLED=False)
+        self._search_index_path = tempfile.mkdtemp(prefix='hasker-search-')
+        settings.SEARCH_INDEX_PATH = self._search_index_path
+
+    def teardown_test_environment(self, **kwargs):
+        shutil.rmtree(self._search_index_path, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
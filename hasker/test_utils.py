@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Подмешивается к TestCase: assertMaxQueries проверяет, что код укладывается
+    в бюджет запросов к БД, и при превышении выводит все выполненные запросы
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f'{number}. {query["sql"]}'
+                for number, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f'{executed} запросов при бюджете {budget}:\n{queries}')
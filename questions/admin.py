@@ -25,3 +25,18 @@ class AnswersAdmin(admin.ModelAdmin):
 @admin.register(AnswerVotes)
 class AnswersAdmin(admin.ModelAdmin):
     list_display = ('id', '__str__', 'create_date')
+
+
+@admin.register(Trends)
+class TrendsAdmin(admin.ModelAdmin):
+    list_display = ('question_id', '__str__', 'count')
+
+
+@admin.register(AnswerNotification)
+class AnswerNotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', '__str__', 'send_after', 'attempts', 'failed')
+
+
+@admin.register(TagStats)
+class TagStatsAdmin(admin.ModelAdmin):
+    list_display = ('tag_id', '__str__', 'vote_count', 'last_activity')
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class QuestionsConfig(AppConfig):
     name = 'questions'
+
+    def ready(self):
+        import questions.checks  # noqa: F401
+        import questions.signals  # noqa: F401
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Бэкенды кэша, которые другие процессы не видят
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_tag_cache(app_configs, **kwargs):
+    """Кэш id тегов сбрасывается через поколение в TAG_CACHE['CACHE'], поэтому оно должно быть общим"""
+    if not settings.TAG_CACHE.get('ENABLED', False):
+        return []
+    alias = settings.TAG_CACHE.get('CACHE', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        f'TAG_CACHE включен на кэше процесса {alias!r} ({backend})',
+        hint='Другие процессы не увидят сброс после удаления тега и вставят вопрос со ссылкой на его id. '
+             'Укажите в TAG_CACHE["CACHE"] общий бэкенд (memcached, redis) или выключите TAG_CACHE',
+        id='questions.W001',
+    )]
@@ -0,0 +1,43 @@
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from questions.models import Questions
+
+
+def conditional_get_enabled():
+    return settings.CONDITIONAL_GET.get('ENABLED', False)
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified по Questions.modified вопроса из kwargs['pk'].
+    Проверка стоит одного запроса; 304 отдается без выборки ответов, сериализатора и шаблона.
+    Представление оборачивает свой обработчик в conditional_get, get_etag_parts добавляет в ETag
+    то, от чего еще зависит ответ
+    """
+    last_modified_header = True
+
+    def get_etag_parts(self):
+        return ()
+
+    def conditional_get(self, request, render):
+        if request.method not in ('GET', 'HEAD') or not conditional_get_enabled():
+            return render()
+        modified = Questions.objects.filter(pk=self.kwargs.get('pk')).values_list('modified', flat=True).first()
+        if modified is None:
+            return render()
+        raw = '|'.join(map(str, (modified.isoformat(), *self.get_etag_parts())))
+        etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+        last_modified = int(modified.timestamp()) if self.last_modified_header else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+        if response.status_code not in (200, 304):
+            return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.cache import caches
+
+from questions.models import TagStats
+
+POPULAR_TAGS_KEY = 'tagstats:popular'
+
+
+def get_popular_tags():
+    """Облако тегов для боковой панели из TagStats, кэшируется на TAG_STATS['TIMEOUT'] секунд"""
+    options = settings.TAG_STATS
+    return caches[options.get('CACHE', 'default')].get_or_set(
+        POPULAR_TAGS_KEY,
+        lambda: list(TagStats.get_popular(options['LIMIT']).values('name', 'question_count')),
+        options['TIMEOUT'],
+    )
+
+
+def popular_tags(request):
+    # Шаблон вызовет функцию только при отрисовке блока, страницы без боковой панели кэш не трогают
+    return {'popular_tags': get_popular_tags}
@@ -0,0 +1,95 @@
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery, Sum, IntegerField, DateTimeField
+from django.db.models.functions import Coalesce, Greatest
+
+
+def _count_subquery(model, field):
+    """Подзапрос с количеством строк model, ссылающихся на внешнюю строку через field"""
+    queryset = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+    return Coalesce(
+        Subquery(queryset.annotate(total=Count('pk')).values('total'), output_field=IntegerField()),
+        0
+    )
+
+
+def recount_questions(question_ids=None, apps=global_apps):
+    """Пересчитывает счетчики голосов и ответов вопросов и их строки в трендах"""
+    Questions = apps.get_model('questions', 'Questions')
+    Answers = apps.get_model('questions', 'Answers')
+    QuestionVotes = apps.get_model('questions', 'QuestionVotes')
+    Trends = apps.get_model('questions', 'Trends')
+    questions = Questions.objects.all()
+    trends = Trends.objects.all()
+    if question_ids is not None:
+        questions = questions.filter(pk__in=question_ids)
+        trends = trends.filter(question_id__in=question_ids)
+    updated = questions.update(
+        vote_count=_count_subquery(QuestionVotes, 'question'),
+        answer_count=_count_subquery(Answers, 'question'),
+    )
+    trends.update(
+        count=Subquery(
+            Questions.objects.filter(pk=OuterRef('question_id')).values('vote_count')[:1]
+        )
+    )
+    tag_ids = None
+    if question_ids is not None:
+        tag_ids = Questions.tags.through.objects.filter(questions_id__in=question_ids).values('tags_id')
+    recount_tags(tag_ids, apps=apps)
+    return updated
+
+
+def recount_tags(tag_ids=None, apps=global_apps):
+    """Пересчитывает статистику тегов по связующей таблице, недостающие строки статистики создаются"""
+    try:
+        TagStats = apps.get_model('questions', 'TagStats')
+    except LookupError:
+        # Реестр миграций до появления статистики тегов
+        return 0
+    Tags = apps.get_model('questions', 'Tags')
+    QuestionVotes = apps.get_model('questions', 'QuestionVotes')
+    Link = apps.get_model('questions', 'Questions').tags.through
+    tags = Tags.objects.all() if tag_ids is None else Tags.objects.filter(pk__in=tag_ids)
+    TagStats.objects.bulk_create(
+        [TagStats(tag_id=pk, name=name) for pk, name in tags.filter(tagstats=None).values_list('pk', 'name')],
+        ignore_conflicts=True,
+    )
+    links = Link.objects.filter(tags_id=OuterRef('pk')).order_by().values('tags_id')
+    last_question = links.annotate(last=Max('questions__create_date')).values('last')
+    last_vote = QuestionVotes.objects.filter(
+        question__tags=OuterRef('pk'),
+    ).order_by().values('question__tags').annotate(last=Max('create_date')).values('last')
+    last_question = Subquery(last_question, output_field=DateTimeField())
+    last_vote = Subquery(last_vote, output_field=DateTimeField())
+    stats = TagStats.objects.all() if tag_ids is None else TagStats.objects.filter(tag_id__in=tag_ids)
+    return stats.update(
+        name=Subquery(Tags.objects.filter(pk=OuterRef('pk')).values('name')[:1]),
+        question_count=_count_subquery(Link, 'tags'),
+        vote_count=Coalesce(
+            Subquery(links.annotate(total=Sum('questions__vote_count')).values('total'), output_field=IntegerField()),
+            0
+        ),
+        last_activity=Greatest(Coalesce(last_vote, last_question), last_question),
+    )
+
+
+def recount_answers(answer_ids=None, apps=global_apps):
+    """Пересчитывает рейтинг ответов"""
+    Answers = apps.get_model('questions', 'Answers')
+    AnswerVotes = apps.get_model('questions', 'AnswerVotes')
+    answers = Answers.objects.all()
+    if answer_ids is not None:
+        answers = answers.filter(pk__in=answer_ids)
+    return answers.update(score=_count_subquery(AnswerVotes, 'answer'))
+
+
+def recount_counters(apps=global_apps):
+    """
+    Пересчитывает денормализованные счетчики вопросов, ответов, трендов и статистику тегов.
+    Принимает реестр моделей, чтобы работать и из миграций
+    """
+    with transaction.atomic():
+        questions = recount_questions(apps=apps)
+        answers = recount_answers(apps=apps)
+    return questions, answers
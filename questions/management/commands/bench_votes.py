@@ -0,0 +1,56 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from questions.models import Questions, QuestionVotes, Trends
+from questions.vote_buffer import VoteBuffer
+from questions.voting import write_question_vote
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает запись голосов по одному запросу на голос и через буфер отложенной записи'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--votes', type=int, default=1000, help='Количество голосов в каждом прогоне')
+        parser.add_argument('--batch', type=int, default=100, help='Размер пачки буфера')
+
+    def handle(self, *args, **options):
+        votes, batch = options['votes'], options['batch']
+        author = User.objects.create(username=f'bench_votes_{time.time_ns()}')
+        try:
+            direct = self._create_questions(author, votes)
+            buffered = self._create_questions(author, votes)
+
+            started = time.perf_counter()
+            for question_id in direct:
+                write_question_vote(author.pk, question_id, True)
+            direct_time = time.perf_counter() - started
+
+            buffer = VoteBuffer(flush_interval_ms=0, max_batch=batch)
+            started = time.perf_counter()
+            for question_id in buffered:
+                buffer.push(QuestionVotes, author.pk, question_id, True)
+            buffer.flush()
+            buffered_time = time.perf_counter() - started
+
+            written = QuestionVotes.objects.filter(author=author, question_id__in=buffered).count()
+            if written != votes:
+                self.stderr.write(f'Буфер записал {written} голосов из {votes}')
+        finally:
+            Questions.objects.filter(author=author).delete()
+            author.delete()
+
+        for name, elapsed in (('по одному', direct_time), (f'буфер, пачка {batch}', buffered_time)):
+            self.stdout.write(f'{name}: {elapsed:.3f} c, {votes / elapsed:.0f} голосов/с')
+        self.stdout.write(self.style.SUCCESS(f'Ускорение: {direct_time / buffered_time:.1f}x'))
+
+    @staticmethod
+    def _create_questions(author, count):
+        questions = Questions.objects.bulk_create(
+            Questions(title='bench', body='bench', author=author) for _ in range(count)
+        )
+        if not questions or questions[0].pk is None:
+            questions = Questions.objects.filter(author=author).order_by('-pk')[:count]
+        Trends.objects.bulk_create(Trends(question=question, title=question.title) for question in questions)
+        return [question.pk for question in questions]
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from questions.counters import recount_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает количество голосов и ответов у вопросов и рейтинг ответов'
+
+    def handle(self, *args, **options):
+        questions, answers = recount_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано вопросов: {questions}, ответов: {answers}'
+        ))
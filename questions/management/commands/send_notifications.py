@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from questions.notifications import send_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет накопившиеся уведомления о новых ответах дайджестами по вопросам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, а не одним проходом')
+        parser.add_argument('--interval', type=float, default=5, help='Пауза между проходами, с')
+        parser.add_argument('--batch', type=int, help='Максимум писем за одно SMTP-соединение')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_pending(batch=options['batch'])
+            if not options['loop']:
+                break
+            if not sent and not failed:
+                time.sleep(options['interval'])
+        self.stdout.write(f'Отправлено писем: {sent}, отложено до повторной попытки: {failed}')
@@ -0,0 +1,42 @@
+# Generated by Django 3.0.14 on 2026-10-18 13:36
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_trends(apps, schema_editor):
+    Questions = apps.get_model('questions', 'Questions')
+    Trends = apps.get_model('questions', 'Trends')
+    questions = Questions.objects.annotate(count=Count('questionvotes'))
+    Trends.objects.bulk_create(
+        Trends(question_id=question.id, title=question.title, count=question.count)
+        for question in questions
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0005_auto_20200906_1805'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trends',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='questions.Questions')),
+                ('title', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Trend',
+                'verbose_name_plural': 'Trends',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trends',
+            index=models.Index(fields=['-count'], name='questions_trends_count_idx'),
+        ),
+        migrations.RunPython(fill_trends, migrations.RunPython.noop),
+    ]
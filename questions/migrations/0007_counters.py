@@ -0,0 +1,49 @@
+# Generated by Django 3.0.14 on 2026-10-18 13:36
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    queryset = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+    return Coalesce(Subquery(queryset.annotate(total=Count('pk')).values('total'), output_field=IntegerField()), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Questions = apps.get_model('questions', 'Questions')
+    Answers = apps.get_model('questions', 'Answers')
+    Questions.objects.update(
+        vote_count=count_subquery(apps.get_model('questions', 'QuestionVotes'), 'question'),
+        answer_count=count_subquery(Answers, 'question'),
+    )
+    apps.get_model('questions', 'Trends').objects.update(
+        count=Subquery(Questions.objects.filter(pk=OuterRef('question_id')).values('vote_count')[:1])
+    )
+    Answers.objects.update(score=count_subquery(apps.get_model('questions', 'AnswerVotes'), 'answer'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0006_trends'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answers',
+            name='score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='questions',
+            name='answer_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='questions',
+            name='vote_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
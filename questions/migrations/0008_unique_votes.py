@@ -0,0 +1,46 @@
+# Generated by Django 3.0.14 on 2026-10-18 13:38
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    queryset = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+    return Coalesce(Subquery(queryset.annotate(total=Count('pk')).values('total'), output_field=IntegerField()), 0)
+
+
+def remove_duplicate_votes(apps, schema_editor):
+    for model_name, target in (('QuestionVotes', 'question'), ('AnswerVotes', 'answer')):
+        model = apps.get_model('questions', model_name)
+        keep = model.objects.values('author', target).annotate(keep_id=Min('id')).values_list('keep_id', flat=True)
+        model.objects.exclude(id__in=list(keep)).delete()
+    Questions = apps.get_model('questions', 'Questions')
+    Answers = apps.get_model('questions', 'Answers')
+    Questions.objects.update(
+        vote_count=count_subquery(apps.get_model('questions', 'QuestionVotes'), 'question'),
+        answer_count=count_subquery(Answers, 'question'),
+    )
+    apps.get_model('questions', 'Trends').objects.update(
+        count=Subquery(Questions.objects.filter(pk=OuterRef('question_id')).values('vote_count')[:1])
+    )
+    Answers.objects.update(score=count_subquery(apps.get_model('questions', 'AnswerVotes'), 'answer'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0007_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_votes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='answervotes',
+            constraint=models.UniqueConstraint(fields=('author', 'answer'), name='unique_answer_vote'),
+        ),
+        migrations.AddConstraint(
+            model_name='questionvotes',
+            constraint=models.UniqueConstraint(fields=('author', 'question'), name='unique_question_vote'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.0.14 on 2026-10-18 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0008_unique_votes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tags',
+            name='name',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='answers',
+            index=models.Index(fields=['question', '-create_date'], name='answers_question_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='answers',
+            index=models.Index(fields=['question', '-score', '-create_date'], name='answers_question_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questions',
+            index=models.Index(fields=['-create_date'], name='questions_create_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questions',
+            index=models.Index(fields=['-vote_count', '-create_date'], name='questions_popular_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.0.14 on 2026-10-18 13:55
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    Tags = apps.get_model('questions', 'Tags')
+    Questions = apps.get_model('questions', 'Questions')
+    Link = Questions.tags.through
+    groups = defaultdict(list)
+    for tag in Tags.objects.order_by('id'):
+        groups[' '.join(tag.name.split()).lower()].append(tag)
+    for name, (keep, *duplicates) in groups.items():
+        if duplicates:
+            duplicate_ids = [tag.id for tag in duplicates]
+            tagged = set(Link.objects.filter(tags_id=keep.id).values_list('questions_id', flat=True))
+            moved = set(Link.objects.filter(tags_id__in=duplicate_ids).values_list('questions_id', flat=True))
+            Link.objects.bulk_create(Link(questions_id=question_id, tags_id=keep.id) for question_id in moved - tagged)
+            Tags.objects.filter(id__in=duplicate_ids).delete()
+        if keep.name != name:
+            Tags.objects.filter(id=keep.id).update(name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0009_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tags',
+            name='name',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.0.14 on 2026-10-18 14:11
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_correct_answers(apps, schema_editor):
+    Answers = apps.get_model('questions', 'Answers')
+    Questions = apps.get_model('questions', 'Questions')
+    keep = Answers.objects.filter(correct=True).values('question').annotate(keep_id=Max('id')).values_list('keep_id', flat=True)
+    Answers.objects.filter(correct=True).exclude(id__in=list(keep)).update(correct=False)
+    correct = Answers.objects.filter(question=OuterRef('pk'), correct=True).values('id')[:1]
+    Questions.objects.update(correct_answer=Subquery(correct))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0010_unique_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questions',
+            name='correct_answer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='questions.Answers'),
+        ),
+        migrations.RunPython(fill_correct_answers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='answers',
+            constraint=models.UniqueConstraint(condition=models.Q(correct=True), fields=('question',), name='unique_correct_answer'),
+        ),
+    ]
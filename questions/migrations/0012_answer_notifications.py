@@ -0,0 +1,35 @@
+# Generated by Django 3.0.14 on 2026-10-18 14:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0011_correct_answer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerNotification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('link', models.CharField(max_length=200)),
+                ('create_date', models.DateTimeField(auto_now_add=True)),
+                ('send_after', models.DateTimeField()),
+                ('attempts', models.IntegerField(default=0)),
+                ('failed', models.BooleanField(default=False)),
+                ('answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='questions.Answers')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='questions.Questions')),
+            ],
+            options={
+                'verbose_name': 'Answer notification',
+                'verbose_name_plural': 'Answer notifications',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='answernotification',
+            index=models.Index(fields=['failed', 'send_after'], name='notifications_due_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.0.14 on 2026-10-18 14:20
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+import django.db.models.deletion
+
+
+def fill_tag_stats(apps, schema_editor):
+    Tags = apps.get_model('questions', 'Tags')
+    TagStats = apps.get_model('questions', 'TagStats')
+    QuestionVotes = apps.get_model('questions', 'QuestionVotes')
+    last_votes = dict(
+        QuestionVotes.objects.order_by().values('question__tags').annotate(last=Max('create_date')).values_list(
+            'question__tags', 'last',
+        )
+    )
+    tags = Tags.objects.annotate(
+        question_count=Count('questions'),
+        vote_count=Sum('questions__vote_count'),
+        last_question=Max('questions__create_date'),
+    ).values_list('pk', 'name', 'question_count', 'vote_count', 'last_question')
+    stats = []
+    for pk, name, question_count, vote_count, last_question in tags.iterator():
+        last_vote = last_votes.get(pk)
+        stats.append(TagStats(
+            tag_id=pk,
+            name=name,
+            question_count=question_count,
+            vote_count=vote_count or 0,
+            last_activity=max(last_vote, last_question) if last_vote and last_question else last_question,
+        ))
+    TagStats.objects.bulk_create(stats, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0012_answer_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagStats',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='questions.Tags')),
+                ('name', models.CharField(max_length=50)),
+                ('question_count', models.IntegerField(default=0)),
+                ('vote_count', models.IntegerField(default=0)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Tag stats',
+                'verbose_name_plural': 'Tag stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tagstats',
+            index=models.Index(fields=['-question_count', '-vote_count'], name='tagstats_popular_idx'),
+        ),
+        migrations.RunPython(fill_tag_stats, migrations.RunPython.noop),
+    ]
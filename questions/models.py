@@ -1,6 +1,60 @@
-from django.db import models
+from django.db import models, connections
 from django.contrib.auth.models import User
-from django.db.models import Count
+from django.db.models import F
+from django.utils import timezone
+
+
+class VotesManager(models.Manager):
+    """
+    Менеджер голосов: добавление и отзыв голоса выполняются одним запросом
+    и идемпотентны благодаря уникальному ограничению (author, объект голосования)
+    """
+
+    def _prepare(self, connection, fields):
+        opts = self.model._meta
+        columns, params, related = [], [], []
+        for name, value in fields.items():
+            field = opts.get_field(name)
+            value = field.get_db_prep_save(value, connection)
+            columns.append(connection.ops.quote_name(field.column))
+            params.append(value)
+            if field.is_relation:
+                related.append((field.related_model._meta, value))
+        return columns, params, related
+
+    def add_vote(self, **fields):
+        """
+        INSERT ... SELECT ... ON CONFLICT DO NOTHING, возвращает True, если голос добавлен.
+        Голос за несуществующий объект не вставляется
+        """
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        columns, params, related = self._prepare(connection, dict(fields, create_date=timezone.now()))
+        exists = [
+            f'EXISTS (SELECT 1 FROM {quote(opts.db_table)} WHERE {quote(opts.pk.column)} = %s)'
+            for opts, _ in related
+        ]
+        sql = 'INSERT INTO {table} ({columns}) SELECT {values} WHERE {exists} ON CONFLICT DO NOTHING'.format(
+            table=quote(self.model._meta.db_table),
+            columns=', '.join(columns),
+            values=', '.join(['%s'] * len(columns)),
+            exists=' AND '.join(exists),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [value for _, value in related])
+            return cursor.rowcount == 1
+
+    def remove_vote(self, **fields):
+        """Одиночный DELETE, возвращает True, если голос был удален"""
+        connection = connections[self.db]
+        columns, params, _ = self._prepare(connection, fields)
+        sql = 'DELETE FROM {table} WHERE {where}'.format(
+            table=connection.ops.quote_name(self.model._meta.db_table),
+            where=' AND '.join(f'{column} = %s' for column in columns),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount > 0
 
 
 class Tags(models.Model):
@@ -10,11 +64,45 @@ class Tags(models.Model):
         verbose_name = 'Tag'
         verbose_name_plural = 'Tags'
 
-    name = models.CharField(max_length=50)
+    name = models.CharField(max_length=50, unique=True)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.name = self.normalize(self.name)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def normalize(name):
+        """Имя тега без лишних пробелов в нижнем регистре"""
+        return ' '.join(name.split()).lower()
+
+    @classmethod
+    def parse_query(cls, query):
+        """Строка поиска по тегу: 'python' - точное совпадение, 'pyth*' - по префиксу"""
+        prefix = query.endswith('*')
+        return cls.normalize(query.rstrip('*')), prefix
+
+
+class QuestionsQuerySet(models.QuerySet):
+
+    def with_author_and_tags(self):
+        """Автор с профилем (для аватарки) и теги одним JOIN и одним дополнительным запросом на всю выборку"""
+        return self.select_related('author__userprofile').prefetch_related('tags')
+
+    def tagged(self, name, prefix=False):
+        """
+        Вопросы с тегом name (или тегом, начинающимся с name).
+        Отбор через подзапрос к связующей таблице не размножает вопросы с несколькими подходящими тегами
+        """
+        if prefix:
+            tags = Tags.objects.filter(name__gte=name, name__lt=name + '\U0010ffff')
+        else:
+            tags = Tags.objects.filter(name=name)
+        links = self.model.tags.through.objects.filter(tags__in=tags)
+        return self.filter(pk__in=links.values('questions_id'))
+
 
 class Questions(models.Model):
     """Модель для хранения вопросов"""
@@ -22,6 +110,10 @@ class Questions(models.Model):
     class Meta:
         verbose_name = 'Question'
         verbose_name_plural = 'Questions'
+        indexes = [
+            models.Index(fields=['-create_date'], name='questions_create_date_idx'),
+            models.Index(fields=['-vote_count', '-create_date'], name='questions_popular_idx'),
+        ]
 
     title = models.CharField(max_length=50, verbose_name='Заголовок')
     body = models.TextField(verbose_name='Текст вопроса')
@@ -31,13 +123,104 @@ class Questions(models.Model):
     )
     create_date = models.DateTimeField(auto_now_add=True)
     tags = models.ManyToManyField(Tags)
+    vote_count = models.IntegerField(default=0)
+    answer_count = models.IntegerField(default=0)
+    correct_answer = models.ForeignKey(
+        'Answers',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+    )
+    # Время последнего изменения вопроса, его ответов и голосов: по нему отдаются ETag и Last-Modified
+    modified = models.DateTimeField(auto_now=True)
+
+    objects = QuestionsQuerySet.as_manager()
 
     def __str__(self):
         return f'{self.title} {self.author.username}'
 
     @staticmethod
     def get_trends():
-        return Questions.objects.annotate(count=Count('questionvotes')).order_by('-count')[:20]
+        return Trends.objects.order_by('-count')[:20]
+
+    @staticmethod
+    def touch(question_ids):
+        """Отмечает изменение вопросов; question_ids - список id или подзапрос"""
+        Questions.objects.filter(pk__in=question_ids).update(modified=timezone.now())
+
+
+class Trends(models.Model):
+    """Материализованная таблица трендов, обновляется по событиям голосования"""
+
+    class Meta:
+        verbose_name = 'Trend'
+        verbose_name_plural = 'Trends'
+        indexes = [
+            models.Index(fields=['-count'], name='questions_trends_count_idx'),
+        ]
+
+    question = models.OneToOneField(
+        Questions,
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    title = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.title} ({self.count})'
+
+    @staticmethod
+    def shift(question_id, delta):
+        """Инкрементально изменяет счетчик голосов вопроса в трендах"""
+        Trends.objects.filter(question_id=question_id).update(count=F('count') + delta)
+
+
+class TagStats(models.Model):
+    """
+    Материализованная статистика тегов: число вопросов, сумма их голосов и время последней активности.
+    Обновляется по событиям создания вопросов и голосования, облако тегов не читает связующую таблицу
+    """
+
+    class Meta:
+        verbose_name = 'Tag stats'
+        verbose_name_plural = 'Tag stats'
+        indexes = [
+            models.Index(fields=['-question_count', '-vote_count'], name='tagstats_popular_idx'),
+        ]
+
+    tag = models.OneToOneField(
+        Tags,
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    name = models.CharField(max_length=50)
+    question_count = models.IntegerField(default=0)
+    vote_count = models.IntegerField(default=0)
+    last_activity = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.name} ({self.question_count})'
+
+    @staticmethod
+    def get_popular(limit=20):
+        return TagStats.objects.filter(question_count__gt=0).order_by('-question_count', '-vote_count')[:limit]
+
+    @staticmethod
+    def shift(tag_ids, questions=0, votes=0):
+        """Инкрементально меняет счетчики тегов и отмечает их активность"""
+        TagStats.objects.filter(tag_id__in=tag_ids).update(
+            question_count=F('question_count') + questions,
+            vote_count=F('vote_count') + votes,
+            last_activity=timezone.now(),
+        )
+
+    @staticmethod
+    def shift_votes(question_id, delta):
+        """Голос за вопрос меняет сумму голосов всех его тегов"""
+        links = Questions.tags.through.objects.filter(questions_id=question_id).values('tags_id')
+        TagStats.shift(links, votes=delta)
 
 
 class QuestionVotes(models.Model):
@@ -46,6 +229,11 @@ class QuestionVotes(models.Model):
     class Meta:
         verbose_name = 'Question vote'
         verbose_name_plural = 'Question votes'
+        constraints = [
+            models.UniqueConstraint(fields=['author', 'question'], name='unique_question_vote'),
+        ]
+
+    objects = VotesManager()
 
     author = models.ForeignKey(
         User,
@@ -67,6 +255,17 @@ class Answers(models.Model):
     class Meta:
         verbose_name = 'Answer'
         verbose_name_plural = 'Answers'
+        indexes = [
+            models.Index(fields=['question', '-create_date'], name='answers_question_date_idx'),
+            models.Index(fields=['question', '-score', '-create_date'], name='answers_question_score_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['question'],
+                condition=models.Q(correct=True),
+                name='unique_correct_answer',
+            ),
+        ]
 
     body = models.TextField(max_length=1000, verbose_name='Ваш ответ')
     author = models.ForeignKey(
@@ -79,6 +278,7 @@ class Answers(models.Model):
         Questions,
         on_delete=models.CASCADE,
     )
+    score = models.IntegerField(default=0)
 
     def __str__(self):
         return f'Answer of {self.author.username} from {self.create_date}'
@@ -89,6 +289,11 @@ class AnswerVotes(models.Model):
     class Meta:
         verbose_name = 'Answer vote'
         verbose_name_plural = 'Answer votes'
+        constraints = [
+            models.UniqueConstraint(fields=['author', 'answer'], name='unique_answer_vote'),
+        ]
+
+    objects = VotesManager()
 
     author = models.ForeignKey(
         User,
@@ -102,3 +307,34 @@ class AnswerVotes(models.Model):
 
     def __str__(self):
         return f"Answer votes by {self.author.username}"
+
+
+class AnswerNotification(models.Model):
+    """
+    Исходящее уведомление автору вопроса о новом ответе.
+    Запрос только ставит запись в очередь, письма отправляет команда send_notifications
+    """
+
+    class Meta:
+        verbose_name = 'Answer notification'
+        verbose_name_plural = 'Answer notifications'
+        indexes = [
+            models.Index(fields=['failed', 'send_after'], name='notifications_due_idx'),
+        ]
+
+    question = models.ForeignKey(
+        Questions,
+        on_delete=models.CASCADE,
+    )
+    answer = models.ForeignKey(
+        Answers,
+        on_delete=models.CASCADE,
+    )
+    link = models.CharField(max_length=200)
+    create_date = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField()
+    attempts = models.IntegerField(default=0)
+    failed = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f'Notification about answer {self.answer_id} to question {self.question_id}'
@@ -0,0 +1,111 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Min
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from questions.models import AnswerNotification
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_answer(answer, link):
+    """
+    Ставит в очередь уведомление автору вопроса о новом ответе.
+    Письмо уходит не раньше чем через DIGEST_DELAY секунд, чтобы ответы, пришедшие за это время, попали в один дайджест
+    """
+    if answer.author_id == answer.question.author_id:
+        return None
+    delay = timedelta(seconds=settings.NOTIFICATIONS['DIGEST_DELAY'])
+    return AnswerNotification.objects.create(
+        question_id=answer.question_id,
+        answer=answer,
+        link=link,
+        send_after=timezone.now() + delay,
+    )
+
+
+def build_digest(notifications):
+    """Одно письмо на все ответы к вопросу"""
+    question = notifications[0].question
+    if len(notifications) == 1:
+        subject = 'Получен ответ на ваш вопрос'
+    else:
+        subject = f'Получено ответов на ваш вопрос: {len(notifications)}'
+    lines = [f'На ваш вопрос «{question.title}» ответили:', '']
+    for notification in notifications:
+        answer = notification.answer
+        lines.append(f'{answer.author.username}: {Truncator(answer.body).chars(200)}')
+    lines += ['', f'Ссылка на ваш вопрос {notifications[-1].link}']
+    return EmailMessage(
+        subject=subject,
+        body='\n'.join(lines),
+        from_email=settings.NOTIFICATIONS['FROM_EMAIL'],
+        to=[question.author.email],
+    )
+
+
+def retry_later(notifications, now):
+    """Откладывает повторную отправку с экспоненциальной задержкой, после MAX_ATTEMPTS попыток сдается"""
+    options = settings.NOTIFICATIONS
+    attempts = max(notification.attempts for notification in notifications) + 1
+    AnswerNotification.objects.filter(id__in=[notification.id for notification in notifications]).update(
+        attempts=F('attempts') + 1,
+        send_after=now + timedelta(seconds=options['RETRY_DELAY'] * 2 ** (attempts - 1)),
+        failed=attempts >= options['MAX_ATTEMPTS'],
+    )
+
+
+def send_pending(batch=None, connection=None):
+    """
+    Отправляет одну пачку дайджестов через одно SMTP-соединение.
+    В дайджест вопроса попадают и те ответы, срок отправки которых еще не наступил.
+    Возвращает (отправлено писем, писем отложено до повторной попытки)
+    """
+    now = timezone.now()
+    batch = batch or settings.NOTIFICATIONS['BATCH']
+    due = AnswerNotification.objects.filter(failed=False, send_after__lte=now).values('question_id').annotate(
+        due=Min('send_after'),
+    ).order_by('due')[:batch]
+    question_ids = [row['question_id'] for row in due]
+    if not question_ids:
+        return 0, 0
+    groups = defaultdict(list)
+    pending = AnswerNotification.objects.filter(failed=False, question_id__in=question_ids).select_related(
+        'question__author', 'answer__author',
+    ).order_by('id')
+    for notification in pending:
+        groups[notification.question_id].append(notification)
+
+    sent_ids, sent, failed = [], 0, 0
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception:
+        logger.exception('Не удалось подключиться к почтовому серверу')
+        for notifications in groups.values():
+            retry_later(notifications, now)
+        return 0, len(groups)
+    try:
+        for notifications in groups.values():
+            ids = [notification.id for notification in notifications]
+            if not notifications[0].question.author.email:
+                sent_ids += ids
+                continue
+            try:
+                connection.send_messages([build_digest(notifications)])
+            except Exception:
+                logger.exception('Не удалось отправить уведомление по вопросу %s', notifications[0].question_id)
+                retry_later(notifications, now)
+                failed += 1
+            else:
+                sent_ids += ids
+                sent += 1
+    finally:
+        connection.close()
+    AnswerNotification.objects.filter(id__in=sent_ids).delete()
+    return sent, failed
@@ -0,0 +1,121 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+LISTING_SCOPE = 'listing'
+STATS_KEYS = ('pagecache:stats:hits', 'pagecache:stats:misses')
+
+
+def _cache():
+    return caches[settings.PAGE_CACHE.get('CACHE', 'default')]
+
+
+def page_cache_enabled():
+    return settings.PAGE_CACHE.get('ENABLED', False)
+
+
+def question_scope(question_id):
+    return f'question:{question_id}'
+
+
+def _version_key(scope):
+    return f'pagecache:version:{scope}'
+
+
+def invalidate(*scopes):
+    """
+    Сбрасывает кэш страниц указанных областей: у каждой области своя версия,
+    она входит в ключ страницы, поэтому смена версии делает старые записи недостижимыми
+    """
+    if scopes:
+        version = time.time_ns()
+        _cache().set_many({_version_key(scope): version for scope in scopes}, timeout=None)
+
+
+def invalidate_question(question_id, listing=True):
+    scopes = [question_scope(question_id)]
+    if listing:
+        scopes.append(LISTING_SCOPE)
+    invalidate(*scopes)
+
+
+def _page_key(request, scopes, variant):
+    cache = _cache()
+    version_keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(version_keys)
+    missing = {key: time.time_ns() for key in version_keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    query = '&'.join(sorted(request.GET.urlencode().split('&')))
+    raw = '|'.join([
+        *(str(versions[key]) for key in version_keys),
+        request.path,
+        query,
+        str(variant),
+    ])
+    return f'pagecache:page:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def _count(key):
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def page_cache_stats():
+    """Количество попаданий и промахов кэша страниц"""
+    values = _cache().get_many(STATS_KEYS)
+    hits, misses = (values.get(key, 0) for key in STATS_KEYS)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 3) if total else 0,
+    }
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кэш целых страниц для анонимных GET-запросов.
+    Ключ - путь, query string и вариант страницы (get_page_cache_variant),
+    плюс версии областей из get_page_cache_scopes для точечной инвалидации
+    """
+    page_cache_scopes = (LISTING_SCOPE,)
+
+    def get_page_cache_scopes(self):
+        return self.page_cache_scopes
+
+    def get_page_cache_variant(self):
+        return ''
+
+    def dispatch(self, request, *args, **kwargs):
+        if not page_cache_enabled() or request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = _page_key(request, self.get_page_cache_scopes(), self.get_page_cache_variant())
+        cached = _cache().get(key)
+        if cached is not None:
+            _count(STATS_KEYS[0])
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            response['X-Page-Cache'] = 'HIT'
+            return response
+        _count(STATS_KEYS[1])
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = settings.PAGE_CACHE.get('TIMEOUT', 60)
+
+            def store(rendered):
+                _cache().set(key, (rendered.content, rendered['Content-Type']), timeout)
+
+            if hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            response['X-Page-Cache'] = 'MISS'
+        return response
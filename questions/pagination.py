@@ -0,0 +1,150 @@
+import base64
+import json
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q, QuerySet
+from django.http import Http404
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def use_keyset(params):
+    """Keyset-пагинация включена в настройках или клиент передал курсор"""
+    return settings.PAGINATION_MODE == 'keyset' or 'cursor' in params
+
+
+class KeysetPage:
+    """Страница keyset-пагинации: без номера и общего количества, только соседние курсоры"""
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинация по ключу сортировки (sort key, id) вместо OFFSET.
+    Порядок берется из order_by выборки, первичный ключ добавляется для однозначности.
+    Курсор - непрозрачная строка со значениями ключа граничной строки и направлением
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.model = queryset.model
+        self.ordering = self._get_ordering(queryset)
+
+    def _get_ordering(self, queryset):
+        ordering = []
+        for item in queryset.query.order_by or self.model._meta.ordering or ['pk']:
+            if not isinstance(item, str):
+                raise ValueError('Keyset-пагинация поддерживает только сортировку по полям')
+            descending = item.startswith('-')
+            name = item.lstrip('-')
+            field = self.model._meta.pk if name == 'pk' else self.model._meta.get_field(name)
+            ordering.append((field, descending))
+        if not any(field.primary_key for field, _ in ordering):
+            ordering.append((self.model._meta.pk, ordering[-1][1]))
+        return ordering
+
+    def encode_cursor(self, obj, reverse):
+        if isinstance(obj, dict):
+            # строка выборки .values()
+            obj = SimpleNamespace(**{field.attname: obj[field.attname] for field, _ in self.ordering})
+        values = [field.value_to_string(obj) for field, _ in self.ordering]
+        data = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            if not isinstance(data['v'], list) or len(data['v']) != len(self.ordering):
+                raise ValueError
+            values = [field.to_python(value) for (field, _), value in zip(self.ordering, data['v'])]
+            if None in values:
+                # поля ключа сортировки не бывают NULL, а сравнение с None в _seek невозможно
+                raise ValueError
+            return values, bool(data['r'])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise InvalidCursor('Некорректный курсор')
+
+    def _seek(self, values, reverse):
+        condition = Q()
+        equal = {}
+        for (field, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{field.attname}__{lookup}': value})
+            equal[field.attname] = value
+        return condition
+
+    def _order_by(self, reverse):
+        return [
+            f'{"-" if descending != reverse else ""}{field.attname}'
+            for field, descending in self.ordering
+        ]
+
+    def page(self, cursor=None):
+        reverse = False
+        queryset = self.queryset
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._seek(values, reverse))
+        rows = list(queryset.order_by(*self._order_by(reverse))[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows, None, None)
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else bool(cursor)
+        return KeysetPage(
+            rows,
+            self.encode_cursor(rows[-1], False) if has_next else None,
+            self.encode_cursor(rows[0], True) if has_previous else None,
+        )
+
+
+class KeysetPaginationMixin:
+    """
+    Подмешивается к ListView: в keyset-режиме страница строится по курсору,
+    в контекст добавляется флаг keyset для шаблона пагинации.
+    Результаты, которые не являются QuerySet (например, ранжированный поиск), листаются по номеру страницы
+    """
+    keyset = False
+
+    def paginate_queryset(self, queryset, page_size):
+        self.keyset = use_keyset(self.request.GET) and isinstance(queryset, QuerySet)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, page_size)
+        try:
+            page = KeysetPaginator(queryset, page_size).page(self.request.GET.get('cursor'))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['keyset'] = self.keyset
+        return context
@@ -0,0 +1,158 @@
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from questions.counters import recount_tags
+from questions.models import Questions, QuestionVotes, Trends, Answers, AnswerVotes, Tags, TagStats
+from questions.page_cache import invalidate, invalidate_question, question_scope, LISTING_SCOPE
+from questions.tags import get_tag_ids
+
+
+@receiver(post_save, sender=Questions)
+def create_trend(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Каждый новый вопрос попадает в таблицу трендов с нулевым счетчиком, правка заголовка копируется в тренды"""
+    if raw:
+        return
+    if created:
+        Trends.objects.create(question=instance, title=instance.title)
+    elif update_fields is None or 'title' in update_fields:
+        Trends.objects.filter(question_id=instance.pk).update(title=instance.title)
+
+
+@receiver(post_save, sender=QuestionVotes)
+def increase_trend(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Trends.shift(instance.question_id, 1)
+
+
+@receiver(post_delete, sender=QuestionVotes)
+def decrease_trend(sender, instance, **kwargs):
+    Trends.shift(instance.question_id, -1)
+
+
+@receiver(post_save, sender=Questions)
+@receiver(post_delete, sender=Questions)
+def invalidate_question_page(sender, instance, **kwargs):
+    invalidate_question(instance.pk)
+
+
+@receiver(m2m_changed, sender=Questions.tags.through)
+def invalidate_question_tags(sender, instance, action, **kwargs):
+    if action.startswith('post_') and isinstance(instance, Questions):
+        invalidate_question(instance.pk)
+
+
+@receiver(post_save, sender=Answers)
+@receiver(post_delete, sender=Answers)
+@receiver(post_save, sender=QuestionVotes)
+@receiver(post_delete, sender=QuestionVotes)
+def invalidate_question_children(sender, instance, **kwargs):
+    invalidate_question(instance.question_id)
+
+
+@receiver(post_save, sender=AnswerVotes)
+@receiver(post_delete, sender=AnswerVotes)
+def invalidate_answer_vote(sender, instance, **kwargs):
+    question_id = Answers.objects.filter(pk=instance.answer_id).values_list('question_id', flat=True).first()
+    if question_id is not None:
+        invalidate_question(question_id, listing=False)
+
+
+@receiver(post_save, sender=Answers)
+@receiver(post_delete, sender=Answers)
+@receiver(post_save, sender=QuestionVotes)
+@receiver(post_delete, sender=QuestionVotes)
+def touch_question(sender, instance, signal, created=False, raw=False, **kwargs):
+    """Отмечает изменение вопроса и сдвигает его счетчик ответов или голосов тем же запросом"""
+    if raw:
+        return
+    changes = {'modified': timezone.now()}
+    delta = -1 if signal is post_delete else int(created)
+    if delta:
+        field = 'answer_count' if sender is Answers else 'vote_count'
+        changes[field] = F(field) + delta
+    Questions.objects.filter(pk=instance.question_id).update(**changes)
+
+
+@receiver(post_save, sender=AnswerVotes)
+@receiver(post_delete, sender=AnswerVotes)
+def touch_answer_question(sender, instance, signal, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    delta = -1 if signal is post_delete else int(created)
+    if delta:
+        Answers.objects.filter(pk=instance.answer_id).update(score=F('score') + delta)
+    Questions.touch(Answers.objects.filter(pk=instance.answer_id).values('question_id'))
+
+
+@receiver(m2m_changed, sender=Questions.tags.through)
+def touch_question_tags(sender, instance, action, reverse, **kwargs):
+    if action.startswith('post_') and not reverse:
+        Questions.touch([instance.pk])
+
+
+@receiver(post_save, sender=Tags)
+def touch_tag_questions(sender, instance, created, raw=False, **kwargs):
+    """Имя тега входит в ответ API по вопросу"""
+    if not created and not raw:
+        Questions.touch(Questions.tags.through.objects.filter(tags_id=instance.pk).values('questions_id'))
+
+
+@receiver(post_save, sender=Tags)
+@receiver(post_delete, sender=Tags)
+def invalidate_tag_pages(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    question_ids = Questions.tags.through.objects.filter(tags_id=instance.pk).values_list('questions_id', flat=True)
+    invalidate(LISTING_SCOPE, *(question_scope(question_id) for question_id in question_ids))
+
+
+@receiver(post_save, sender=Tags)
+@receiver(post_delete, sender=Tags)
+def reset_tag_ids(sender, instance, created=False, raw=False, **kwargs):
+    """Новый тег кэшу id не мешает, а после удаления или переименования имя может указывать на чужой id"""
+    if not created and not raw:
+        get_tag_ids().reset()
+
+
+@receiver(post_save, sender=Tags)
+def save_tag_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        TagStats.objects.bulk_create([TagStats(tag=instance, name=instance.name)], ignore_conflicts=True)
+    else:
+        TagStats.objects.filter(tag_id=instance.pk).update(name=instance.name)
+
+
+@receiver(post_save, sender=QuestionVotes)
+def increase_tag_votes(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        TagStats.shift_votes(instance.question_id, 1)
+
+
+@receiver(post_delete, sender=QuestionVotes)
+def decrease_tag_votes(sender, instance, **kwargs):
+    TagStats.shift_votes(instance.question_id, -1)
+
+
+@receiver(m2m_changed, sender=Questions.tags.through)
+def update_tag_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action.startswith('post_'):
+            recount_tags([instance.pk])
+    elif action == 'post_add':
+        TagStats.shift(pk_set, questions=1, votes=instance.vote_count)
+    elif action == 'post_remove':
+        TagStats.shift(pk_set, questions=-1, votes=-instance.vote_count)
+    elif action == 'pre_clear':
+        links = sender.objects.filter(questions_id=instance.pk).values('tags_id')
+        TagStats.shift(links, questions=-1, votes=-instance.vote_count)
+
+
+@receiver(pre_delete, sender=Questions)
+def remove_question_tag_stats(sender, instance, **kwargs):
+    """Связи с тегами удаляются каскадом без m2m_changed"""
+    links = Questions.tags.through.objects.filter(questions_id=instance.pk).values('tags_id')
+    TagStats.shift(links, questions=-1, votes=-instance.vote_count)
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from django.db.models.signals import post_save, m2m_changed
+
+from questions.models import Questions, Tags
+
+# Поколение растет при удалении и переименовании тегов, процессы по нему сбрасывают свой кэш
+GENERATION_KEY = 'tags:ids:generation'
+
+
+def _cache():
+    return caches[settings.TAG_CACHE.get('CACHE', 'default')]
+
+
+def tag_cache_enabled():
+    return settings.TAG_CACHE.get('ENABLED', False)
+
+
+class TagIdCache:
+    """LRU-кэш процесса: имя тега -> id"""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._ids = OrderedDict()
+        self.generation = None
+
+    def get_many(self, names):
+        generation = _cache().get(GENERATION_KEY)
+        with self._lock:
+            if generation != self.generation:
+                self._ids.clear()
+                self.generation = generation
+            found = {}
+            for name in names:
+                pk = self._ids.get(name)
+                if pk is not None:
+                    self._ids.move_to_end(name)
+                    found[name] = pk
+            return found
+
+    def set_many(self, ids):
+        with self._lock:
+            for name, pk in ids.items():
+                self._ids[name] = pk
+                self._ids.move_to_end(name)
+            while len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+
+    def reset(self):
+        _cache().set(GENERATION_KEY, time.time_ns(), None)
+
+
+_tag_ids = None
+
+
+def get_tag_ids():
+    global _tag_ids
+    if _tag_ids is None:
+        _tag_ids = TagIdCache(settings.TAG_CACHE.get('SIZE', 10000))
+    return _tag_ids
+
+
+def resolve_tags(names):
+    """
+    id тегов по именам из формы: имена нормализуются, пустые и повторы отбрасываются.
+    Теги из кэша процесса не стоят ни одного запроса, остальные читаются одним запросом,
+    а отсутствующие создаются одним bulk_create(ignore_conflicts=True) - параллельное создание того же тега не падает
+    """
+    names = list(dict.fromkeys(filter(None, map(Tags.normalize, names))))
+    ids = get_tag_ids().get_many(names) if tag_cache_enabled() else {}
+    missing = [name for name in names if name not in ids]
+    if missing:
+        found = dict(Tags.objects.filter(name__in=missing).values_list('name', 'pk'))
+        new = [name for name in missing if name not in found]
+        if new:
+            Tags.objects.bulk_create([Tags(name=name) for name in new], ignore_conflicts=True)
+            using = router.db_for_write(Tags)
+            for tag in Tags.objects.filter(name__in=new):
+                # bulk_create не шлет post_save, а на нем держатся автодополнение и нечеткий поиск тегов
+                post_save.send(sender=Tags, instance=tag, created=True, update_fields=None, raw=False, using=using)
+                found[tag.name] = tag.pk
+        if tag_cache_enabled():
+            get_tag_ids().set_many(found)
+        ids.update(found)
+    return [ids[name] for name in names]
+
+
+def add_question_tags(question, names):
+    """Проставляет вопросу теги одной пачкой вставок в связующую таблицу"""
+    tag_ids = resolve_tags(names)
+    if not tag_ids:
+        return []
+    through = Questions.tags.through
+    using = router.db_for_write(through)
+    signal = dict(sender=through, instance=question, reverse=False, model=Tags, pk_set=set(tag_ids), using=using)
+    m2m_changed.send(action='pre_add', **signal)
+    through.objects.bulk_create(
+        [through(questions_id=question.pk, tags_id=tag_id) for tag_id in tag_ids],
+        ignore_conflicts=True,
+    )
+    m2m_changed.send(action='post_add', **signal)
+    return tag_ids
@@ -0,0 +1,12 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor):
+    """Текущий query string с подставленным курсором вместо номера страницы"""
+    params = context['request'].GET.copy()
+    params.pop('page', None)
+    params['cursor'] = cursor
+    return f'?{params.urlencode()}'
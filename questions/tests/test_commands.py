@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from questions.models import Questions, QuestionVotes, Answers, AnswerVotes, Trends
+
+
+class RecountCountersCommandTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='test_user')
+        question = Questions.objects.create(
+            title='title test',
+            body='test body',
+            author=user,
+        )
+        answer = Answers.objects.create(
+            body='test body',
+            author=user,
+            correct=False,
+            question=question,
+        )
+        QuestionVotes.objects.create(author=user, question=question)
+        AnswerVotes.objects.create(author=user, answer=answer)
+        Questions.objects.update(vote_count=10, answer_count=10)
+        Answers.objects.update(score=10)
+        Trends.objects.update(count=10)
+
+    def test_recount_counters(self):
+        call_command('recount_counters', stdout=StringIO())
+        question = Questions.objects.get()
+        self.assertEqual(question.vote_count, 1)
+        self.assertEqual(question.answer_count, 1)
+        self.assertEqual(Answers.objects.get().score, 1)
+        self.assertEqual(Trends.objects.get().count, 1)
+
+
+class BenchVotesCommandTest(TestCase):
+
+    def test_bench_votes(self):
+        out = StringIO()
+        call_command('bench_votes', votes=10, batch=5, stdout=out)
+        self.assertIn('Ускорение', out.getvalue())
+        self.assertEqual(Questions.objects.count(), 0)
+        self.assertEqual(User.objects.count(), 0)
@@ -0,0 +1,117 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from questions.models import Questions, Answers, Tags
+from questions.voting import write_question_vote, write_answer_vote, set_correct_answer
+
+
+class QuestionModifiedTest(TestCase):
+    """Questions.modified меняется при любой записи, от которой зависит страница вопроса"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user', password='test')
+        cls.question = Questions.objects.create(title='first', body='test body', author=cls.user)
+        cls.answer = Answers.objects.create(body='test body', author=cls.user, correct=False, question=cls.question)
+
+    def assertTouched(self, write):
+        before = Questions.objects.get(pk=self.question.pk).modified
+        write()
+        self.assertGreater(Questions.objects.get(pk=self.question.pk).modified, before)
+
+    def test_answer(self):
+        self.assertTouched(lambda: Answers.objects.create(
+            body='second', author=self.user, correct=False, question=self.question,
+        ))
+
+    def test_votes(self):
+        self.assertTouched(lambda: write_question_vote(self.user.pk, self.question.pk, True))
+        self.assertTouched(lambda: write_answer_vote(self.user.pk, self.answer.pk, True))
+        self.assertTouched(lambda: write_answer_vote(self.user.pk, self.answer.pk, False))
+
+    def test_correct_answer(self):
+        self.assertTouched(lambda: set_correct_answer(self.user, self.question.pk, self.answer.pk))
+
+    def test_tags(self):
+        tag = Tags.objects.create(name='python')
+        self.assertTouched(lambda: self.question.tags.add(tag))
+        tag.name = 'django'
+        self.assertTouched(tag.save)
+
+
+class QuestionViewConditionalTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user', password='test')
+        cls.question = Questions.objects.create(title='first', body='test body', author=cls.user)
+        cls.url = reverse('questions:questionview', args=(cls.question.pk,))
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_new_answer(self):
+        etag = self.client.get(self.url)['ETag']
+        Answers.objects.create(body='test body', author=self.user, correct=False, question=self.question)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'test body')
+
+    def test_etag_per_user(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.login(username='test_user', password='test')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_missing_question(self):
+        response = self.client.get(reverse('questions:questionview', args=(100,)))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+    @override_settings(CONDITIONAL_GET={'ENABLED': False})
+    def test_disabled(self):
+        self.assertFalse(self.client.get(self.url).has_header('ETag'))
+
+
+class ApiConditionalTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user', password='test')
+        cls.question = Questions.objects.create(title='first', body='test body', author=cls.user)
+        cls.answer = Answers.objects.create(body='test body', author=cls.user, correct=False, question=cls.question)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_question_not_modified(self):
+        url = reverse('api:getquestion', args=(self.question.pk,))
+        response = self.client.get(url)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+        write_question_vote(self.user.pk, self.question.pk, True)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_answers_not_modified(self):
+        url = reverse('api:getanswers', args=(self.question.pk,))
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        set_correct_answer(self.user, self.question.pk, self.answer.pk)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['results'][0]['correct'])
+
+    def test_unauthorized(self):
+        url = reverse('api:getquestion', args=(self.question.pk,))
+        etag = self.client.get(url)['ETag']
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 401)
@@ -1,8 +1,9 @@
 import factory
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 from django.contrib.auth.models import User
 
-from questions.models import Tags, Questions, QuestionVotes, Answers, AnswerVotes
+from questions.models import Tags, Questions, QuestionVotes, Answers, AnswerVotes, Trends
 
 
 class TagFactory(factory.django.DjangoModelFactory):
@@ -44,14 +45,42 @@ class TagsModelTest(TestCase):
         TagFactory(name='Python')
 
     def test_tag_label(self):
-        tag = Tags.objects.get(name='Python')
+        tag = Tags.objects.get(name='python')
         field_label = tag._meta.get_field('name').verbose_name
         self.assertEqual(field_label, 'name')
 
     def test_tag_str(self):
-        tag = Tags.objects.get(name='Python')
+        tag = Tags.objects.get(name='python')
         str_tag = str(tag)
-        self.assertEqual('Python', str_tag)
+        self.assertEqual('python', str_tag)
+
+    def test_tag_name_normalized(self):
+        tag = TagFactory(name='  Django   REST ')
+        self.assertEqual(tag.name, 'django rest')
+
+    def test_parse_query(self):
+        self.assertEqual(Tags.parse_query(' Python '), ('python', False))
+        self.assertEqual(Tags.parse_query('Py*'), ('py', True))
+
+
+class TaggedQuestionsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        python = TagFactory(name='python')
+        pytest = TagFactory(name='pytest')
+        user = UserFactory(username='Test_user')
+        cls.both = QuestionFactory(title='both', author=user)
+        cls.both.tags.add(python, pytest)
+        cls.other = QuestionFactory(title='other', author=user)
+        cls.other.tags.add(TagFactory(name='cpython'))
+
+    def test_exact(self):
+        self.assertEqual(list(Questions.objects.tagged('python')), [self.both])
+        self.assertFalse(Questions.objects.tagged('pyth').exists())
+
+    def test_prefix_without_duplicates(self):
+        self.assertEqual(list(Questions.objects.tagged('py', prefix=True)), [self.both])
 
 
 class QuestionsModelTest(TestCase):
@@ -184,3 +213,108 @@ class AnswerVotesModelTest(TestCase):
     def test_answer_votes_str(self):
         vote = AnswerVotes.objects.get(id=1)
         self.assertEqual(str(vote), 'Answer votes by Test_user')
+
+
+class TrendsModelTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = UserFactory(username='Test_user')
+        second_user = UserFactory(username='Second_user')
+        cls.question = QuestionFactory(title='Popular', author=user)
+        QuestionFactory(title='Unpopular', author=user)
+        QuestionVoteFactory(author=user, question=cls.question)
+        QuestionVoteFactory(author=second_user, question=cls.question)
+
+    def test_trend_created_with_question(self):
+        self.assertEqual(Trends.objects.count(), 2)
+        self.assertEqual(Trends.objects.get(title='Unpopular').count, 0)
+
+    def test_trend_increased_on_vote(self):
+        self.assertEqual(Trends.objects.get(question=self.question).count, 2)
+
+    def test_trend_decreased_on_unvote(self):
+        QuestionVotes.objects.filter(question=self.question).first().delete()
+        self.assertEqual(Trends.objects.get(question=self.question).count, 1)
+
+    def test_trend_title_follows_question(self):
+        self.question.title = 'Renamed'
+        self.question.save()
+        self.assertEqual(Trends.objects.get(question=self.question).title, 'Renamed')
+        self.assertEqual([trend.title for trend in Questions.get_trends()], ['Renamed', 'Unpopular'])
+
+    def test_get_trends_order(self):
+        trends = Questions.get_trends()
+        self.assertEqual([trend.title for trend in trends], ['Popular', 'Unpopular'])
+
+
+class CountersModelTest(TestCase):
+    """Счетчики вопросов и ответов следуют за записями через ORM (админка, shell)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(username='Test_user')
+        cls.question = QuestionFactory(author=cls.user)
+        cls.answer = AnswersFactory(author=cls.user, question=cls.question)
+
+    def counters(self):
+        question = Questions.objects.get(pk=self.question.pk)
+        return question.vote_count, question.answer_count, Answers.objects.get(pk=self.answer.pk).score
+
+    def test_counters_on_create(self):
+        QuestionVoteFactory(author=self.user, question=self.question)
+        AnswerVotesFactory(author=self.user, answer=self.answer)
+        AnswersFactory(author=self.user, question=self.question, correct=False)
+        self.assertEqual(self.counters(), (1, 2, 1))
+
+    def test_counters_on_delete(self):
+        QuestionVoteFactory(author=self.user, question=self.question)
+        AnswerVotesFactory(author=self.user, answer=self.answer)
+        QuestionVotes.objects.get().delete()
+        AnswerVotes.objects.get().delete()
+        AnswersFactory(author=self.user, question=self.question, correct=False).delete()
+        self.assertEqual(self.counters(), (0, 1, 0))
+
+    def test_counters_on_update(self):
+        self.answer.body = 'edited'
+        self.answer.save()
+        self.assertEqual(self.counters(), (0, 1, 0))
+
+
+class VotesManagerTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory(username='Test_user')
+        cls.question = QuestionFactory(author=cls.user)
+        cls.answer = AnswersFactory(author=cls.user, question=cls.question)
+
+    def test_add_question_vote_idempotent(self):
+        self.assertTrue(QuestionVotes.objects.add_vote(author_id=self.user.pk, question_id=self.question.pk))
+        self.assertFalse(QuestionVotes.objects.add_vote(author_id=self.user.pk, question_id=self.question.pk))
+        self.assertEqual(QuestionVotes.objects.filter(question=self.question).count(), 1)
+
+    def test_add_vote_missing_question(self):
+        self.assertFalse(QuestionVotes.objects.add_vote(author_id=self.user.pk, question_id=100))
+        self.assertEqual(QuestionVotes.objects.count(), 0)
+
+    def test_remove_question_vote(self):
+        QuestionVoteFactory(author=self.user, question=self.question)
+        self.assertTrue(QuestionVotes.objects.remove_vote(author_id=self.user.pk, question_id=self.question.pk))
+        self.assertFalse(QuestionVotes.objects.remove_vote(author_id=self.user.pk, question_id=self.question.pk))
+        self.assertEqual(QuestionVotes.objects.count(), 0)
+
+    def test_add_answer_vote_idempotent(self):
+        self.assertTrue(AnswerVotes.objects.add_vote(author_id=self.user.pk, answer_id=self.answer.pk))
+        self.assertFalse(AnswerVotes.objects.add_vote(author_id=self.user.pk, answer_id=self.answer.pk))
+        self.assertEqual(AnswerVotes.objects.count(), 1)
+
+    def test_question_vote_unique(self):
+        QuestionVoteFactory(author=self.user, question=self.question)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            QuestionVoteFactory(author=self.user, question=self.question)
+
+    def test_answer_vote_unique(self):
+        AnswerVotesFactory(author=self.user, answer=self.answer)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AnswerVotesFactory(author=self.user, answer=self.answer)
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from questions.models import Questions, Answers, AnswerNotification
+from questions.notifications import enqueue_answer, send_pending
+
+NOTIFICATIONS = {
+    'FROM_EMAIL': 'info@homework.ru',
+    'DIGEST_DELAY': 0,
+    'RETRY_DELAY': 60,
+    'MAX_ATTEMPTS': 2,
+    'BATCH': 100,
+}
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@override_settings(NOTIFICATIONS=NOTIFICATIONS)
+class AnswerNotificationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author', password='test', email='author@example.com')
+        cls.user = User.objects.create_user(username='test_user', password='test', email='user@example.com')
+        cls.question = Questions.objects.create(title='test', body='test body', author=cls.author)
+
+    def answer(self, body='test answer', question=None):
+        answer = Answers.objects.create(
+            body=body,
+            author=self.user,
+            correct=False,
+            question=question or self.question,
+        )
+        enqueue_answer(answer, 'http://testserver/question/1/')
+        return answer
+
+    def test_answer_only_enqueues(self):
+        self.client.login(username='test_user', password='test')
+        self.client.post(reverse('questions:questionview', args=(self.question.pk,)), {'body': 'new answer'})
+        self.assertEqual(len(mail.outbox), 0)
+        notification = AnswerNotification.objects.get()
+        self.assertEqual(notification.question, self.question)
+        self.assertEqual(notification.link, 'http://testserver' + reverse('questions:questionview', args=(self.question.pk,)))
+
+    def test_own_answer_not_enqueued(self):
+        self.client.login(username='author', password='test')
+        self.client.post(reverse('questions:questionview', args=(self.question.pk,)), {'body': 'new answer'})
+        self.assertFalse(AnswerNotification.objects.exists())
+
+    def test_digest_to_question_author(self):
+        self.answer('first answer')
+        self.answer('second answer')
+        self.assertEqual(send_pending(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['author@example.com'])
+        self.assertIn('first answer', mail.outbox[0].body)
+        self.assertIn('second answer', mail.outbox[0].body)
+        self.assertFalse(AnswerNotification.objects.exists())
+
+    def test_waits_for_digest_delay(self):
+        self.answer()
+        AnswerNotification.objects.update(send_after=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(send_pending(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(EMAIL_BACKEND='questions.tests.test_notifications.CountingBackend')
+    def test_single_connection(self):
+        for i in range(3):
+            question = Questions.objects.create(title=f'test {i}', body='test body', author=self.author)
+            self.answer(question=question)
+        CountingBackend.opened = 0
+        self.assertEqual(send_pending(), (3, 0))
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(EMAIL_BACKEND='questions.tests.test_notifications.FailingBackend')
+    def test_retry_with_backoff(self):
+        self.answer()
+        with self.assertLogs('questions.notifications', 'ERROR'):
+            self.assertEqual(send_pending(), (0, 1))
+        notification = AnswerNotification.objects.get()
+        self.assertEqual(notification.attempts, 1)
+        self.assertFalse(notification.failed)
+        self.assertGreater(notification.send_after, timezone.now() + timedelta(seconds=50))
+        AnswerNotification.objects.update(send_after=timezone.now())
+        with self.assertLogs('questions.notifications', 'ERROR'):
+            send_pending()
+        notification.refresh_from_db()
+        self.assertEqual(notification.attempts, 2)
+        self.assertTrue(notification.failed)
+        self.assertEqual(send_pending(), (0, 0))
+
+    def test_command(self):
+        self.answer()
+        out = StringIO()
+        call_command('send_notifications', stdout=out)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Отправлено писем: 1', out.getvalue())
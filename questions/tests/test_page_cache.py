@@ -0,0 +1,112 @@
+import base64
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from questions.models import Questions, Answers, Tags
+from questions.page_cache import page_cache_stats
+from questions.tests.test_views import TEST_IMAGE
+from questions.voting import write_question_vote, write_answer_vote
+from registration.models import UserProfile
+
+
+@override_settings(PAGE_CACHE={'ENABLED': True, 'CACHE': 'default', 'TIMEOUT': 60})
+class AnonymousPageCacheTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='test_user',
+            password='test',
+        )
+        photo = SimpleUploadedFile(
+            content=(base64.b64decode(TEST_IMAGE)),
+            name='tempfile.png',
+            content_type='image/png',
+        )
+        UserProfile.objects.create(
+            user=cls.user,
+            photo=photo
+        )
+        cls.question = Questions.objects.create(title='first', body='test body', author=cls.user)
+        cls.other = Questions.objects.create(title='second', body='test body', author=cls.user)
+        cls.answer = Answers.objects.create(body='test body', author=cls.user, correct=False, question=cls.question)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url):
+        return self.client.get(url)['X-Page-Cache']
+
+    def test_second_request_hit(self):
+        url = reverse('questions:questionview', args=(self.question.pk,))
+        self.assertEqual(self.get(url), 'MISS')
+        self.assertEqual(self.get(url), 'HIT')
+        self.assertEqual(page_cache_stats()['hits'], 1)
+        self.assertEqual(page_cache_stats()['misses'], 1)
+
+    def test_query_string_in_key(self):
+        url = reverse('questions:searchresult')
+        self.assertEqual(self.get(url + '?search=first'), 'MISS')
+        self.assertEqual(self.get(url + '?search=second'), 'MISS')
+        self.assertEqual(self.get(url + '?search=first'), 'HIT')
+
+    def test_order_variant(self):
+        url = reverse('questions:index')
+        self.assertEqual(self.get(url + '?order=date'), 'MISS')
+        self.assertEqual(self.get(url), 'MISS')
+        self.assertEqual(self.get(url), 'HIT')
+
+    def test_authenticated_not_cached(self):
+        self.client.login(username='test_user', password='test')
+        url = reverse('questions:questionview', args=(self.question.pk,))
+        self.client.get(url)
+        self.assertFalse(self.client.get(url).has_header('X-Page-Cache'))
+
+    def test_question_vote_invalidates_question_and_listing_only(self):
+        question_url = reverse('questions:questionview', args=(self.question.pk,))
+        other_url = reverse('questions:questionview', args=(self.other.pk,))
+        index_url = reverse('questions:index')
+        for url in (question_url, other_url, index_url):
+            self.get(url)
+        write_question_vote(self.user.pk, self.question.pk, True)
+        self.assertEqual(self.get(question_url), 'MISS')
+        self.assertEqual(self.get(index_url), 'MISS')
+        self.assertEqual(self.get(other_url), 'HIT')
+
+    def test_answer_vote_invalidates_question_page(self):
+        question_url = reverse('questions:questionview', args=(self.question.pk,))
+        index_url = reverse('questions:index')
+        self.get(question_url)
+        self.get(index_url)
+        write_answer_vote(self.user.pk, self.answer.pk, True)
+        self.assertEqual(self.get(question_url), 'MISS')
+        self.assertEqual(self.get(index_url), 'HIT')
+
+    def test_new_answer_invalidates(self):
+        question_url = reverse('questions:questionview', args=(self.question.pk,))
+        self.get(question_url)
+        Answers.objects.create(body='new', author=self.user, correct=False, question=self.question)
+        self.assertEqual(self.get(question_url), 'MISS')
+
+    def test_tag_change_invalidates(self):
+        tag = Tags.objects.create(name='python')
+        question_url = reverse('questions:questionview', args=(self.question.pk,))
+        other_url = reverse('questions:questionview', args=(self.other.pk,))
+        self.question.tags.add(tag)
+        self.get(question_url)
+        self.get(other_url)
+        tag.name = 'django'
+        tag.save()
+        self.assertEqual(self.get(question_url), 'MISS')
+        self.assertEqual(self.get(other_url), 'HIT')
+
+    def test_stats_api(self):
+        admin = User.objects.create_superuser('admin', 'admin@test.com', 'admin')
+        self.client.force_login(admin)
+        resp = self.client.get(reverse('api:pagecachestats'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('hit_ratio', resp.json())
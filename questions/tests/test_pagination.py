@@ -0,0 +1,158 @@
+import base64
+import json
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from questions.models import Questions, Tags
+from questions.pagination import KeysetPaginator, InvalidCursor
+from questions.tests.test_views import TEST_IMAGE
+from registration.models import UserProfile
+
+
+def forged_cursor(*values):
+    """Правильно закодированный курсор с произвольными значениями ключа"""
+    data = json.dumps({'v': list(values), 'r': False})
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+class KeysetPaginatorTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='test_user')
+        for i in range(25):
+            Questions.objects.create(
+                title=f'title test {i}',
+                body='test body',
+                author=user,
+                vote_count=i % 3,
+            )
+
+    def walk(self, queryset, per_page):
+        paginator = KeysetPaginator(queryset, per_page)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def test_forward_matches_offset_order(self):
+        queryset = Questions.objects.order_by('-vote_count', '-create_date', '-id')
+        _, pages = self.walk(queryset, 7)
+        self.assertEqual([len(page) for page in pages], [7, 7, 7, 4])
+        ids = [question.id for page in pages for question in page]
+        self.assertEqual(ids, list(queryset.values_list('id', flat=True)))
+
+    def test_backward(self):
+        queryset = Questions.objects.order_by('-vote_count', '-create_date')
+        paginator, pages = self.walk(queryset, 7)
+        self.assertFalse(pages[0].has_previous())
+        previous = paginator.page(pages[2].previous_cursor)
+        self.assertEqual(list(previous), list(pages[1]))
+        first = paginator.page(pages[1].previous_cursor)
+        self.assertEqual(list(first), list(pages[0]))
+        self.assertFalse(first.has_previous())
+
+    def test_ascending_order(self):
+        queryset = Questions.objects.order_by('create_date')
+        _, pages = self.walk(queryset, 10)
+        ids = [question.id for page in pages for question in page]
+        self.assertEqual(ids, sorted(ids))
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPaginator(Questions.objects.order_by('-create_date'), 10)
+        with self.assertRaises(InvalidCursor):
+            paginator.page('garbage')
+
+    def test_cursor_with_wrong_types(self):
+        paginator = KeysetPaginator(Questions.objects.order_by('-vote_count', '-create_date'), 10)
+        cursors = (
+            forged_cursor('x', 'y', 'z'), forged_cursor('1', 'y', '1'), forged_cursor('1', None, 'z'),
+            forged_cursor('1', None, '1'), forged_cursor(None, None, None), forged_cursor('1', '2'),
+            base64.urlsafe_b64encode(b'{"v":"1","r":false}').decode(),
+            base64.urlsafe_b64encode(b'[1,2]').decode(),
+        )
+        for cursor in cursors:
+            with self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+
+@override_settings(PAGINATION_MODE='keyset')
+class KeysetViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(
+            username='test_user',
+            password='test',
+        )
+        photo = SimpleUploadedFile(
+            content=(base64.b64decode(TEST_IMAGE)),
+            name='tempfile.png',
+            content_type='image/png',
+        )
+        UserProfile.objects.create(
+            user=user,
+            photo=photo
+        )
+        tag = Tags.objects.create(name='test')
+        for i in range(25):
+            question = Questions.objects.create(
+                title=f'title test {i}',
+                body='test body',
+                author=user,
+            )
+            question.tags.add(tag)
+
+    def test_index_keyset_pages(self):
+        resp = self.client.get(reverse('questions:index'))
+        self.assertTrue(resp.context['keyset'])
+        self.assertEqual(len(resp.context['object_list']), 20)
+        page = resp.context['page_obj']
+        self.assertFalse(page.has_previous())
+        resp = self.client.get(reverse('questions:index') + f'?cursor={page.next_cursor}')
+        self.assertEqual(len(resp.context['object_list']), 5)
+        self.assertFalse(resp.context['page_obj'].has_next())
+
+    def test_index_keyset_invalid_cursor(self):
+        resp = self.client.get(reverse('questions:index') + '?cursor=garbage')
+        self.assertEqual(resp.status_code, 404)
+
+    def test_keyset_cursor_with_wrong_types(self):
+        cursor = forged_cursor('x', 'y')
+        for query in (
+            f'?cursor={cursor}', f'?order=date&cursor={cursor}',
+            f'?cursor={forged_cursor("1", None, "1")}', f'?order=date&cursor={forged_cursor(None, None)}',
+        ):
+            resp = self.client.get(reverse('questions:index') + query)
+            self.assertEqual(resp.status_code, 404)
+        credentials = base64.b64encode(b'test_user:test').decode()
+        resp = self.client.get(
+            reverse('api:index') + f'?cursor={cursor}', HTTP_AUTHORIZATION=f'Basic {credentials}',
+        )
+        self.assertEqual(resp.status_code, 404)
+        resp = self.client.get(
+            reverse('api:index') + f'?cursor={forged_cursor(None, None)}', HTTP_AUTHORIZATION=f'Basic {credentials}',
+        )
+        self.assertEqual(resp.status_code, 404)
+
+    def test_search_falls_back_to_pages(self):
+        for search in ('test', 'tag:test'):
+            resp = self.client.get(reverse('questions:searchresult') + f'?search={search}')
+            self.assertFalse(resp.context['keyset'])
+            self.assertEqual(len(resp.context['object_list']), 20)
+            self.assertContains(resp, f'?search={search}&page=2')
+
+    def test_api_keyset(self):
+        credentials = base64.b64encode(b'test_user:test').decode()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Basic {credentials}'
+        data = json.loads(self.client.get(reverse('api:index')).content)
+        self.assertNotIn('count', data)
+        self.assertIsNone(data['previous'])
+        self.assertEqual(len(data['results']), 20)
+        data = json.loads(self.client.get(data['next']).content)
+        self.assertEqual(len(data['results']), 5)
+        self.assertIsNone(data['next'])
+        self.assertIsNotNone(data['previous'])
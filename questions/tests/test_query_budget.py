@@ -0,0 +1,73 @@
+import base64
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from hasker.test_utils import QueryBudgetMixin
+from questions.context_processors import get_popular_tags
+from questions.models import Questions, Answers, Tags
+from questions.tests.test_views import TEST_IMAGE
+from registration.models import UserProfile
+
+
+class ListingQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Количество запросов страниц не зависит от количества строк на странице"""
+
+    @classmethod
+    def setUpTestData(cls):
+        tags = [Tags.objects.create(name=f'tag{i}') for i in range(3)]
+        for i in range(20):
+            user = User.objects.create_user(
+                username=f'test_user_{i}',
+                password='test',
+            )
+            question = Questions.objects.create(
+                title=f'title test {i}',
+                body='test body',
+                author=user,
+            )
+            question.tags.add(*tags)
+            Answers.objects.create(
+                body='test body',
+                author=user,
+                correct=False,
+                question=Questions.objects.first(),
+            )
+        photo = SimpleUploadedFile(
+            content=(base64.b64decode(TEST_IMAGE)),
+            name='tempfile.png',
+            content_type='image/png',
+        )
+        UserProfile.objects.create(
+            user=User.objects.get(username='test_user_0'),
+            photo=photo
+        )
+
+    def setUp(self):
+        # Облако тегов кэшируется на TAG_STATS['TIMEOUT'] и в бюджет страниц не входит
+        get_popular_tags()
+
+    def test_index_anonymous(self):
+        with self.assertMaxQueries(4):
+            self.client.get(reverse('questions:index'))
+
+    def test_index_authorized(self):
+        self.client.login(username='test_user_0', password='test')
+        with self.assertMaxQueries(5):
+            self.client.get(reverse('questions:index'))
+
+    def test_search(self):
+        with self.assertMaxQueries(4):
+            self.client.get(reverse('questions:searchresult') + '?search=title')
+
+    def test_search_tag(self):
+        with self.assertMaxQueries(4):
+            self.client.get(reverse('questions:searchresult') + '?search=tag:tag1')
+
+    def test_question_view(self):
+        question = Questions.objects.first()
+        # первый запрос - Questions.modified для ETag
+        with self.assertMaxQueries(6):
+            self.client.get(reverse('questions:questionview', args=(question.pk,)))
@@ -0,0 +1,123 @@
+import base64
+import re
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from questions.models import Questions, Answers, Tags, QuestionVotes, AnswerVotes
+from questions.pagination import KeysetPaginator
+from questions.tests.test_views import TEST_IMAGE
+from registration.models import UserProfile
+
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?(?P<table>\w+)(?P<rest>.*)')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN поддерживается только SQLite')
+class QueryPlanTest(TestCase):
+    """Проверяет, что запросы представлений не делают полный просмотр таблиц"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='test_user',
+            password='test',
+        )
+        photo = SimpleUploadedFile(
+            content=(base64.b64decode(TEST_IMAGE)),
+            name='tempfile.png',
+            content_type='image/png',
+        )
+        UserProfile.objects.create(
+            user=cls.user,
+            photo=photo
+        )
+        tag = Tags.objects.create(name='python')
+        for i in range(3):
+            question = Questions.objects.create(
+                title=f'title test {i}',
+                body='test body',
+                author=cls.user,
+            )
+            question.tags.add(tag)
+            QuestionVotes.objects.create(author=cls.user, question=question)
+            answer = Answers.objects.create(
+                body='test body',
+                author=cls.user,
+                correct=False,
+                question=question,
+            )
+            AnswerVotes.objects.create(author=cls.user, answer=answer)
+
+    def setUp(self):
+        self.client.login(
+            username='test_user',
+            password='test',
+        )
+        credentials = base64.b64encode(b'test_user:test').decode()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Basic {credentials}'
+
+    def full_scans(self, url):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        scans = []
+        tables = set(connection.introspection.table_names())
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                for row in cursor.fetchall():
+                    match = FULL_SCAN.search(row[-1])
+                    if match is None or 'INDEX' in match.group('rest') or match.group('table') not in tables:
+                        continue
+                    scans.append(f'{row[-1]}: {sql}')
+        return scans
+
+    def assertNoFullScans(self, name, *args, query=''):
+        scans = self.full_scans(reverse(name, args=args) + query)
+        self.assertEqual(scans, [], '\n'.join(scans))
+
+    def test_index_popular(self):
+        self.assertNoFullScans('questions:index', query='?order=popular')
+
+    def test_index_date(self):
+        self.assertNoFullScans('questions:index', query='?order=date')
+
+    def test_index_keyset(self):
+        queryset = Questions.objects.order_by('-vote_count', '-create_date')
+        cursor = KeysetPaginator(queryset, 1).page().next_cursor
+        self.assertNoFullScans('questions:index', query=f'?order=popular&cursor={cursor}')
+
+    def test_question_view(self):
+        self.assertNoFullScans('questions:questionview', 1)
+
+    def test_search_title(self):
+        self.assertNoFullScans('questions:searchresult', query='?search=title')
+
+    def test_search_tag(self):
+        self.assertNoFullScans('questions:searchresult', query='?search=tag:python')
+
+    def test_search_tag_prefix(self):
+        self.assertNoFullScans('questions:searchresult', query='?search=tag:py*')
+
+    def test_create_question(self):
+        self.assertNoFullScans('questions:createquestion')
+
+    def test_api_index(self):
+        self.assertNoFullScans('api:index')
+
+    def test_api_get_question(self):
+        self.assertNoFullScans('api:getquestion', 1)
+
+    def test_api_get_answers(self):
+        self.assertNoFullScans('api:getanswers', 1)
+
+    def test_api_search(self):
+        self.assertNoFullScans('api:searchresult', query='?search=title')
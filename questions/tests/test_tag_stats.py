@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from questions.context_processors import POPULAR_TAGS_KEY
+from questions.models import Questions, QuestionVotes, Tags, TagStats
+from questions.voting import write_question_vote
+
+
+class TagStatsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user', password='test')
+        cls.python = Tags.objects.create(name='python')
+        cls.django = Tags.objects.create(name='django')
+
+    def setUp(self):
+        cache.delete(POPULAR_TAGS_KEY)
+
+    def create_question(self, *tags):
+        question = Questions.objects.create(title='test', body='test body', author=self.user)
+        question.tags.add(*tags)
+        return question
+
+    def stats(self, tag):
+        stats = TagStats.objects.get(tag=tag)
+        return stats.question_count, stats.vote_count
+
+    def test_created_with_tag(self):
+        stats = TagStats.objects.get(tag=self.python)
+        self.assertEqual((stats.name, stats.question_count, stats.vote_count), ('python', 0, 0))
+
+    def test_question_tagged(self):
+        self.create_question(self.python, self.django)
+        self.create_question(self.python)
+        self.assertEqual(self.stats(self.python), (2, 0))
+        self.assertEqual(self.stats(self.django), (1, 0))
+        self.assertIsNotNone(TagStats.objects.get(tag=self.python).last_activity)
+
+    def test_votes(self):
+        question = self.create_question(self.python)
+        write_question_vote(self.user.pk, question.pk, True)
+        self.assertEqual(self.stats(self.python), (1, 1))
+        write_question_vote(self.user.pk, question.pk, False)
+        self.assertEqual(self.stats(self.python), (1, 0))
+        QuestionVotes.objects.create(author=self.user, question=question)
+        self.assertEqual(self.stats(self.python), (1, 1))
+
+    def test_untagged_and_deleted(self):
+        first = self.create_question(self.python, self.django)
+        second = self.create_question(self.python)
+        Questions.objects.filter(pk=first.pk).update(vote_count=5)
+        first.refresh_from_db()
+        TagStats.shift([self.python.pk, self.django.pk], votes=5)
+        first.tags.remove(self.django)
+        self.assertEqual(self.stats(self.django), (0, 0))
+        second.tags.clear()
+        self.assertEqual(self.stats(self.python), (1, 5))
+        first.delete()
+        self.assertEqual(self.stats(self.python), (0, 0))
+
+    def test_recount(self):
+        question = self.create_question(self.python)
+        QuestionVotes.objects.create(author=self.user, question=question)
+        TagStats.objects.update(question_count=10, vote_count=10)
+        TagStats.objects.filter(tag=self.django).delete()
+        call_command('recount_counters', stdout=StringIO())
+        self.assertEqual(self.stats(self.python), (1, 1))
+        self.assertEqual(self.stats(self.django), (0, 0))
+
+    def test_sidebar(self):
+        self.create_question(self.python)
+        resp = self.client.get(reverse('questions:index'))
+        self.assertContains(resp, '?search=tag:python')
+        self.assertNotContains(resp, '?search=tag:django')
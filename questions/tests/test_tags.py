@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from questions.checks import check_tag_cache
+from questions.models import Questions, Tags
+from questions.tags import TagIdCache, get_tag_ids, resolve_tags, add_question_tags
+from search.autocomplete import get_tag_autocomplete
+
+TAG_CACHE = {
+    'ENABLED': True,
+    'CACHE': 'default',
+}
+
+
+class TagIdCacheTest(TestCase):
+
+    def test_least_recently_used_evicted(self):
+        tag_ids = TagIdCache(maxsize=2)
+        tag_ids.get_many([])
+        tag_ids.set_many({'python': 1, 'django': 2})
+        tag_ids.get_many(['python'])
+        tag_ids.set_many({'flask': 3})
+        self.assertEqual(tag_ids.get_many(['python', 'django', 'flask']), {'python': 1, 'flask': 3})
+
+
+class TagCacheCheckTest(TestCase):
+
+    @override_settings(TAG_CACHE=TAG_CACHE)
+    def test_process_local_cache(self):
+        self.assertEqual([warning.id for warning in check_tag_cache(None)], ['questions.W001'])
+
+    @override_settings(TAG_CACHE=TAG_CACHE, CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache'},
+    })
+    def test_shared_cache(self):
+        self.assertEqual(check_tag_cache(None), [])
+
+    def test_disabled(self):
+        self.assertEqual(check_tag_cache(None), [])
+
+
+class ResolveTagsTest(TestCase):
+
+    def setUp(self):
+        get_tag_ids().reset()
+        get_tag_autocomplete().reset()
+
+    def test_normalize_and_deduplicate(self):
+        ids = resolve_tags([' Python ', 'python', '', '  ', 'Django  ORM'])
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(sorted(Tags.objects.values_list('name', flat=True)), ['django orm', 'python'])
+
+    def test_existing_tags_single_query(self):
+        python = Tags.objects.create(name='python')
+        with self.assertNumQueries(1):
+            self.assertEqual(resolve_tags(['python']), [python.pk])
+
+    def test_new_tags_bulk_created(self):
+        Tags.objects.create(name='python')
+        # Чтение, вставка, дочитывание новых тегов и строка TagStats на каждый новый тег
+        with self.assertNumQueries(5):
+            resolve_tags(['python', 'django', 'flask'])
+        self.assertEqual(Tags.objects.count(), 3)
+        self.assertEqual(get_tag_autocomplete().complete('dj'), ['django'])
+
+    @override_settings(TAG_CACHE=TAG_CACHE)
+    def test_cached_tags_without_queries(self):
+        ids = resolve_tags(['python', 'django'])
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_tags(['Python', 'django']), ids)
+
+    @override_settings(TAG_CACHE=TAG_CACHE)
+    def test_deleted_tag_resets_cache(self):
+        resolve_tags(['python'])
+        Tags.objects.filter(name='python').get().delete()
+        python_id = resolve_tags(['python'])[0]
+        self.assertEqual(Tags.objects.get(name='python').pk, python_id)
+
+    def test_add_question_tags(self):
+        user = User.objects.create(username='test_user')
+        question = Questions.objects.create(title='test', body='test body', author=user)
+        add_question_tags(question, ['python', ' Python', 'django'])
+        self.assertEqual(sorted(question.tags.values_list('name', flat=True)), ['django', 'python'])
+
+
+class CreateQuestionTagsTest(TestCase):
+
+    def test_create_question_with_tags(self):
+        User.objects.create_user(username='test_user', password='test')
+        self.client.login(username='test_user', password='test')
+        self.client.post(reverse('questions:createquestion'), {
+            'title': 'test',
+            'body': 'test body',
+            'tags': ' Python,python , django',
+        })
+        question = Questions.objects.get()
+        self.assertEqual(sorted(question.tags.values_list('name', flat=True)), ['django', 'python'])
@@ -1,7 +1,9 @@
 import base64
 
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from django.urls import reverse
 
@@ -59,6 +61,29 @@ class IndexViewTest(TestCase):
         self.assertEqual(resp.context['is_paginated'], True)
         self.assertEqual(len(resp.context['object_list']), 5)
 
+    def test_index_view_order_cookie(self):
+        Questions.objects.filter(title='title test 0').update(vote_count=10)
+        resp = self.client.get(reverse('questions:index') + '?order=date')
+        self.assertEqual(resp.context['object_list'][0].title, 'title test 24')
+        self.assertIn('order', resp.cookies)
+        resp = self.client.get(reverse('questions:index'))
+        self.assertEqual(resp.context['object_list'][0].title, 'title test 24')
+        self.assertNotIn('order', resp.cookies)
+        resp = self.client.get(reverse('questions:index') + '?order=popular')
+        self.assertEqual(resp.context['object_list'][0].title, 'title test 0')
+
+    def test_index_view_tampered_order_cookie(self):
+        self.client.cookies['order'] = 'date'
+        resp = self.client.get(reverse('questions:index'))
+        self.assertEqual(resp.context['order_popular'], 'active')
+
+    def test_index_view_anonymous_no_writes(self):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.get(reverse('questions:index'))
+        self.assertEqual([query['sql'] for query in context.captured_queries if 'SELECT' not in query['sql']], [])
+        self.assertFalse(resp.cookies)
+        self.assertIn('Cookie', resp['Vary'])
+
 
 class CreateQuestionViewTest(TestCase):
 
@@ -153,6 +178,15 @@ class QuestionViewTest(TestCase):
         self.assertEqual(resp.context['is_paginated'], True)
         self.assertEqual(len(resp.context['object_list']), 3)
 
+    def test_question_view_answer_count_increased(self):
+        self.client.login(
+            username='test_user',
+            password='test',
+        )
+        before = Questions.objects.get(id=1).answer_count
+        self.client.post(reverse('questions:questionview', args=(1,)), {'body': 'new answer'})
+        self.assertEqual(Questions.objects.get(id=1).answer_count, before + 1)
+
 
 class QuestionVoteViewTest(TestCase):
 
@@ -211,6 +245,15 @@ class QuestionVoteViewTest(TestCase):
         votes = QuestionVotes.objects.filter(question_id=1).count()
         self.assertEqual(votes, 1)
 
+    def test_question_vote_count_increased_once(self):
+        self.client.login(
+            username='test_user',
+            password='test',
+        )
+        self.client.get(reverse('questions:questionvote', kwargs={'pk': 1}) + '?page=1')
+        self.client.get(reverse('questions:questionvote', kwargs={'pk': 1}) + '?page=1')
+        self.assertEqual(Questions.objects.get(id=1).vote_count, 1)
+
 
 class QuestionUnVoteViewTest(TestCase):
 
@@ -273,6 +316,16 @@ class QuestionUnVoteViewTest(TestCase):
         self.client.get(reverse('questions:questionunvote', kwargs={'pk': 1}) + '?page=1')
         self.assertEqual(QuestionVotes.objects.all().count(), 0)
 
+    def test_question_unvote_count_decreased(self):
+        Questions.objects.filter(id=1).update(vote_count=1)
+        self.client.login(
+            username='test_user',
+            password='test',
+        )
+        self.client.get(reverse('questions:questionunvote', kwargs={'pk': 1}) + '?page=1')
+        self.client.get(reverse('questions:questionunvote', kwargs={'pk': 1}) + '?page=1')
+        self.assertEqual(Questions.objects.get(id=1).vote_count, 0)
+
 
 class AnswerVoteViewTest(TestCase):
 
@@ -337,6 +390,25 @@ class AnswerVoteViewTest(TestCase):
         self.client.get(reverse('questions:answervote', args=(1, 1,)) + '?page=1')
         self.assertEqual(AnswerVotes.objects.all().count(), 1)
 
+    def test_answer_vote_score_increased(self):
+        self.client.login(
+            username='test_user',
+            password='test',
+        )
+        self.client.get(reverse('questions:answervote', args=(1, 1,)) + '?page=1')
+        self.assertEqual(Answers.objects.get(id=1).score, 1)
+
+    def test_answer_vote_other_question(self):
+        other = Questions.objects.create(title='other', body='test body', author=User.objects.get())
+        self.client.login(
+            username='test_user',
+            password='test',
+        )
+        for name in ('questions:answervote', 'questions:answerunvote'):
+            resp = self.client.get(reverse(name, args=(other.pk, 1)))
+            self.assertEqual(resp.status_code, 404)
+        self.assertEqual(AnswerVotes.objects.count(), 0)
+
 
 class AnswerUnVoteViewTest(TestCase):
 
@@ -404,6 +476,15 @@ class AnswerUnVoteViewTest(TestCase):
         self.client.get(reverse('questions:answerunvote', args=(1, 1,)) + '?page=1')
         self.assertEqual(AnswerVotes.objects.all().count(), 0)
 
+    def test_answer_unvote_score_decreased(self):
+        Answers.objects.filter(id=1).update(score=1)
+        self.client.login(
+            username='test_user',
+            password='test',
+        )
+        self.client.get(reverse('questions:answerunvote', args=(1, 1,)) + '?page=1')
+        self.assertEqual(Answers.objects.get(id=1).score, 0)
+
 
 class AnswerSelectRightViewTest(TestCase):
 
@@ -466,6 +547,42 @@ class AnswerSelectRightViewTest(TestCase):
         )
         self.client.get(reverse('questions:setcorrectanswer', args=(1, 1,)) + '?page=1')
         self.assertEqual(Answers.objects.get(id=1).correct, True)
+        self.assertEqual(Questions.objects.get(id=1).correct_answer_id, 1)
+
+    def test_answer_select_right_scoped_to_question(self):
+        user = User.objects.get(username='test_user')
+        question = Questions.objects.get(id=1)
+        previous = Answers.objects.create(body='previous', author=user, correct=True, question=question)
+        other_question = Questions.objects.create(title='other', body='other', author=user)
+        other = Answers.objects.create(body='other', author=user, correct=True, question=other_question)
+        self.client.login(
+            username='test_user',
+            password='test',
+        )
+        with self.assertNumQueries(7):
+            self.client.get(reverse('questions:setcorrectanswer', args=(1, 1,)) + '?page=1')
+        self.assertTrue(Answers.objects.get(id=1).correct)
+        self.assertFalse(Answers.objects.get(id=previous.id).correct)
+        self.assertTrue(Answers.objects.get(id=other.id).correct)
+
+    def test_answer_select_right_foreign_answer(self):
+        user = User.objects.get(username='test_user')
+        other_question = Questions.objects.create(title='other', body='other', author=user)
+        other = Answers.objects.create(body='other', author=user, correct=False, question=other_question)
+        self.client.login(
+            username='test_user',
+            password='test',
+        )
+        resp = self.client.get(reverse('questions:setcorrectanswer', args=(1, other.id,)))
+        self.assertEqual(resp.status_code, 404)
+        self.assertFalse(Answers.objects.get(id=other.id).correct)
+        self.assertIsNone(Questions.objects.get(id=1).correct_answer_id)
+
+    def test_one_correct_answer_per_question(self):
+        answer = Answers.objects.get(id=1)
+        Answers.objects.filter(id=1).update(correct=True)
+        with self.assertRaises(IntegrityError):
+            Answers.objects.create(body='second', author=answer.author, correct=True, question=answer.question)
 
 
 class SearchQuestionViewTest(TestCase):
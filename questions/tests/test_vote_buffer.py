@@ -0,0 +1,147 @@
+import base64
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from questions.models import Questions, QuestionVotes, Answers, AnswerVotes, Trends
+from questions.vote_buffer import VoteBuffer, get_vote_buffer
+from questions.tests.test_views import TEST_IMAGE
+from registration.models import UserProfile
+
+BUFFER_SETTINGS = {'ENABLED': True, 'FLUSH_INTERVAL_MS': 0, 'MAX_BATCH': 1000}
+
+
+class VoteBufferTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='test_user')
+        cls.question = Questions.objects.create(
+            title='title test',
+            body='test body',
+            author=cls.user,
+        )
+        cls.answer = Answers.objects.create(
+            body='test body',
+            author=cls.user,
+            correct=False,
+            question=cls.question,
+        )
+
+    def test_flush_writes_votes_and_counters(self):
+        buffer = VoteBuffer(flush_interval_ms=0)
+        buffer.push(QuestionVotes, self.user.pk, self.question.pk, True)
+        buffer.push(AnswerVotes, self.user.pk, self.answer.pk, True)
+        self.assertEqual(QuestionVotes.objects.count(), 0)
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(QuestionVotes.objects.count(), 1)
+        self.assertEqual(AnswerVotes.objects.count(), 1)
+        self.assertEqual(Questions.objects.get().vote_count, 1)
+        self.assertEqual(Trends.objects.get().count, 1)
+        self.assertEqual(Answers.objects.get().score, 1)
+
+    def test_missing_target_skipped(self):
+        buffer = VoteBuffer(flush_interval_ms=0)
+        buffer.push(QuestionVotes, self.user.pk, self.question.pk, True)
+        buffer.push(QuestionVotes, self.user.pk, 99999, True)
+        buffer.push(AnswerVotes, self.user.pk, self.answer.pk, True)
+        buffer.push(AnswerVotes, self.user.pk, 99999, True)
+        buffer.flush()
+        connection.check_constraints()
+        self.assertEqual(list(QuestionVotes.objects.values_list('question_id', flat=True)), [self.question.pk])
+        self.assertEqual(list(AnswerVotes.objects.values_list('answer_id', flat=True)), [self.answer.pk])
+        self.assertEqual(Questions.objects.get().vote_count, 1)
+
+    def test_last_intent_wins(self):
+        QuestionVotes.objects.create(author=self.user, question=self.question)
+        buffer = VoteBuffer(flush_interval_ms=0)
+        buffer.push(QuestionVotes, self.user.pk, self.question.pk, True)
+        buffer.push(QuestionVotes, self.user.pk, self.question.pk, False)
+        self.assertEqual(len(buffer), 1)
+        buffer.flush()
+        self.assertEqual(QuestionVotes.objects.count(), 0)
+
+    def test_unvotes_single_delete(self):
+        """Отзыв пачки голосов не зависит от ее размера по числу запросов"""
+        users = [User.objects.create(username=f'voter_{i}') for i in range(50)]
+        QuestionVotes.objects.bulk_create([QuestionVotes(author=user, question=self.question) for user in users])
+        buffer = VoteBuffer(flush_interval_ms=0)
+        for user in users:
+            buffer.push(QuestionVotes, user.pk, self.question.pk, False)
+        # удаление, пересчет вопросов, трендов и тегов, modified
+        with self.assertNumQueries(8):
+            buffer.flush()
+        self.assertEqual(QuestionVotes.objects.count(), 0)
+        self.assertEqual(Questions.objects.get().vote_count, 0)
+        self.assertEqual(Trends.objects.get().count, 0)
+
+    def test_flush_on_max_batch(self):
+        buffer = VoteBuffer(flush_interval_ms=0, max_batch=1)
+        buffer.push(QuestionVotes, self.user.pk, self.question.pk, True)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(QuestionVotes.objects.count(), 1)
+
+    def test_pending_deltas(self):
+        buffer = VoteBuffer(flush_interval_ms=0)
+        buffer.push(QuestionVotes, self.user.pk, self.question.pk, True)
+        self.assertEqual(buffer.pending_deltas(QuestionVotes, self.user.pk, [self.question.pk]), {self.question.pk: 1})
+        QuestionVotes.objects.create(author=self.user, question=self.question)
+        self.assertEqual(buffer.pending_deltas(QuestionVotes, self.user.pk, [self.question.pk]), {})
+
+    def test_buffer_disabled_by_default(self):
+        self.assertIsNone(get_vote_buffer())
+
+
+@override_settings(VOTE_BUFFER=BUFFER_SETTINGS)
+class BufferedVoteViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(
+            username='test_user',
+            password='test',
+        )
+        photo = SimpleUploadedFile(
+            content=(base64.b64decode(TEST_IMAGE)),
+            name='tempfile.png',
+            content_type='image/png',
+        )
+        UserProfile.objects.create(
+            user=user,
+            photo=photo
+        )
+        question = Questions.objects.create(
+            title='title test',
+            body='test body',
+            author=user,
+        )
+        Answers.objects.create(
+            body='test body',
+            author=user,
+            correct=False,
+            question=question,
+        )
+
+    def setUp(self):
+        self.client.login(
+            username='test_user',
+            password='test',
+        )
+
+    def test_question_vote_read_your_writes(self):
+        self.client.get(reverse('questions:questionvote', kwargs={'pk': 1}) + '?page=1')
+        self.assertEqual(QuestionVotes.objects.count(), 0)
+        resp = self.client.get(reverse('questions:questionview', args=(1,)))
+        self.assertEqual(resp.context['number_question_votes'], 1)
+        get_vote_buffer().flush()
+        self.assertEqual(Questions.objects.get(id=1).vote_count, 1)
+
+    def test_answer_vote_read_your_writes(self):
+        self.client.get(reverse('questions:answervote', args=(1, 1,)) + '?page=1')
+        resp = self.client.get(reverse('questions:questionview', args=(1,)))
+        self.assertEqual(resp.context['object_list'][0].score, 1)
+        get_vote_buffer().flush()
+        self.assertEqual(Answers.objects.get(id=1).score, 1)
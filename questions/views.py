@@ -1,28 +1,48 @@
+import time
+from functools import partial
+
+from django.conf import settings
 from django.shortcuts import redirect, get_object_or_404
-from django.db.models import Count
 from django.db import transaction
 from django.views.generic import RedirectView, ListView, CreateView
-from django.core.mail import send_mail
 from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import urlencode
 
-from questions.models import QuestionVotes, Questions, Tags, Answers, AnswerVotes
+from questions.conditional import ConditionalGetMixin
+from questions.models import Questions, Answers
+from questions.notifications import enqueue_answer
 from questions.forms import QuestionCreateForm, AnswerCreateForm
-from registration.models import UserProfile
+from questions.page_cache import AnonymousPageCacheMixin, question_scope
+from questions.pagination import KeysetPaginationMixin
+from questions.tags import add_question_tags
+from questions.vote_buffer import get_vote_buffer
+from questions.voting import (
+    vote_question, unvote_question, vote_answer, unvote_answer, apply_pending_votes, set_correct_answer
+)
+from search.engine import RankedQuestions, search_result_ids, search_suggestions
 
 
-class IndexView(ListView):
+class IndexView(AnonymousPageCacheMixin, KeysetPaginationMixin, ListView):
     """
-    Главная страница проекта
+    Главная страница проекта.
+    Порядок берется из ?order=, выбранный порядок запоминается в подписанной cookie, а не в сессии:
+    анонимный просмотр не пишет в БД, запросы без cookie отдаются из кэша страниц одним вариантом
     """
     model = Questions
     template_name = 'questions/index.html'
     paginate_by = 20
+    orders = {
+        'popular': ('-vote_count', '-create_date'),
+        'date': ('-create_date',),
+    }
+    default_order = 'popular'
+    order_cookie = 'order'
+    order_cookie_max_age = 365 * 24 * 60 * 60
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        if self.request.user.is_authenticated:
-            context['photo'] = self.request.user.userprofile.photo
-        if self.request.session.get('order') == 'date':
+        if self.get_order() == 'date':
             context['order_date'] = 'active'
         else:
             context['order_popular'] = 'active'
@@ -32,19 +52,29 @@ class IndexView(ListView):
         context['trends'] = Questions.get_trends()
         return context
 
+    def get_cookie_order(self):
+        order = self.request.get_signed_cookie(self.order_cookie, default=None)
+        return order if order in self.orders else None
+
+    def get_order(self):
+        order = self.request.GET.get('order')
+        if order in self.orders:
+            return order
+        return self.get_cookie_order() or self.default_order
+
+    def get_page_cache_variant(self):
+        return self.get_order()
+
     def get_queryset(self):
-        if self.request.GET.get('order'):
-            self.request.session['order'] = self.request.GET['order']
-        elif self.request.session.get('order') is None:
-            self.request.session['order'] = 'popular'
-        if self.request.session.get('order') == 'date':
-            order = '-create_date'
-        elif self.request.session.get('order') == 'popular':
-            order = '-count_votes'
-        return Questions.objects.annotate(
-            count_votes=Count('questionvotes', distinct=True),
-            count_answers=Count('answers', distinct=True)
-        ).order_by(order)
+        return Questions.objects.with_author_and_tags().order_by(*self.orders[self.get_order()])
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        order = request.GET.get('order')
+        if order in self.orders and order != self.get_cookie_order():
+            response.set_signed_cookie(self.order_cookie, order, max_age=self.order_cookie_max_age, httponly=True)
+        patch_vary_headers(response, ('Cookie',))
+        return response
 
 
 class CreateQuestionView(CreateView):
@@ -56,8 +86,6 @@ class CreateQuestionView(CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
-            context['photo'] = self.request.user.userprofile.photo
         context['trends'] = Questions.get_trends()
         return context
 
@@ -65,37 +93,49 @@ class CreateQuestionView(CreateView):
         self.object = form.save(commit=False)
         self.object.author = self.request.user
         self.object.save()
-        for tag in form.cleaned_data['tags'].split(','):
-            new_tag, _ = Tags.objects.get_or_create(
-                name=tag
-            )
-            self.object.tags.add(new_tag)
+        add_question_tags(self.object, form.cleaned_data['tags'].split(','))
         return super().form_valid(form)
 
     def get_success_url(self):
         return reverse('questions:questionview', args=[self.object.id])
 
 
-class QuestionView(ListView):
+class QuestionView(ConditionalGetMixin, AnonymousPageCacheMixin, KeysetPaginationMixin, ListView):
     """
     Просмотр вопроса с возможностью, для авторизированных пользователей, написать свой ответ
     """
     model = Answers
     template_name = 'questions/question_detail.html'
     paginate_by = 30
+    # Страница зависит от пользователя, а браузер при If-None-Match не смотрит на If-Modified-Since
+    last_modified_header = False
+
+    def get_etag_parts(self):
+        sidebar = int(time.time() // settings.CONDITIONAL_GET.get('SIDEBAR_TIMEOUT', 60))
+        return self.request.user.pk, sidebar
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and get_vote_buffer() is not None:
+            # Еще не записанные голоса пользователя видны только на свежеотрисованной странице
+            return super().dispatch(request, *args, **kwargs)
+        return self.conditional_get(request, partial(super().dispatch, request, *args, **kwargs))
+
+    def get_page_cache_scopes(self):
+        return (question_scope(self.kwargs.get('pk')),)
 
     def get_queryset(self):
-        self.question = get_object_or_404(Questions, pk=self.kwargs.get('pk'))
-        queryset = Answers.objects.filter(question=self.question).annotate(count=Count('answervotes')).order_by('-count', '-create_date')
+        self.question = get_object_or_404(Questions.objects.with_author_and_tags(), pk=self.kwargs.get('pk'))
+        queryset = Answers.objects.filter(
+            question=self.question
+        ).select_related('author').order_by('-score', '-create_date')
         return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        number_question_votes = QuestionVotes.objects.filter(question=self.question).count()
-        context['number_question_votes'] = number_question_votes
+        apply_pending_votes(self.request.user, self.question, list(context['object_list']))
+        context['number_question_votes'] = self.question.vote_count
         context['question'] = self.question
         if self.request.user.is_authenticated:
-            context['photo'] = self.request.user.userprofile.photo
             if self.request.user != self.question.author:
                 context['disabled_correct_answer'] = 'disabled'
         else:
@@ -112,21 +152,15 @@ class QuestionView(ListView):
     def post(self, request, pk):
         form = AnswerCreateForm(request.POST)
         if form.is_valid():
-            new_answer = Answers(
-                body=form.cleaned_data['body'],
-                author=request.user,
-                question=Questions.objects.get(id=pk),
-                correct=False,
-            )
-            new_answer.save()
-            question_link = request._current_scheme_host + request.path
-            send_mail(
-                subject='Получен ответ на ваш вопрос',
-                message=f'Ссылка на ваш вопрос {question_link}',
-                from_email='info@homework.ru',
-                recipient_list=[request.user.email],
-                fail_silently=True,
-            )
+            with transaction.atomic():
+                new_answer = Answers(
+                    body=form.cleaned_data['body'],
+                    author=request.user,
+                    question=Questions.objects.get(id=pk),
+                    correct=False,
+                )
+                new_answer.save()
+                enqueue_answer(new_answer, request.build_absolute_uri(reverse('questions:questionview', args=[pk])))
         return redirect(f'/question/{pk}')
 
 
@@ -137,12 +171,7 @@ class QuestionVoteView(RedirectView):
 
     def get_redirect_url(self, *args, **kwargs):
         pk = kwargs['pk']
-        new_vote, created = QuestionVotes.objects.get_or_create(
-            author=self.request.user,
-            question_id=pk
-        )
-        if created:
-            new_vote.save()
+        vote_question(self.request.user.pk, pk)
         current_page = self.request.GET.get('page')
         self.url = reverse('questions:questionview', args=[pk]) + f'?page={current_page}'
         return super().get_redirect_url(*args, **kwargs)
@@ -155,13 +184,7 @@ class QuestionUnVoteView(RedirectView):
 
     def get_redirect_url(self, *args, **kwargs):
         pk = kwargs['pk']
-        with transaction.atomic():
-            vote = QuestionVotes.objects.filter(
-                author=self.request.user,
-                question_id=pk
-            ).first()
-            if vote:
-                vote.delete()
+        unvote_question(self.request.user.pk, pk)
         current_page = self.request.GET.get('page')
         self.url = reverse('questions:questionview', args=[pk]) + f'?page={current_page}'
         return super().get_redirect_url(*args, **kwargs)
@@ -176,12 +199,7 @@ class AnswerVoteView(RedirectView):
     def get_redirect_url(self, *args, **kwargs):
         pk = kwargs['pk']
         id_answer = kwargs['id_answer']
-        new_vote_answer, created = AnswerVotes.objects.get_or_create(
-            author=self.request.user,
-            answer_id=id_answer
-        )
-        if created:
-            new_vote_answer.save()
+        vote_answer(self.request.user.pk, pk, id_answer)
         current_page = self.request.GET.get('page')
         self.url = reverse('questions:questionview', args=[pk]) + f'?page={current_page}'
         return super().get_redirect_url(*args, **kwargs)
@@ -196,13 +214,7 @@ class AnswerUnVoteView(RedirectView):
     def get_redirect_url(self, *args, **kwargs):
         pk = kwargs['pk']
         id_answer = kwargs['id_answer']
-        with transaction.atomic():
-            vote_answer = AnswerVotes.objects.filter(
-                author=self.request.user,
-                answer_id=id_answer
-            ).first()
-            if vote_answer:
-                vote_answer.delete()
+        unvote_answer(self.request.user.pk, pk, id_answer)
         current_page = self.request.GET.get('page')
         self.url = f"{reverse('questions:questionview', args=[pk])}?page={current_page}"
         return super().get_redirect_url(*args, **kwargs)
@@ -215,55 +227,35 @@ class AnswerSelectRightView(RedirectView):
 
     def get_redirect_url(self, *args, **kwargs):
         pk = kwargs['pk']
-        current_question = Questions.objects.get(pk=pk)
-        if self.request.user != current_question.author:
+        if not set_correct_answer(self.request.user, pk, kwargs['id_answer']):
             return super().get_redirect_url(*args, **kwargs)
-        id_answer = kwargs['id_answer']
-        with transaction.atomic():
-            old_correct_answer = Answers.objects.filter(correct=True).first()
-            if old_correct_answer:
-                old_correct_answer.correct = False
-                old_correct_answer.save()
-            answer = Answers.objects.get(pk=id_answer)
-            answer.correct = True
-            answer.save()
         current_page = self.request.GET.get('page')
         self.url = f"{reverse('questions:questionview', args=[pk])}?page={current_page}"
         return super().get_redirect_url(*args, **kwargs)
 
 
-class SearchQuestionView(ListView):
+class SearchQuestionView(AnonymousPageCacheMixin, KeysetPaginationMixin, ListView):
     """
-    Быстый поиск вопросов по теме и по тегам с пагинацией результата
+    Быстрый поиск вопросов по тегам и полнотекстовый поиск с ранжированием BM25
     """
     model = Questions
     paginate_by = 20
     template_name = 'questions/search_result.html'
 
     def get_queryset(self):
-        search_string = self.request.GET.get('search')
-        if search_string[:4] == 'tag:':
-            queryset = Questions.objects.filter(tags__name__contains=search_string[4:]).annotate(
-                count_votes=Count('questionvotes', distinct=True),
-                count_answers=Count('answers', distinct=True)
-            ).order_by('-count_votes', '-create_date')
-        else:
-            queryset = Questions.objects.filter(title__contains=search_string).annotate(
-                count_votes=Count('questionvotes', distinct=True),
-                count_answers=Count('answers', distinct=True)
-            ).order_by('-count_votes', '-create_date')
-        return queryset
+        return RankedQuestions(search_result_ids(self.request.GET.get('search', '')))
 
     def post(self, request):
-        search_string = request.POST.get('search_string')
-        return redirect(f'/searchresult/?search={search_string}')
+        search_string = request.POST.get('search_string', '')
+        return redirect(f"{reverse('questions:searchresult')}?{urlencode({'search': search_string})}")
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        search = self.request.GET.get('search')
+        search = self.request.GET.get('search', '')
         context['search'] = search
+        if not context['paginator'].count:
+            suggestions = search_suggestions(search)
+            context['suggested_questions'] = RankedQuestions(suggestions['questions'])[:]
+            context['suggested_tags'] = suggestions['tags']
         context['trends'] = Questions.get_trends()
-        if self.request.user.is_authenticated:
-            profile = UserProfile.objects.get(user=self.request.user)
-            context['photo'] = profile.photo
         return context
@@ -0,0 +1,179 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections, transaction
+from django.db.models import Q
+from django.dispatch import receiver
+
+from questions.counters import recount_questions, recount_answers
+from questions.models import Questions, QuestionVotes, AnswerVotes, Answers
+from questions.page_cache import invalidate, question_scope, LISTING_SCOPE
+
+logger = logging.getLogger(__name__)
+
+VOTE_TARGETS = {
+    QuestionVotes: 'question_id',
+    AnswerVotes: 'answer_id',
+}
+
+
+class VoteBuffer:
+    """
+    Буфер отложенной записи голосов.
+    Намерения (голос / отзыв голоса) копятся в памяти процесса и пишутся пачкой:
+    по таймеру раз в flush_interval_ms или при накоплении max_batch намерений.
+    Для одного (модель, автор, объект) хранится только последнее намерение
+    """
+
+    def __init__(self, flush_interval_ms=200, max_batch=100):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = {}
+        self._flushing = {}
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def start(self):
+        """Запускает фоновый поток сброса буфера"""
+        if self._thread is None and self.flush_interval:
+            self._thread = threading.Thread(target=self._run, name='vote-buffer', daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def push(self, model, author_id, target_id, vote):
+        """Добавляет намерение проголосовать (vote=True) или отозвать голос (vote=False)"""
+        with self._lock:
+            self._pending[(model, author_id, target_id)] = vote
+            full = len(self._pending) >= self.max_batch
+        if full:
+            if self._thread is None:
+                self.flush()
+            else:
+                self._wakeup.set()
+
+    def pending_deltas(self, model, author_id, target_ids):
+        """
+        Поправки к счетчикам объектов target_ids с учетом еще не записанных
+        голосов автора, чтобы он сразу видел результат своих действий
+        """
+        with self._lock:
+            states = {}
+            for target_id in target_ids:
+                key = (model, author_id, target_id)
+                state = self._pending.get(key, self._flushing.get(key))
+                if state is not None:
+                    states[target_id] = state
+        if not states:
+            return {}
+        target = VOTE_TARGETS[model]
+        existing = set(model.objects.filter(
+            author_id=author_id, **{f'{target}__in': list(states)}
+        ).values_list(target, flat=True))
+        deltas = {}
+        for target_id, state in states.items():
+            if state and target_id not in existing:
+                deltas[target_id] = 1
+            elif not state and target_id in existing:
+                deltas[target_id] = -1
+        return deltas
+
+    def flush(self):
+        """Записывает накопленные намерения и пересчитывает счетчики затронутых объектов"""
+        with self._flush_lock:
+            with self._lock:
+                self._flushing, self._pending = self._pending, {}
+            if not self._flushing:
+                return 0
+            try:
+                self._write(self._flushing)
+            except Exception:
+                logger.exception('Не удалось записать %s голосов', len(self._flushing))
+            finally:
+                written = len(self._flushing)
+                with self._lock:
+                    self._flushing = {}
+            return written
+
+    @staticmethod
+    def _write(intents):
+        votes, unvotes = defaultdict(list), defaultdict(list)
+        for (model, author_id, target_id), vote in intents.items():
+            (votes if vote else unvotes)[model].append((author_id, target_id))
+        touched = defaultdict(set)
+        with transaction.atomic():
+            for model, keys in votes.items():
+                target = VOTE_TARGETS[model]
+                # голос за удаленный (или подделанный) объект уронил бы на FK всю пачку
+                existing = set(model._meta.get_field(target).related_model.objects.filter(
+                    pk__in={target_id for _, target_id in keys},
+                ).values_list('pk', flat=True))
+                keys = [(author_id, target_id) for author_id, target_id in keys if target_id in existing]
+                model.objects.bulk_create(
+                    [model(author_id=author_id, **{target: target_id}) for author_id, target_id in keys],
+                    ignore_conflicts=True,
+                )
+                touched[model].update(target_id for _, target_id in keys)
+            for model, keys in unvotes.items():
+                target = VOTE_TARGETS[model]
+                condition = reduce(or_, (Q(author_id=author_id, **{target: target_id}) for author_id, target_id in keys))
+                # без сигналов post_delete на каждую строку: счетчики пересчитываются ниже одним запросом
+                model.objects.filter(condition)._raw_delete(model.objects.db)
+                touched[model].update(target_id for _, target_id in keys)
+            if touched[QuestionVotes]:
+                recount_questions(touched[QuestionVotes])
+            if touched[AnswerVotes]:
+                recount_answers(touched[AnswerVotes])
+            question_ids = set(touched[QuestionVotes])
+            question_ids.update(
+                Answers.objects.filter(pk__in=touched[AnswerVotes]).values_list('question_id', flat=True)
+            )
+            Questions.touch(question_ids)
+        scopes = [question_scope(question_id) for question_id in question_ids]
+        if touched[QuestionVotes]:
+            scopes.append(LISTING_SCOPE)
+        invalidate(*scopes)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self.flush():
+                connections.close_all()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_vote_buffer():
+    """Буфер голосов процесса или None, если отложенная запись выключена"""
+    global _buffer
+    config = settings.VOTE_BUFFER
+    if not config.get('ENABLED'):
+        return None
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = VoteBuffer(
+                flush_interval_ms=config.get('FLUSH_INTERVAL_MS', 200),
+                max_batch=config.get('MAX_BATCH', 100),
+            )
+            _buffer.start()
+    return _buffer
+
+
+@receiver(setting_changed)
+def reset_vote_buffer(setting, **kwargs):
+    global _buffer
+    if setting == 'VOTE_BUFFER':
+        _buffer = None
@@ -0,0 +1,134 @@
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from questions.models import Questions, QuestionVotes, Answers, AnswerVotes, Trends, TagStats
+from questions.page_cache import invalidate_question
+from questions.vote_buffer import get_vote_buffer
+
+
+def write_question_vote(author_id, question_id, vote):
+    """Синхронная запись голоса за вопрос (vote=True) или его отзыва (vote=False)"""
+    delta = 1 if vote else -1
+    with transaction.atomic():
+        if vote:
+            changed = QuestionVotes.objects.add_vote(author_id=author_id, question_id=question_id)
+        else:
+            changed = QuestionVotes.objects.remove_vote(author_id=author_id, question_id=question_id)
+        if changed:
+            Questions.objects.filter(pk=question_id).update(vote_count=F('vote_count') + delta, modified=timezone.now())
+            Trends.shift(question_id, delta)
+            TagStats.shift_votes(question_id, delta)
+    if changed:
+        invalidate_question(question_id)
+    return changed
+
+
+def write_answer_vote(author_id, answer_id, vote):
+    """Синхронная запись голоса за ответ (vote=True) или его отзыва (vote=False)"""
+    delta = 1 if vote else -1
+    with transaction.atomic():
+        if vote:
+            changed = AnswerVotes.objects.add_vote(author_id=author_id, answer_id=answer_id)
+        else:
+            changed = AnswerVotes.objects.remove_vote(author_id=author_id, answer_id=answer_id)
+        if changed:
+            Answers.objects.filter(pk=answer_id).update(score=F('score') + delta)
+            Questions.touch(Answers.objects.filter(pk=answer_id).values('question_id'))
+    if changed:
+        question_id = Answers.objects.filter(pk=answer_id).values_list('question_id', flat=True).first()
+        invalidate_question(question_id, listing=False)
+    return changed
+
+
+def _question_vote(author_id, question_id, vote):
+    buffer = get_vote_buffer()
+    if buffer is None:
+        write_question_vote(author_id, question_id, vote)
+    else:
+        buffer.push(QuestionVotes, author_id, question_id, vote)
+
+
+def _answer_vote(author_id, question_id, answer_id, vote):
+    if not Answers.objects.filter(pk=answer_id, question_id=question_id).exists():
+        raise Http404
+    buffer = get_vote_buffer()
+    if buffer is None:
+        write_answer_vote(author_id, answer_id, vote)
+    else:
+        buffer.push(AnswerVotes, author_id, answer_id, vote)
+
+
+def vote_question(author_id, question_id):
+    """Голос за вопрос: сразу в БД или через буфер отложенной записи"""
+    _question_vote(author_id, question_id, True)
+
+
+def unvote_question(author_id, question_id):
+    """Отзыв голоса за вопрос"""
+    _question_vote(author_id, question_id, False)
+
+
+def vote_answer(author_id, question_id, answer_id):
+    """Голос за ответ; Http404, если ответ не относится к вопросу"""
+    _answer_vote(author_id, question_id, answer_id, True)
+
+
+def unvote_answer(author_id, question_id, answer_id):
+    """Отзыв голоса за ответ"""
+    _answer_vote(author_id, question_id, answer_id, False)
+
+
+def apply_pending_votes(user, question, answers):
+    """
+    Учитывает еще не записанные голоса пользователя в счетчиках вопроса и ответов,
+    чтобы при отложенной записи он видел результат своих действий
+    """
+    buffer = get_vote_buffer()
+    if buffer is None or not user.is_authenticated:
+        return
+    question.vote_count += buffer.pending_deltas(QuestionVotes, user.pk, [question.pk]).get(question.pk, 0)
+    deltas = buffer.pending_deltas(AnswerVotes, user.pk, [answer.pk for answer in answers])
+    for answer in answers:
+        answer.score += deltas.get(answer.pk, 0)
+
+
+def current_question_votes(user, question_id):
+    """Количество голосов за вопрос с учетом еще не записанных голосов пользователя"""
+    count = Questions.objects.filter(pk=question_id).values_list('vote_count', flat=True).first()
+    if count is None:
+        raise Http404
+    buffer = get_vote_buffer()
+    if buffer is not None:
+        count += buffer.pending_deltas(QuestionVotes, user.pk, [question_id]).get(question_id, 0)
+    return count
+
+
+def current_answer_score(user, answer_id):
+    """Рейтинг ответа с учетом еще не записанных голосов пользователя"""
+    score = Answers.objects.filter(pk=answer_id).values_list('score', flat=True).first()
+    if score is None:
+        raise Http404
+    buffer = get_vote_buffer()
+    if buffer is not None:
+        score += buffer.pending_deltas(AnswerVotes, user.pk, [answer_id]).get(answer_id, 0)
+    return score
+
+
+def set_correct_answer(user, question_id, answer_id):
+    """
+    Отмечает ответ верным, если пользователь - автор вопроса. Возвращает True при успехе.
+    Снимает отметку с прежнего верного ответа этого же вопроса и обновляет Questions.correct_answer
+    """
+    author_id = get_object_or_404(Questions.objects.values_list('author_id', flat=True), pk=question_id)
+    if user.pk != author_id:
+        return False
+    with transaction.atomic():
+        Answers.objects.filter(question_id=question_id, correct=True).exclude(pk=answer_id).update(correct=False)
+        if not Answers.objects.filter(pk=answer_id, question_id=question_id).update(correct=True):
+            raise Http404
+        Questions.objects.filter(pk=question_id).update(correct_answer_id=answer_id, modified=timezone.now())
+    invalidate_question(question_id, listing=False)
+    return True
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class RegistrationConfig(AppConfig):
     name = 'registration'
+
+    def ready(self):
+        import registration.signals  # noqa: F401
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+from registration.models import UserProfile
+
+def _cache():
+    return caches[settings.USER_CACHE.get('CACHE', 'default')]
+
+
+def user_cache_key(user_id):
+    return f'registration:profile:{user_id}'
+
+
+def invalidate_user(user_id):
+    _cache().delete(user_cache_key(user_id))
+
+
+def _profile_values(profile):
+    """Поля профиля для кэша; пользователь (хэш пароля, is_active) в кэш не попадает"""
+    if profile is None:
+        return {}
+    return {'id': profile.pk, 'photo': profile.photo.name, 'thumbnail': profile.thumbnail}
+
+
+def _attach_profile(user, values):
+    """Профиль из кэша, как после select_related: user.userprofile не стоит запроса"""
+    relation = UserProfile._meta.get_field('user').remote_field
+    if not values:
+        relation.set_cached_value(user, None)
+        return
+    profile = UserProfile(user=user, **values)
+    profile._state.adding = False
+    profile._state.db = user._state.db
+    relation.set_cached_value(user, profile)
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    ModelBackend, который загружает пользователя сессии вместе с профилем одним запросом
+    и кэширует поля профиля: аватарка в шапке любой страницы не стоит join'а.
+    Сам пользователь читается из БД на каждом запросе, чтобы смена пароля и блокировка действовали сразу.
+    Запись сбрасывается сигналами при сохранении пользователя и профиля
+    """
+
+    def get_user(self, user_id):
+        cache = _cache()
+        key = user_cache_key(user_id)
+        values = cache.get(key)
+        users = get_user_model()._default_manager.filter(pk=user_id)
+        if values is None:
+            user = users.select_related('userprofile').first()
+            if user is None:
+                return None
+            cache.set(key, _profile_values(getattr(user, 'userprofile', None)), settings.USER_CACHE['TIMEOUT'])
+        else:
+            user = users.first()
+            if user is None:
+                return None
+            _attach_profile(user, values)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,12 @@
+def profile(request):
+    """
+    Аватарка пользователя для шапки base.html, профиль уже загружен вместе с пользователем.
+    avatar - адреса уменьшенных копий, photo - исходный файл, пока копии не готовы
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    userprofile = getattr(user, 'userprofile', None)
+    if userprofile is None:
+        return {'photo': None, 'avatar': None}
+    return {'photo': userprofile.photo, 'avatar': userprofile.thumbnail_urls()}
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from registration.models import UserProfile
+from registration.thumbnails import generate_thumbnails, thumbnail_prefix
+
+
+class Command(BaseCommand):
+    help = 'Создает уменьшенные копии аватарок, которых еще нет'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Пересоздать копии всех аватарок')
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        for profile in UserProfile.objects.exclude(photo='').order_by('pk').iterator():
+            if not options['force'] and profile.thumbnail == thumbnail_prefix(profile):
+                continue
+            try:
+                generate_thumbnails(profile)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Профиль {profile.pk}: {e}')
+            else:
+                done += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано аватарок: {done}, с ошибкой: {failed}'))
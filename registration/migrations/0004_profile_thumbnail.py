@@ -0,0 +1,18 @@
+# Generated by Django 3.0.14 on 2026-10-18 14:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0003_userprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='thumbnail',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+    ]
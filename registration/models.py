@@ -1,11 +1,18 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from registration.thumbnails import thumbnail_urls
+
 
 class UserProfile(models.Model):
     """Профиль пользователя"""
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     photo = models.ImageField(upload_to='users/%Y/%m/%d', blank=True)
+    thumbnail = models.CharField(max_length=100, blank=True, editable=False)
 
     def __str__(self):
         return f'Profile of {self.user.username}'
+
+    def thumbnail_urls(self):
+        """Адреса уменьшенных копий аватарки или None, пока они не готовы"""
+        return thumbnail_urls(self.thumbnail) if self.thumbnail else None
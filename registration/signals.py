@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from registration.backends import invalidate_user
+from registration.models import UserProfile
+from registration.thumbnails import schedule_thumbnails, thumbnail_prefix
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=UserProfile)
+def update_thumbnails(sender, instance, raw=False, **kwargs):
+    if not raw and instance.photo and instance.thumbnail != thumbnail_prefix(instance):
+        schedule_thumbnails(instance)
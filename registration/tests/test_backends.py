@@ -0,0 +1,82 @@
+import base64
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from registration.backends import _cache, user_cache_key
+from registration.models import UserProfile
+from registration.tests.test_views import TEST_IMAGE
+
+
+def upload(name='tempfile.png'):
+    return SimpleUploadedFile(
+        content=(base64.b64decode(TEST_IMAGE)),
+        name=name,
+        content_type='image/png',
+    )
+
+
+class ProfileModelBackendTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user', password='test')
+        cls.profile = UserProfile.objects.create(user=cls.user, photo=upload())
+
+    def setUp(self):
+        self.client.login(username='test_user', password='test')
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.get(url)
+        sql = [query['sql'] for query in context.captured_queries]
+        return resp, [query for query in sql if 'auth_user' in query or 'registration_userprofile' in query]
+
+    def test_user_with_profile_single_query(self):
+        resp, queries = self.user_queries(reverse('questions:index'))
+        self.assertEqual(len(queries), 1)
+        self.assertIn('registration_userprofile', queries[0])
+        self.assertEqual(resp.context['photo'], self.profile.photo)
+
+    def test_cached_profile(self):
+        self.client.get(reverse('questions:index'))
+        # индекс в памяти переживает откат транзакций, запрос не должен находить вопросы других тестов
+        resp, queries = self.user_queries(reverse('questions:searchresult') + '?search=nomatch')
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('registration_userprofile', queries[0])
+        self.assertEqual(resp.context['user'], self.user)
+        self.assertEqual(resp.context['photo'].name, self.profile.photo.name)
+
+    def test_cache_without_credentials(self):
+        self.client.get(reverse('questions:index'))
+        self.assertEqual(_cache().get(user_cache_key(self.user.pk)), {
+            'id': self.profile.pk, 'photo': self.profile.photo.name, 'thumbnail': self.profile.thumbnail,
+        })
+
+    def test_password_change_ends_session(self):
+        self.client.get(reverse('questions:index'))
+        # запись мимо сигналов, как из другого процесса
+        User.objects.filter(pk=self.user.pk).update(password=make_password('new'))
+        resp = self.client.get(reverse('questions:index'))
+        self.assertFalse(resp.context['user'].is_authenticated)
+
+    def test_profile_save_invalidates(self):
+        self.client.get(reverse('questions:index'))
+        profile = UserProfile.objects.get(user=self.user)
+        profile.photo = upload('new.png')
+        profile.save()
+        resp, queries = self.user_queries(reverse('questions:index'))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(resp.context['photo'].name, profile.photo.name)
+
+    def test_inactive_user(self):
+        self.client.get(reverse('questions:index'))
+        self.user.is_active = False
+        self.user.save()
+        resp = self.client.get(reverse('questions:index'))
+        self.assertFalse(resp.context['user'].is_authenticated)
@@ -0,0 +1,83 @@
+import base64
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from registration.models import UserProfile
+from registration.tests.test_views import TEST_IMAGE
+from registration.thumbnails import generate_thumbnails, thumbnail_prefix
+
+
+def upload(name='tempfile.png'):
+    return SimpleUploadedFile(
+        content=(base64.b64decode(TEST_IMAGE)),
+        name=name,
+        content_type='image/png',
+    )
+
+
+class ThumbnailsTest(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='test_user', password='test')
+        self.profile = UserProfile.objects.create(user=self.user, photo=upload())
+
+    def test_upload_schedules_thumbnails(self):
+        callbacks = len(connection.run_on_commit)
+        self.profile.photo = upload('new.png')
+        self.profile.save()
+        self.assertEqual(len(connection.run_on_commit), callbacks + 1)
+
+    def test_generate_thumbnails(self):
+        self.assertIsNone(self.profile.thumbnail_urls())
+        self.assertTrue(generate_thumbnails(self.profile))
+        self.profile.refresh_from_db()
+        prefix = thumbnail_prefix(self.profile)
+        self.assertEqual(self.profile.thumbnail, prefix)
+        for size in (75, 150):
+            for ext, image_format in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+                with default_storage.open(f'{prefix}_{size}.{ext}') as f:
+                    image = Image.open(f)
+                    self.assertEqual((image.format, image.size), (image_format, (size, size)))
+        self.assertEqual(self.profile.thumbnail_urls()['webp_2x'], default_storage.url(f'{prefix}_150.webp'))
+
+    def test_stale_photo_not_marked(self):
+        stale = UserProfile.objects.get(pk=self.profile.pk)
+        self.profile.photo = upload('new.png')
+        self.profile.save()
+        self.assertFalse(generate_thumbnails(stale))
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.thumbnail, '')
+
+    def test_backfill_command(self):
+        out = StringIO()
+        call_command('generate_avatars', stdout=out)
+        self.assertIn('Обработано аватарок: 1', out.getvalue())
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.thumbnail, thumbnail_prefix(self.profile))
+        call_command('generate_avatars', stdout=out)
+        self.assertIn('Обработано аватарок: 0', out.getvalue())
+
+    def test_template_uses_thumbnail(self):
+        self.client.login(username='test_user', password='test')
+        resp = self.client.get(reverse('questions:index'))
+        self.assertContains(resp, self.profile.photo.url)
+        generate_thumbnails(self.profile)
+        resp = self.client.get(reverse('questions:index'))
+        prefix = thumbnail_prefix(self.profile)
+        self.assertContains(resp, default_storage.url(f'{prefix}_75.webp'))
+        self.assertContains(resp, default_storage.url(f'{prefix}_150.jpeg'))
@@ -0,0 +1,89 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Аватарка показывается 75x75, вторая копия - для экранов с двойной плотностью
+SIZES = (75, 150)
+FORMATS = (
+    ('webp', 'WEBP'),
+    ('jpeg', 'JPEG'),
+)
+
+_executor = None
+
+
+def thumbnail_prefix(profile):
+    """Имена копий зависят от имени загруженного файла: новая аватарка получает новые адреса"""
+    digest = hashlib.md5(profile.photo.name.encode()).hexdigest()[:12]
+    return f'avatars/{profile.user_id}/{digest}'
+
+
+def thumbnail_urls(prefix):
+    small, large = SIZES
+    urls = {}
+    for ext, _ in FORMATS:
+        urls[ext] = default_storage.url(f'{prefix}_{small}.{ext}')
+        urls[f'{ext}_2x'] = default_storage.url(f'{prefix}_{large}.{ext}')
+    return urls
+
+
+def generate_thumbnails(profile):
+    """
+    Пишет квадратные копии аватарки всех размеров в WebP и JPEG и отмечает их в профиле.
+    Профиль обновляется, только если за это время не загрузили другую аватарку
+    """
+    from registration.backends import invalidate_user
+    from registration.models import UserProfile
+
+    prefix = thumbnail_prefix(profile)
+    with profile.photo.open('rb') as f:
+        image = Image.open(f)
+        image.load()
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    for size in SIZES:
+        variant = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for ext, image_format in FORMATS:
+            buffer = BytesIO()
+            variant.save(buffer, image_format, quality=settings.AVATAR_THUMBNAIL_QUALITY)
+            name = f'{prefix}_{size}.{ext}'
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            default_storage.save(name, ContentFile(buffer.getvalue()))
+    updated = UserProfile.objects.filter(pk=profile.pk, photo=profile.photo.name).update(thumbnail=prefix)
+    if updated:
+        invalidate_user(profile.user_id)
+    return bool(updated)
+
+
+def _generate(profile_id):
+    from registration.models import UserProfile
+    try:
+        profile = UserProfile.objects.filter(pk=profile_id).first()
+        if profile is not None and profile.photo:
+            generate_thumbnails(profile)
+    except Exception:
+        logger.exception('Не удалось подготовить аватарку профиля %s', profile_id)
+    finally:
+        # Соединение с БД принадлежит потоку пула и само не закроется
+        connection.close()
+
+
+def schedule_thumbnails(profile):
+    """
+    Копии готовятся в фоновом потоке после фиксации транзакции, запрос их не ждет.
+    Пока копий нет, страницы показывают исходную аватарку; пропущенные досоздает команда generate_avatars
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='avatar-thumbnails')
+    profile_id = profile.pk
+    transaction.on_commit(lambda: _executor.submit(_generate, profile_id))
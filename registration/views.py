@@ -55,15 +55,10 @@ class EditProfileView(FormView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         data = {}
-        photo_url = None
         if self.request.user.is_authenticated:
             data['login'] = self.request.user.username
             data['email'] = self.request.user.email
-            profile = UserProfile.objects.filter(user=self.request.user)
-            if profile is not None:
-                photo_url = profile[0].photo.url
         context['form'] = UserProfileForm(initial=data)
-        context['photo_url'] = photo_url
         context['trends'] = Questions.get_trends()
         return context
 
@@ -76,7 +71,7 @@ class EditProfileView(FormView):
             renewal = True
         photo = form.cleaned_data['photo']
         if photo:
-            profile = UserProfile.objects.get(user=self.request.user)
+            profile = self.request.user.userprofile
             profile.photo = photo
             profile.save()
             renewal = True
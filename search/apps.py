@@ -0,0 +1,20 @@
+from django.apps import AppConfig, apps
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_migrate
+
+
+def sync_fulltext_schema(sender, using, **kwargs):
+    from search.schema import sync_schema
+    connection = connections[using]
+    if ('search', '0001_fulltext') in MigrationRecorder(connection).applied_migrations():
+        sync_schema(connection)
+
+
+class SearchConfig(AppConfig):
+    name = 'search'
+
+    def ready(self):
+        import search.signals  # noqa: F401
+        # Триггеры висят на таблицах questions, а у приложения search нет моделей и своего post_migrate
+        post_migrate.connect(sync_fulltext_schema, sender=apps.get_app_config('questions'))
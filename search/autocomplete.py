@@ -0,0 +1,67 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from questions.models import Tags
+from search.trie import PrefixTrie
+
+# Версия растет при создании тегов (процессы догружают новые теги по id),
+# поколение - при удалении и переименовании (процессы перестраивают дерево целиком)
+VERSION_KEY = 'search:tags:version'
+GENERATION_KEY = 'search:tags:generation'
+
+
+def _cache():
+    return caches[settings.TAG_AUTOCOMPLETE.get('CACHE', 'default')]
+
+
+class TagAutocomplete:
+    """Префиксное дерево имен тегов процесса, синхронизируемое с БД через версию в общем кэше"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.trie = None
+        self.last_id = 0
+        self.version = None
+        self.generation = None
+
+    def _load(self, queryset):
+        for pk, name in queryset.order_by('pk').values_list('pk', 'name').iterator():
+            self.trie.insert(name)
+            self.last_id = max(self.last_id, pk)
+
+    def sync(self):
+        stamps = _cache().get_many([VERSION_KEY, GENERATION_KEY])
+        version, generation = stamps.get(VERSION_KEY), stamps.get(GENERATION_KEY)
+        with self._lock:
+            if self.trie is None or generation != self.generation:
+                self.trie = PrefixTrie()
+                self.last_id = 0
+                self._load(Tags.objects.all())
+            elif version != self.version:
+                self._load(Tags.objects.filter(pk__gt=self.last_id))
+            self.version, self.generation = version, generation
+
+    def add(self, tag):
+        """Тег, созданный в этом процессе, попадает в дерево сразу, остальные процессы догрузят его сами"""
+        _cache().set(VERSION_KEY, time.time_ns(), None)
+        with self._lock:
+            if self.trie is not None:
+                self.trie.insert(tag.name)
+
+    def reset(self):
+        """После удаления или переименования тега все процессы перестраивают дерево"""
+        _cache().set(GENERATION_KEY, time.time_ns(), None)
+
+    def complete(self, prefix, limit=10):
+        self.sync()
+        return self.trie.complete(Tags.normalize(prefix), limit)
+
+
+_autocomplete = TagAutocomplete()
+
+
+def get_tag_autocomplete():
+    return _autocomplete
@@ -0,0 +1,25 @@
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Поисковый бэкенд из settings.SEARCH_BACKEND, один на процесс"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(settings.SEARCH_BACKEND)()
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    global _backend
+    if setting in ('SEARCH_BACKEND', 'SEARCH_INDEX_PATH'):
+        _backend = None
@@ -0,0 +1,44 @@
+from questions.models import Tags
+from search.fuzzy import question_titles, tag_names
+
+FIELD_WEIGHTS = {
+    'title': 3,
+    'body': 1,
+    'answers': 1,
+}
+
+
+class BaseSearchBackend:
+    """
+    Поиск вопросов по заголовку, тексту и ответам.
+    Индексы на стороне БД обновляются триггерами, поэтому хуки сигналов по умолчанию ничего не делают
+    """
+    # БД, в которой бэкенд держит индекс (connection.vendor); для нее search.schema создает таблицы и триггеры
+    vendor = None
+
+    def search(self, query, limit):
+        """Идентификаторы вопросов по убыванию релевантности"""
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Строит индекс заново и возвращает количество проиндексированных вопросов"""
+        raise NotImplementedError
+
+    def suggest_questions(self, query, limit):
+        """Вопросы с похожими заголовками: запасной вариант, когда поиск ничего не нашел"""
+        return question_titles.search(query, limit)
+
+    def suggest_tags(self, query, limit):
+        """Имена тегов, похожие на query"""
+        ids = tag_names.search(query, limit)
+        names = Tags.objects.in_bulk(ids)
+        return [names[pk].name for pk in ids if pk in names]
+
+    def question_saved(self, question, created):
+        pass
+
+    def question_deleted(self, question_id):
+        pass
+
+    def answers_changed(self, question_id):
+        pass
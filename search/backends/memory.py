@@ -0,0 +1,68 @@
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+from questions.models import Questions, Answers
+from search.backends.base import BaseSearchBackend, FIELD_WEIGHTS
+from search.index import InvertedIndex
+
+
+def question_fields(question, answers):
+    return {
+        'title': question.title,
+        'body': question.body,
+        'answers': '\n'.join(answers),
+    }
+
+
+class MemoryBackend(BaseSearchBackend):
+    """
+    BM25 по инвертированному индексу в памяти процесса, обновляется сигналами моделей.
+    Если снимка на диске еще нет (первый запуск, эфемерная файловая система), первый поиск строит индекс по БД
+    """
+
+    def __init__(self):
+        self.index = InvertedIndex(settings.SEARCH_INDEX_PATH, 'questions', FIELD_WEIGHTS)
+        self._built = False
+        self._build_lock = threading.Lock()
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        with self._build_lock:
+            if not self._built:
+                if not self.index.has_snapshot():
+                    self.rebuild()
+                self._built = True
+
+    def search(self, query, limit):
+        self._ensure_built()
+        return [doc_id for doc_id, _ in self.index.search(query, limit)]
+
+    def rebuild(self):
+        answers = defaultdict(list)
+        for question_id, body in Answers.objects.values_list('question_id', 'body').iterator():
+            answers[question_id].append(body)
+        documents = (
+            (question.pk, question_fields(question, answers.get(question.pk, ())))
+            for question in Questions.objects.only('id', 'title', 'body').iterator()
+        )
+        self.index.load_documents(documents)
+        return len(self.index)
+
+    def index_question(self, question, answers=None):
+        if answers is None:
+            answers = Answers.objects.filter(question_id=question.pk).values_list('body', flat=True)
+        self.index.set_document(question.pk, question_fields(question, answers))
+
+    def question_saved(self, question, created):
+        self.index_question(question, answers=[] if created else None)
+
+    def question_deleted(self, question_id):
+        self.index.remove_document(question_id)
+
+    def answers_changed(self, question_id):
+        question = Questions.objects.filter(pk=question_id).only('id', 'title', 'body').first()
+        if question is not None:
+            self.index_question(question)
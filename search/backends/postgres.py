@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db import connection, transaction, OperationalError
+
+from search.backends.base import BaseSearchBackend, FIELD_WEIGHTS
+from search.schema import fill, install_schema
+from search.tokenizer import words
+
+# Веса ts_rank в порядке D, C, B, A: заголовок - A, текст - B, ответы - C
+RANK_WEIGHTS = [
+    0.1,
+    FIELD_WEIGHTS['answers'] / FIELD_WEIGHTS['title'],
+    FIELD_WEIGHTS['body'] / FIELD_WEIGHTS['title'],
+    1.0,
+]
+
+
+class PostgresBackend(BaseSearchBackend):
+    """
+    Колонка questions_questions.search_vector с GIN-индексом, которую поддерживают
+    триггеры из search.schema. Слова запроса объединяются через OR и ищутся по префиксу основы
+    """
+    vendor = 'postgresql'
+    config = 'russian'
+
+    @staticmethod
+    def tsquery(query):
+        return ' | '.join(f'{word}:*' for word in dict.fromkeys(words(query)))
+
+    def search(self, query, limit):
+        tsquery = self.tsquery(query)
+        if not tsquery:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id FROM questions_questions, to_tsquery(%s, %s) query '
+                'WHERE search_vector @@ query '
+                'ORDER BY ts_rank(%s::real[], search_vector, query) DESC, id DESC LIMIT %s',
+                [self.config, tsquery, RANK_WEIGHTS, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def rebuild(self):
+        install_schema(connection, populate=False)
+        return fill(connection)
+
+    def _trigram_query(self, sql, params):
+        """Запрос по триграммному индексу pg_trgm с порогами из SEARCH_FUZZY и ограничением времени"""
+        options = settings.SEARCH_FUZZY
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                for name, value in (
+                    ('statement_timeout', options['TIMEOUT_MS']),
+                    ('pg_trgm.similarity_threshold', options['SIMILARITY']),
+                    ('pg_trgm.word_similarity_threshold', options['WORD_SIMILARITY']),
+                ):
+                    cursor.execute('SELECT set_config(%s, %s, true)', [name, str(value)])
+                cursor.execute(sql, params)
+                return [row[0] for row in cursor.fetchall()]
+        except OperationalError:
+            return []
+
+    def suggest_questions(self, query, limit):
+        return self._trigram_query(
+            'SELECT id FROM questions_questions WHERE %s <%% title '
+            'ORDER BY word_similarity(%s, title) DESC, id DESC LIMIT %s',
+            [query, query, limit],
+        )
+
+    def suggest_tags(self, query, limit):
+        return self._trigram_query(
+            'SELECT name FROM questions_tags WHERE name %% %s ORDER BY similarity(name, %s) DESC, name LIMIT %s',
+            [query, query, limit],
+        )
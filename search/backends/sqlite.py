@@ -0,0 +1,36 @@
+from django.db import connection
+
+from search.backends.base import BaseSearchBackend, FIELD_WEIGHTS
+from search.schema import fill, install_schema
+from search.tokenizer import tokenize
+
+FTS_TABLE = 'search_questions_fts'
+
+
+class SQLiteBackend(BaseSearchBackend):
+    """
+    Виртуальная таблица FTS5, которую заполняют триггеры из search.schema.
+    FTS5 не знает русской морфологии, поэтому запрос - это основы слов с поиском по префиксу
+    """
+    vendor = 'sqlite'
+
+    @staticmethod
+    def match_expression(query):
+        return ' OR '.join(f'"{term}"*' for term in dict.fromkeys(tokenize(query)))
+
+    def search(self, query, limit):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        weights = ', '.join(str(float(FIELD_WEIGHTS[field])) for field in ('title', 'body', 'answers'))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+                [expression, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def rebuild(self):
+        install_schema(connection, populate=False)
+        return fill(connection)
@@ -0,0 +1,81 @@
+from django.conf import settings
+
+from questions.models import Questions, Tags
+from search.backends import get_backend
+from search.result_cache import cached_ids
+
+
+def search_question_ids(query, limit=None):
+    return get_backend().search(query, limit or settings.SEARCH_MAX_RESULTS)
+
+
+def _search(search):
+    limit = settings.SEARCH_MAX_RESULTS
+    if search[:4].lower() == 'tag:':
+        queryset = Questions.objects.tagged(*Tags.parse_query(search[4:]))
+        return list(queryset.order_by('-vote_count', '-create_date').values_list('pk', flat=True)[:limit])
+    ids = search_question_ids(search, limit)
+    existing = set(Questions.objects.filter(pk__in=ids).values_list('pk', flat=True))
+    return [pk for pk in ids if pk in existing]
+
+
+def search_result_ids(search):
+    """
+    Идентификаторы вопросов по строке поиска: 'tag:python' или 'tag:py*' - по тегу в порядке популярности,
+    иначе - полнотекстовый поиск в порядке релевантности. Не больше SEARCH_MAX_RESULTS
+    """
+    search = search.strip()
+    return cached_ids(search, lambda: _search(search))
+
+
+def _suggest(search):
+    limit = settings.SEARCH_FUZZY['LIMIT']
+    backend = get_backend()
+    if search[:4].lower() == 'tag:':
+        return {'questions': [], 'tags': backend.suggest_tags(Tags.parse_query(search[4:])[0], limit)}
+    return {'questions': backend.suggest_questions(search, limit), 'tags': []}
+
+
+def search_suggestions(search):
+    """
+    Нечеткий поиск по триграммам для запроса без результатов:
+    для тега - похожие имена тегов, для текста - вопросы с похожими заголовками
+    """
+    search = search.strip()
+    return cached_ids(search, lambda: _suggest(search), namespace='suggestions')
+
+
+def rebuild_index():
+    """Строит индекс выбранного бэкенда заново по всем вопросам и ответам"""
+    return get_backend().rebuild()
+
+
+class RankedQuestions:
+    """
+    Результаты поиска в порядке релевантности для Paginator:
+    количество известно сразу, а из БД загружаются только строки текущей страницы
+    """
+
+    def __init__(self, ids, fields=None):
+        self.ids = ids
+        self.fields = fields
+
+    def count(self):
+        return len(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        ids = self.ids[item]
+        if self.fields is not None:
+            rows = {row['id']: row for row in Questions.objects.filter(pk__in=ids).values(*dict.fromkeys(('id', *self.fields)))}
+            return [rows[pk] for pk in ids if pk in rows]
+        questions = Questions.objects.with_author_and_tags().in_bulk(ids)
+        return [questions[pk] for pk in ids if pk in questions]
+
+    def values(self, *fields):
+        """Те же результаты словарями .values() вместо моделей"""
+        return RankedQuestions(self.ids, fields)
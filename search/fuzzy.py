@@ -0,0 +1,115 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from questions.models import Questions, Tags
+from search.trigrams import TrigramIndex
+
+
+def _cache():
+    return caches[settings.SEARCH_FUZZY.get('CACHE', 'default')]
+
+
+class TrigramCatalog:
+    """
+    Триграммный индекс одного текстового поля модели в памяти процесса.
+    Новые записи другие процессы догружают по id, когда меняется версия в общем кэше.
+    Правки и удаления видны сразу только в процессе, где они сделаны: остальные процессы
+    могут предложить устаревший вариант, а удаленные записи отсекаются при загрузке из БД.
+    Большая таблица индексируется в фоновом потоке, пока индекс строится, подсказок нет
+    """
+    inline_build_limit = 20000
+
+    def __init__(self, model, field, word=False):
+        self.model = model
+        self.field = field
+        self.word = word
+        self.version_key = f'search:trigrams:{model._meta.label_lower}:{field}:version'
+        self._lock = threading.Lock()
+        self.index = None
+        self.last_id = 0
+        self.version = None
+        self.building = False
+
+    def _load(self, index, queryset, last_id=0):
+        for pk, text in queryset.order_by('pk').values_list('pk', self.field).iterator():
+            index.add(pk, text)
+            last_id = max(last_id, pk)
+        return last_id
+
+    def _build(self, version):
+        try:
+            index = TrigramIndex()
+            last_id = self._load(index, self.model.objects.all())
+            with self._lock:
+                self.index, self.last_id, self.version = index, last_id, version
+        finally:
+            self.building = False
+
+    def _build_in_background(self, version):
+        try:
+            self._build(version)
+        finally:
+            connection.close()
+
+    def sync(self):
+        version = _cache().get(self.version_key)
+        with self._lock:
+            if self.index is not None:
+                if version != self.version:
+                    queryset = self.model.objects.filter(pk__gt=self.last_id)
+                    self.last_id = self._load(self.index, queryset, self.last_id)
+                    self.version = version
+                return
+            if self.building:
+                return
+            self.building = True
+        if self.model.objects.count() <= self.inline_build_limit:
+            self._build(version)
+        else:
+            threading.Thread(target=self._build_in_background, args=(version,), daemon=True).start()
+
+    def add(self, pk, text):
+        _cache().set(self.version_key, time.time_ns(), None)
+        with self._lock:
+            if self.index is not None:
+                self.index.add(pk, text)
+                self.last_id = max(self.last_id, pk)
+
+    def update(self, pk, text):
+        with self._lock:
+            if self.index is not None:
+                self.index.remove(pk)
+                self.index.add(pk, text)
+
+    def remove(self, pk):
+        with self._lock:
+            if self.index is not None:
+                self.index.remove(pk)
+
+    def clear(self):
+        """Индекс будет построен заново из БД при следующем поиске"""
+        with self._lock:
+            self.index = None
+            self.last_id = 0
+
+    def search(self, query, limit):
+        options = settings.SEARCH_FUZZY
+        self.sync()
+        with self._lock:
+            if self.index is None:
+                return []
+            return self.index.search(
+                query,
+                limit,
+                threshold=options['WORD_SIMILARITY'] if self.word else options['SIMILARITY'],
+                word=self.word,
+                max_scanned=options['MAX_SCANNED'],
+            )
+
+
+question_titles = TrigramCatalog(Questions, 'title', word=True)
+tag_names = TrigramCatalog(Tags, 'name')
@@ -0,0 +1,173 @@
+import json
+import math
+import os
+import threading
+from collections import Counter, defaultdict
+from heapq import nlargest
+
+from search.tokenizer import tokenize
+
+
+class InvertedIndex:
+    """
+    Инвертированный индекс с ранжированием BM25.
+    Документ - набор полей с весами, частота термина в документе суммируется с учетом веса поля.
+    На диске хранится снимок (snapshot) и журнал изменений (journal): каждое изменение
+    дописывается в журнал, а другие процессы догоняют его перед поиском
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, path=None, name='index', field_weights=None):
+        self.field_weights = field_weights or {}
+        self.snapshot_path = os.path.join(path, f'{name}.json') if path else None
+        self.journal_path = os.path.join(path, f'{name}.journal') if path else None
+        if path:
+            os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._snapshot_mtime = None
+        self._journal_offset = 0
+        self._reset()
+
+    def _reset(self):
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.lengths = {}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.documents
+
+    def analyze(self, fields):
+        """Взвешенные частоты терминов документа"""
+        terms = Counter()
+        for name, text in fields.items():
+            weight = self.field_weights.get(name, 1)
+            for token in tokenize(text or ''):
+                terms[token] += weight
+        return dict(terms)
+
+    def _remove(self, doc_id):
+        terms = self.documents.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.lengths.pop(doc_id)
+
+    def _set(self, doc_id, terms):
+        self._remove(doc_id)
+        self.documents[doc_id] = terms
+        for term, frequency in terms.items():
+            self.postings[term][doc_id] = frequency
+        length = sum(terms.values())
+        self.lengths[doc_id] = length
+        self.total_length += length
+
+    def _apply(self, entry):
+        if entry['op'] == 'set':
+            self._set(entry['id'], entry['terms'])
+        else:
+            self._remove(entry['id'])
+
+    def _append(self, entry):
+        if self.journal_path:
+            with open(self.journal_path, 'a', encoding='utf-8') as journal:
+                journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def set_document(self, doc_id, fields):
+        """Добавляет или заменяет документ"""
+        entry = {'op': 'set', 'id': doc_id, 'terms': self.analyze(fields)}
+        with self._lock:
+            self._apply(entry)
+            self._append(entry)
+
+    def remove_document(self, doc_id):
+        entry = {'op': 'remove', 'id': doc_id}
+        with self._lock:
+            self._apply(entry)
+            self._append(entry)
+
+    def load_documents(self, documents):
+        """Заменяет содержимое индекса документами {doc_id: fields} и сохраняет снимок"""
+        with self._lock:
+            self._reset()
+            for doc_id, fields in documents:
+                self._set(doc_id, self.analyze(fields))
+            self.save()
+
+    def save(self):
+        """Пишет снимок индекса и очищает журнал"""
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            tmp_path = f'{self.snapshot_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as snapshot:
+                json.dump(
+                    [[doc_id, terms] for doc_id, terms in self.documents.items()],
+                    snapshot,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, self.snapshot_path)
+            open(self.journal_path, 'w').close()
+            self._snapshot_mtime = os.stat(self.snapshot_path).st_mtime_ns
+            self._journal_offset = 0
+
+    def has_snapshot(self):
+        return bool(self.snapshot_path) and os.path.exists(self.snapshot_path)
+
+    def sync(self):
+        """Подхватывает изменения снимка и журнала, сделанные другими процессами"""
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            try:
+                snapshot_mtime = os.stat(self.snapshot_path).st_mtime_ns
+            except FileNotFoundError:
+                snapshot_mtime = None
+            try:
+                journal_size = os.stat(self.journal_path).st_size
+            except FileNotFoundError:
+                journal_size = 0
+            if snapshot_mtime != self._snapshot_mtime or journal_size < self._journal_offset:
+                self._reset()
+                if snapshot_mtime is not None:
+                    with open(self.snapshot_path, encoding='utf-8') as snapshot:
+                        for doc_id, terms in json.load(snapshot):
+                            self._set(doc_id, terms)
+                self._snapshot_mtime = snapshot_mtime
+                self._journal_offset = 0
+            if journal_size > self._journal_offset:
+                with open(self.journal_path, 'rb') as journal:
+                    journal.seek(self._journal_offset)
+                    data = journal.read(journal_size - self._journal_offset)
+                complete = data[:data.rfind(b'\n') + 1]
+                for line in complete.decode('utf-8').splitlines():
+                    self._apply(json.loads(line))
+                self._journal_offset += len(complete)
+
+    def search(self, query, limit=1000):
+        """Идентификаторы документов и их BM25-оценки по убыванию релевантности"""
+        terms = set(tokenize(query))
+        with self._lock:
+            self.sync()
+            if not terms or not self.documents:
+                return []
+            count = len(self.documents)
+            average_length = self.total_length / count
+            scores = defaultdict(float)
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
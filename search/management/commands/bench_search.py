@@ -0,0 +1,119 @@
+import random
+import statistics
+import time
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from questions.models import Questions
+from search.backends.base import FIELD_WEIGHTS
+from search.backends.postgres import PostgresBackend
+from search.backends.sqlite import SQLiteBackend
+from search.index import InvertedIndex
+from search.schema import install_schema, drop_schema, schema_enabled
+
+SYLLABLES = (
+    'ба', 'ве', 'ги', 'до', 'ку', 'ла', 'ми', 'но', 'пе', 'ро', 'ся', 'ти', 'фу', 'ха', 'це', 'ша',
+    'py', 'dj', 'an', 'go', 're', 'st', 'sql', 'js', 'ex', 'ort',
+)
+DATABASE_BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgresBackend,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость поиска вопросов: подстрочный LIKE, индекс в памяти и полнотекстовый индекс БД. '
+        'Создает синтетические вопросы и удаляет их после замера'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=1000000, help='Количество синтетических вопросов')
+        parser.add_argument('--queries', type=int, default=200, help='Количество поисковых запросов')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = self._vocabulary(rng, 20000)
+        cum_weights = list(accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+        queries = [
+            ' '.join(rng.sample(vocabulary[50:5000], rng.randint(1, 3)))
+            for _ in range(options['queries'])
+        ]
+        limit = settings.SEARCH_MAX_RESULTS
+        backend = DATABASE_BACKENDS.get(connection.vendor)
+        # индекс в БД нужен на время замера, даже если SEARCH_BACKEND его не использует
+        temporary_schema = backend is not None and install_schema(connection) and not schema_enabled(connection)
+        author = User.objects.create(username=f'bench_search_{time.time_ns()}')
+        try:
+            started = time.perf_counter()
+            documents = self._create_questions(author, options['questions'], rng, vocabulary, cum_weights)
+            self.stdout.write(f'Создано вопросов: {options["questions"]} за {time.perf_counter() - started:.1f} c')
+
+            started = time.perf_counter()
+            index = InvertedIndex(field_weights=FIELD_WEIGHTS)
+            index.load_documents(documents)
+            self.stdout.write(f'Индекс в памяти построен за {time.perf_counter() - started:.1f} c')
+
+            runs = [
+                ('LIKE по заголовку', lambda query: list(
+                    Questions.objects.filter(title__contains=query.split()[0]).values_list('pk', flat=True)[:limit]
+                )),
+                ('BM25 в памяти', lambda query: index.search(query, limit)),
+            ]
+            if backend is not None:
+                runs.append((f'{backend.__name__}', lambda query, backend=backend(): backend.search(query, limit)))
+            for name, search in runs:
+                self._measure(name, search, queries)
+        finally:
+            self.stdout.write('Удаление синтетических вопросов...')
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {Questions._meta.db_table} WHERE author_id = %s', [author.pk])
+            author.delete()
+            if temporary_schema:
+                drop_schema(connection)
+
+    @staticmethod
+    def _vocabulary(rng, size):
+        words = set()
+        while len(words) < size:
+            words.add(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+        return sorted(words, key=lambda word: rng.random())
+
+    @staticmethod
+    def _text(rng, vocabulary, cum_weights, count, max_length=None):
+        text = ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=count))
+        return text[:max_length].rsplit(' ', 1)[0] if max_length and len(text) > max_length else text
+
+    def _create_questions(self, author, count, rng, vocabulary, cum_weights, batch_size=5000):
+        for offset in range(0, count, batch_size):
+            Questions.objects.bulk_create(
+                Questions(
+                    title=self._text(rng, vocabulary, cum_weights, 6, max_length=50),
+                    body=self._text(rng, vocabulary, cum_weights, 30),
+                    author=author,
+                )
+                for _ in range(min(batch_size, count - offset))
+            )
+        return (
+            (pk, {'title': title, 'body': body})
+            for pk, title, body in Questions.objects.filter(author=author).values_list('pk', 'title', 'body').iterator()
+        )
+
+    def _measure(self, name, search, queries):
+        timings = []
+        found = 0
+        for query in queries:
+            started = time.perf_counter()
+            found += len(search(query))
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f'{name}: среднее {statistics.mean(timings):.2f} мс, '
+            f'p95 {timings[int(len(timings) * 0.95) - 1]:.2f} мс, '
+            f'найдено в среднем {found / len(queries):.0f}'
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from search.engine import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс вопросов выбранного в SEARCH_BACKEND бэкенда'
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано вопросов: {count}'))
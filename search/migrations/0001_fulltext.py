@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from search.schema import install_schema, drop_schema, schema_enabled
+
+
+def install(apps, schema_editor):
+    if schema_enabled(schema_editor.connection):
+        install_schema(schema_editor.connection)
+
+
+def drop(apps, schema_editor):
+    drop_schema(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0010_unique_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, drop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX questions_title_trgm_idx ON questions_questions USING gin (title gin_trgm_ops)',
+    'CREATE INDEX questions_tags_name_trgm_idx ON questions_tags USING gin (name gin_trgm_ops)',
+)
+
+POSTGRES_BACKWARD = (
+    'DROP INDEX questions_tags_name_trgm_idx',
+    'DROP INDEX questions_title_trgm_idx',
+)
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for statement in statements:
+                schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+    """Триграммные индексы pg_trgm для нечеткого поиска; в остальных БД индекс строится в памяти процесса"""
+
+    dependencies = [
+        ('search', '0001_fulltext'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(POSTGRES_FORWARD), _run(POSTGRES_BACKWARD)),
+    ]
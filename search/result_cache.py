@@ -0,0 +1,54 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from questions.models import Tags
+from search.tokenizer import tokenize
+
+VERSION_KEY = 'search:results:version'
+
+
+def _cache():
+    return caches[settings.SEARCH_CACHE.get('CACHE', 'default')]
+
+
+def search_cache_enabled():
+    return settings.SEARCH_CACHE.get('ENABLED', False)
+
+
+def normalize_query(search):
+    """
+    Ключ запроса: для тегов - нормализованное имя и признак префикса,
+    для текста - отсортированные основы слов без стоп-слов, поэтому 'Миграции Django' и 'django миграция' совпадают
+    """
+    search = search.strip()
+    if search[:4].lower() == 'tag:':
+        name, prefix = Tags.parse_query(search[4:])
+        return f'tag:{name}*' if prefix else f'tag:{name}'
+    return 'text:' + ' '.join(sorted(set(tokenize(search))))
+
+
+def invalidate():
+    """Вопросы, ответы или теги изменились: все сохраненные результаты становятся недостижимыми"""
+    if search_cache_enabled():
+        _cache().set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def cached_ids(search, compute, namespace='results'):
+    """Идентификаторы результатов запроса из кэша или из compute() с сохранением на SEARCH_CACHE['TIMEOUT'] секунд"""
+    if not search_cache_enabled():
+        return compute()
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.set(VERSION_KEY, version, timeout=None)
+    digest = hashlib.md5(normalize_query(search).encode()).hexdigest()
+    key = f'search:{namespace}:{version}:{digest}'
+    ids = cache.get(key)
+    if ids is None:
+        ids = compute()
+        cache.set(key, ids, settings.SEARCH_CACHE.get('TIMEOUT', 300))
+    return ids
@@ -0,0 +1,174 @@
+"""
+Полнотекстовый индекс вопросов на стороне БД: FTS5 в SQLite, колонка tsvector с GIN-индексом в PostgreSQL.
+Схема создается, только если SEARCH_BACKEND ищет в этой БД: иначе триггеры замедляли бы каждую запись впустую.
+SQLite при изменении схемы пересоздает таблицу и теряет ее триггеры,
+поэтому после каждой миграции схема проверяется и при необходимости восстанавливается или удаляется
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+SQLITE_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_questions_fts USING fts5("
+    "title, body, answers, tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS search_questions_ai AFTER INSERT ON questions_questions BEGIN "
+    "INSERT INTO search_questions_fts (rowid, title, body, answers) VALUES (new.id, new.title, new.body, ''); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS search_questions_au AFTER UPDATE OF title, body ON questions_questions BEGIN "
+    "UPDATE search_questions_fts SET title = new.title, body = new.body WHERE rowid = new.id; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS search_questions_ad AFTER DELETE ON questions_questions BEGIN "
+    "DELETE FROM search_questions_fts WHERE rowid = old.id; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS search_answers_ai AFTER INSERT ON questions_answers BEGIN "
+    "UPDATE search_questions_fts SET answers = (SELECT group_concat(body, ' ') FROM questions_answers "
+    "WHERE question_id = new.question_id) WHERE rowid = new.question_id; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS search_answers_au AFTER UPDATE OF body, question_id ON questions_answers BEGIN "
+    "UPDATE search_questions_fts SET answers = coalesce((SELECT group_concat(body, ' ') FROM questions_answers "
+    "WHERE question_id = old.question_id), '') WHERE rowid = old.question_id; "
+    "UPDATE search_questions_fts SET answers = (SELECT group_concat(body, ' ') FROM questions_answers "
+    "WHERE question_id = new.question_id) WHERE rowid = new.question_id; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS search_answers_ad AFTER DELETE ON questions_answers BEGIN "
+    "UPDATE search_questions_fts SET answers = coalesce((SELECT group_concat(body, ' ') FROM questions_answers "
+    "WHERE question_id = old.question_id), '') WHERE rowid = old.question_id; "
+    "END",
+)
+
+SQLITE_DROP = (
+    'DROP TRIGGER IF EXISTS search_answers_ad',
+    'DROP TRIGGER IF EXISTS search_answers_au',
+    'DROP TRIGGER IF EXISTS search_answers_ai',
+    'DROP TRIGGER IF EXISTS search_questions_ad',
+    'DROP TRIGGER IF EXISTS search_questions_au',
+    'DROP TRIGGER IF EXISTS search_questions_ai',
+    'DROP TABLE IF EXISTS search_questions_fts',
+)
+
+POSTGRES_SCHEMA = (
+    'ALTER TABLE questions_questions ADD COLUMN search_vector tsvector',
+    """
+    CREATE FUNCTION questions_search_document(title text, body text, question_id integer) RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('russian', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('russian', coalesce(body, '')), 'B')
+            || setweight(to_tsvector('russian', coalesce(
+                (SELECT string_agg(a.body, ' ') FROM questions_answers a WHERE a.question_id = $3), ''
+            )), 'C')
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE FUNCTION questions_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := questions_search_document(NEW.title, NEW.body, NEW.id);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER questions_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, body ON questions_questions
+    FOR EACH ROW EXECUTE PROCEDURE questions_search_vector_trigger()
+    """,
+    """
+    CREATE FUNCTION answers_search_vector_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE questions_questions SET search_vector = questions_search_document(title, body, id)
+            WHERE id = OLD.question_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            UPDATE questions_questions SET search_vector = questions_search_document(title, body, id)
+            WHERE id = NEW.question_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER answers_search_vector_update
+    AFTER INSERT OR DELETE OR UPDATE OF body, question_id ON questions_answers
+    FOR EACH ROW EXECUTE PROCEDURE answers_search_vector_trigger()
+    """,
+    'CREATE INDEX questions_search_vector_idx ON questions_questions USING gin (search_vector)',
+)
+
+POSTGRES_DROP = (
+    'DROP TRIGGER IF EXISTS answers_search_vector_update ON questions_answers',
+    'DROP FUNCTION IF EXISTS answers_search_vector_trigger()',
+    'DROP TRIGGER IF EXISTS questions_search_vector_update ON questions_questions',
+    'DROP FUNCTION IF EXISTS questions_search_vector_trigger()',
+    'DROP FUNCTION IF EXISTS questions_search_document(text, text, integer)',
+    'ALTER TABLE questions_questions DROP COLUMN IF EXISTS search_vector',
+)
+
+
+SQLITE_FILL = (
+    'DELETE FROM search_questions_fts',
+    "INSERT INTO search_questions_fts (rowid, title, body, answers) "
+    "SELECT q.id, q.title, q.body, (SELECT coalesce(group_concat(a.body, ' '), '') FROM questions_answers a "
+    "WHERE a.question_id = q.id) FROM questions_questions q",
+)
+
+POSTGRES_FILL = (
+    'UPDATE questions_questions SET search_vector = questions_search_document(title, body, id)',
+)
+
+SQLITE_TRIGGERS = {
+    'search_questions_ai', 'search_questions_au', 'search_questions_ad',
+    'search_answers_ai', 'search_answers_au', 'search_answers_ad',
+}
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+        return cursor.rowcount
+
+
+def _installed(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'search_%'")
+            return SQLITE_TRIGGERS <= {row[0] for row in cursor.fetchall()}
+        cursor.execute(
+            'SELECT 1 FROM information_schema.columns '
+            "WHERE table_name = 'questions_questions' AND column_name = 'search_vector'"
+        )
+        return cursor.fetchone() is not None
+
+
+def schema_enabled(connection):
+    """Ищет ли выбранный в SEARCH_BACKEND бэкенд в этой БД"""
+    return import_string(settings.SEARCH_BACKEND).vendor == connection.vendor
+
+
+def install_schema(connection, populate=True):
+    """Создает недостающие таблицы и триггеры и заполняет индекс, если их не было"""
+    if connection.vendor not in ('sqlite', 'postgresql') or _installed(connection):
+        return False
+    if connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_SCHEMA + (SQLITE_FILL if populate else ()))
+    else:
+        _execute(connection, POSTGRES_SCHEMA + (POSTGRES_FILL if populate else ()))
+    return True
+
+
+def drop_schema(connection):
+    if connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_DROP)
+    elif connection.vendor == 'postgresql':
+        _execute(connection, POSTGRES_DROP)
+
+
+def sync_schema(connection):
+    """Создает схему для бэкенда в этой БД и удаляет ее, если выбран другой бэкенд"""
+    if schema_enabled(connection):
+        return install_schema(connection)
+    drop_schema(connection)
+    return False
+
+
+def fill(connection):
+    """Заново заполняет индекс и возвращает количество вопросов"""
+    return _execute(connection, SQLITE_FILL if connection.vendor == 'sqlite' else POSTGRES_FILL)
@@ -0,0 +1,70 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from questions.models import Questions, Answers, Tags
+from search import result_cache
+from search.autocomplete import get_tag_autocomplete
+from search.backends import get_backend
+from search.fuzzy import question_titles, tag_names
+
+
+@receiver(post_save, sender=Questions)
+def index_saved_question(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        get_backend().question_saved(instance, created)
+
+
+@receiver(post_delete, sender=Questions)
+def remove_deleted_question(sender, instance, **kwargs):
+    get_backend().question_deleted(instance.pk)
+
+
+@receiver(post_save, sender=Answers)
+@receiver(post_delete, sender=Answers)
+def reindex_answer_question(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_backend().answers_changed(instance.question_id)
+
+
+@receiver(post_save, sender=Tags)
+def update_tag_autocomplete(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        get_tag_autocomplete().add(instance)
+    else:
+        get_tag_autocomplete().reset()
+
+
+@receiver(post_delete, sender=Tags)
+def reset_tag_autocomplete(sender, instance, **kwargs):
+    get_tag_autocomplete().reset()
+
+
+@receiver(post_save, sender=Questions)
+@receiver(post_delete, sender=Questions)
+@receiver(post_save, sender=Answers)
+@receiver(post_delete, sender=Answers)
+@receiver(post_save, sender=Tags)
+@receiver(post_delete, sender=Tags)
+@receiver(m2m_changed, sender=Questions.tags.through)
+def invalidate_search_results(sender, raw=False, **kwargs):
+    if not raw:
+        result_cache.invalidate()
+
+
+@receiver(post_save, sender=Questions)
+@receiver(post_save, sender=Tags)
+def update_trigrams(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    catalog = question_titles if sender is Questions else tag_names
+    if raw or (update_fields is not None and catalog.field not in update_fields):
+        return
+    text = getattr(instance, catalog.field)
+    if created:
+        catalog.add(instance.pk, text)
+    else:
+        catalog.update(instance.pk, text)
+
+
+@receiver(post_delete, sender=Questions)
+@receiver(post_delete, sender=Tags)
+def remove_trigrams(sender, instance, **kwargs):
+    (question_titles if sender is Questions else tag_names).remove(instance.pk)
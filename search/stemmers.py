@@ -0,0 +1,197 @@
+"""Стеммеры Snowball для русского языка и Портера для английского"""
+import re
+
+RU_VOWELS = 'аеиоуыэюя'
+
+RU_PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+RU_REFLEXIVE = ('ся', 'сь')
+RU_ADJECTIVE = (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом',
+    'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+)
+RU_PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+RU_VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет', 'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен',
+     'ило', 'ыло', 'ено', 'ят', 'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+RU_NOUN = (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и', 'ией', 'ей', 'ой', 'ий', 'й',
+    'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я',
+)
+RU_SUPERLATIVE = ('ейше', 'ейш')
+RU_DERIVATIONAL = ('ость', 'ост')
+
+
+def _longest(word, suffixes):
+    for suffix in sorted(suffixes, key=len, reverse=True):
+        if word.endswith(suffix):
+            return suffix
+    return None
+
+
+def _strip_grouped(rv, groups):
+    """Первая группа окончаний удаляется только после 'а' или 'я', вторая - всегда"""
+    first = _longest(rv, groups[0])
+    if first and not rv[:-len(first)].endswith(('а', 'я')):
+        first = None
+    second = _longest(rv, groups[1])
+    suffix = max(filter(None, (first, second)), key=len, default=None)
+    return (rv[:-len(suffix)], True) if suffix else (rv, False)
+
+
+def _strip(rv, suffixes):
+    suffix = _longest(rv, suffixes)
+    return (rv[:-len(suffix)], True) if suffix else (rv, False)
+
+
+def _region(word):
+    """Часть слова после первой пары 'гласная + согласная'"""
+    for i in range(1, len(word)):
+        if word[i] not in RU_VOWELS and word[i - 1] in RU_VOWELS:
+            return i + 1
+    return len(word)
+
+
+def stem_russian(word):
+    word = word.replace('ё', 'е')
+    start = next((i + 1 for i, char in enumerate(word) if char in RU_VOWELS), len(word))
+    head, rv = word[:start], word[start:]
+    r2 = _region(word)
+    r2 = r2 + _region(word[r2:])
+
+    rv, found = _strip_grouped(rv, RU_PERFECTIVE_GERUND)
+    if not found:
+        rv, _ = _strip(rv, RU_REFLEXIVE)
+        rv, found = _strip(rv, RU_ADJECTIVE)
+        if found:
+            rv, _ = _strip_grouped(rv, RU_PARTICIPLE)
+        else:
+            rv, found = _strip_grouped(rv, RU_VERB)
+            if not found:
+                rv, _ = _strip(rv, RU_NOUN)
+
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    suffix = _longest(rv, RU_DERIVATIONAL)
+    if suffix and len(head) + len(rv) - len(suffix) >= r2:
+        rv = rv[:-len(suffix)]
+
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    else:
+        rv, found = _strip(rv, RU_SUPERLATIVE)
+        if found and rv.endswith('нн'):
+            rv = rv[:-1]
+        elif rv.endswith('ь'):
+            rv = rv[:-1]
+    return head + rv
+
+
+def _is_consonant(word, i):
+    char = word[i]
+    if char in 'aeiou':
+        return False
+    if char == 'y':
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+
+def _measure(stem):
+    """Количество последовательностей 'гласные + согласные' в основе"""
+    forms = ''.join('c' if _is_consonant(stem, i) else 'v' for i in range(len(stem)))
+    return len(re.findall(r'v+c+', forms))
+
+
+def _has_vowel(stem):
+    return any(not _is_consonant(stem, i) for i in range(len(stem)))
+
+
+def _double_consonant(word):
+    return len(word) > 1 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1)
+
+
+def _cvc(word):
+    return (
+        len(word) >= 3
+        and _is_consonant(word, len(word) - 3)
+        and not _is_consonant(word, len(word) - 2)
+        and _is_consonant(word, len(word) - 1)
+        and word[-1] not in 'wxy'
+    )
+
+
+def _replace(word, rules, condition):
+    for suffix, replacement in rules:
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            return stem + replacement if condition(stem) else word
+    return word
+
+
+EN_STEP2 = (
+    ('ational', 'ate'), ('tional', 'tion'), ('enci', 'ence'), ('anci', 'ance'), ('izer', 'ize'),
+    ('abli', 'able'), ('alli', 'al'), ('entli', 'ent'), ('eli', 'e'), ('ousli', 'ous'),
+    ('ization', 'ize'), ('ation', 'ate'), ('ator', 'ate'), ('alism', 'al'), ('iveness', 'ive'),
+    ('fulness', 'ful'), ('ousness', 'ous'), ('aliti', 'al'), ('iviti', 'ive'), ('biliti', 'ble'),
+)
+EN_STEP3 = (
+    ('icate', 'ic'), ('ative', ''), ('alize', 'al'), ('iciti', 'ic'), ('ical', 'ic'), ('ful', ''), ('ness', ''),
+)
+EN_STEP4 = (
+    'al', 'ance', 'ence', 'er', 'ic', 'able', 'ible', 'ant', 'ement', 'ment', 'ent',
+    'ion', 'ou', 'ism', 'ate', 'iti', 'ous', 'ive', 'ize',
+)
+
+
+def stem_english(word):
+    if len(word) <= 2:
+        return word
+
+    if word.endswith('sses') or word.endswith('ies'):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+
+    if word.endswith('eed'):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ('ed', 'ing'):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(('at', 'bl', 'iz')):
+                    word += 'e'
+                elif _double_consonant(word) and word[-1] not in 'lsz':
+                    word = word[:-1]
+                elif _measure(word) == 1 and _cvc(word):
+                    word += 'e'
+                break
+
+    if word.endswith('y') and _has_vowel(word[:-1]):
+        word = word[:-1] + 'i'
+
+    word = _replace(word, sorted(EN_STEP2, key=lambda rule: -len(rule[0])), lambda stem: _measure(stem) > 0)
+    word = _replace(word, sorted(EN_STEP3, key=lambda rule: -len(rule[0])), lambda stem: _measure(stem) > 0)
+
+    for suffix in sorted(EN_STEP4, key=len, reverse=True):
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            if _measure(stem) > 1 and (suffix != 'ion' or stem.endswith(('s', 't'))):
+                word = stem
+            break
+
+    if word.endswith('e'):
+        stem = word[:-1]
+        if _measure(stem) > 1 or (_measure(stem) == 1 and not _cvc(stem)):
+            word = stem
+    if _measure(word) > 1 and _double_consonant(word) and word.endswith('l'):
+        word = word[:-1]
+    return word
@@ -0,0 +1,69 @@
+import base64
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, SimpleTestCase
+from django.urls import reverse
+
+from questions.models import Tags
+from search.autocomplete import get_tag_autocomplete, VERSION_KEY
+from search.trie import PrefixTrie
+
+
+class PrefixTrieTest(SimpleTestCase):
+
+    def test_complete(self):
+        trie = PrefixTrie(['python', 'pytest', 'py', 'java', 'python'])
+        self.assertEqual(len(trie), 4)
+        self.assertEqual(trie.complete('py'), ['py', 'pytest', 'python'])
+        self.assertEqual(trie.complete('py', limit=2), ['py', 'pytest'])
+        self.assertEqual(trie.complete('c'), [])
+
+
+class TagAutocompleteApiTest(TestCase):
+
+    def setUp(self):
+        get_tag_autocomplete().reset()
+        User.objects.create_user(username='test_user', password='test')
+        credentials = base64.b64encode(b'test_user:test').decode()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Basic {credentials}'
+        for name in ('python', 'pytest', 'java'):
+            Tags.objects.create(name=name)
+
+    def complete(self, query):
+        return self.client.get(reverse('api:tagautocomplete') + query).json()['results']
+
+    def test_autocomplete(self):
+        self.assertEqual(self.complete('?q=Py'), ['pytest', 'python'])
+        self.assertEqual(self.complete('?q=py&limit=1'), ['pytest'])
+        self.assertEqual(self.complete('?q='), [])
+
+    def test_new_tag(self):
+        self.complete('?q=py')
+        Tags.objects.create(name='pyramid')
+        self.assertEqual(self.complete('?q=pyr'), ['pyramid'])
+
+    def test_unchanged_tags_are_not_reloaded(self):
+        self.complete('?q=py')
+        with self.assertNumQueries(1):
+            self.complete('?q=py')
+
+    def test_tags_created_by_other_process(self):
+        self.complete('?q=py')
+        Tags.objects.bulk_create([Tags(name='pyramid')])
+        self.assertEqual(self.complete('?q=pyr'), [])
+        cache.set(VERSION_KEY, 'other')
+        self.assertEqual(self.complete('?q=pyr'), ['pyramid'])
+
+    def test_renamed_tag(self):
+        self.complete('?q=py')
+        tag = Tags.objects.get(name='java')
+        tag.name = 'pyjava'
+        tag.save()
+        self.assertEqual(self.complete('?q=j'), [])
+        self.assertEqual(self.complete('?q=pyj'), ['pyjava'])
+
+    def test_requires_authentication(self):
+        del self.client.defaults['HTTP_AUTHORIZATION']
+        resp = self.client.get(reverse('api:tagautocomplete') + '?q=py')
+        self.assertEqual(resp.status_code, 403)
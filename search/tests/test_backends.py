@@ -0,0 +1,135 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+
+from questions.models import Answers
+from search.backends import get_backend
+from search.engine import search_question_ids
+from search.schema import install_schema, sync_schema
+from search.tests.test_views import SearchIndexTestCase
+
+
+class BackendTestMixin:
+    """Одинаковая семантика запросов для всех бэкендов"""
+
+    def test_title_outweighs_body(self):
+        body_match = self.create_question('Вопрос про базы данных', body='использую django orm')
+        title_match = self.create_question('Миграции django')
+        self.create_question('Вопрос про flask')
+        self.assertEqual(search_question_ids('Django'), [title_match.pk, body_match.pk])
+
+    def test_any_word_matches(self):
+        django = self.create_question('Миграции django')
+        flask = self.create_question('Шаблоны flask')
+        self.assertCountEqual(search_question_ids('django flask'), [django.pk, flask.pk])
+
+    def test_morphology(self):
+        question = self.create_question('Как настроить миграции')
+        self.assertEqual(search_question_ids('миграция'), [question.pk])
+
+    def test_updates(self):
+        question = self.create_question('Установка django')
+        answer = Answers.objects.create(
+            body='поставьте virtualenv', author=self.user, question=question, correct=False
+        )
+        self.assertEqual(search_question_ids('virtualenv'), [question.pk])
+        answer.delete()
+        self.assertEqual(search_question_ids('virtualenv'), [])
+        question.title = 'Установка flask'
+        question.save()
+        self.assertEqual(search_question_ids('django'), [])
+        self.assertEqual(search_question_ids('flask'), [question.pk])
+        question.delete()
+        self.assertEqual(search_question_ids('flask'), [])
+
+    def test_rebuild_command(self):
+        question = self.create_question('Установка django')
+        self.clear_index()
+        self.assertEqual(search_question_ids('django'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(search_question_ids('django'), [question.pk])
+
+    def test_stop_words_only(self):
+        self.create_question('Что и как сделать')
+        self.assertEqual(search_question_ids('как и что'), [])
+
+
+@override_settings(SEARCH_BACKEND='search.backends.memory.MemoryBackend')
+class MemoryBackendTest(BackendTestMixin, SearchIndexTestCase):
+
+    def clear_index(self):
+        get_backend().index.load_documents([])
+
+    def test_builds_from_db_without_snapshot(self):
+        with override_settings(SEARCH_BACKEND='search.backends.sqlite.SQLiteBackend'):
+            question = self.create_question('Баланс счета')
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        with override_settings(SEARCH_INDEX_PATH=path):
+            self.assertFalse(get_backend().index.has_snapshot())
+            self.assertEqual(search_question_ids('баланс'), [question.pk])
+            self.assertTrue(get_backend().index.has_snapshot())
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 есть только в SQLite')
+@override_settings(SEARCH_BACKEND='search.backends.sqlite.SQLiteBackend')
+class SQLiteBackendTest(BackendTestMixin, SearchIndexTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # тестовая БД мигрирована с индексом в памяти и схемы поиска в ней нет
+        install_schema(connection)
+
+    def clear_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM search_questions_fts')
+
+    def test_schema_restored_after_table_rebuild(self):
+        question = self.create_question('Установка django')
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER search_questions_ai')
+        other = self.create_question('Настройка django')
+        self.assertTrue(install_schema(connection))
+        self.assertFalse(install_schema(connection))
+        self.assertCountEqual(search_question_ids('django'), [question.pk, other.pk])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 есть только в SQLite')
+class SchemaTest(SearchIndexTestCase):
+    """Триггеры индекса в БД есть, только пока SEARCH_BACKEND ищет в этой БД"""
+
+    def fts_exists(self):
+        return 'search_questions_fts' in connection.introspection.table_names()
+
+    def test_memory_backend_without_schema(self):
+        self.assertFalse(self.fts_exists())
+        with override_settings(SEARCH_BACKEND='search.backends.sqlite.SQLiteBackend'):
+            question = self.create_question('Установка django')
+            self.assertTrue(sync_schema(connection))
+            self.assertEqual(search_question_ids('django'), [question.pk])
+        self.assertFalse(sync_schema(connection))
+        self.assertFalse(self.fts_exists())
+
+    @override_settings(SEARCH_BACKEND='search.backends.sqlite.SQLiteBackend')
+    def test_rebuild_installs_schema(self):
+        question = self.create_question('Установка django')
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(search_question_ids('django'), [question.pk])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'tsvector есть только в PostgreSQL')
+@override_settings(SEARCH_BACKEND='search.backends.postgres.PostgresBackend')
+class PostgresBackendTest(BackendTestMixin, SearchIndexTestCase):
+
+    def setUp(self):
+        super().setUp()
+        install_schema(connection)
+
+    def clear_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE questions_questions SET search_vector = NULL')
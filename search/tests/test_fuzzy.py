@@ -0,0 +1,79 @@
+import base64
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from questions.models import Tags
+from search.fuzzy import question_titles, tag_names
+from search.tests.test_views import SearchIndexTestCase
+from search.trigrams import TrigramIndex, trigrams
+
+
+class TrigramIndexTest(SimpleTestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex()
+        for pk, name in enumerate(('python', 'javascript', 'java', 'django', 'pytest'), 1):
+            self.index.add(pk, name)
+
+    def test_trigrams(self):
+        self.assertEqual(trigrams('Ёж'), {'  е', ' еж', 'еж '})
+
+    def test_similar(self):
+        self.assertEqual(self.index.search('djanga', threshold=0.25), [4])
+        self.assertEqual(self.index.search('jaava', threshold=0.25), [3])
+
+    def test_word_similarity(self):
+        self.index.add(6, 'Как настроить миграции в django')
+        self.assertEqual(self.index.search('миграцыи', threshold=0.5, word=True), [6])
+
+    def test_update_and_remove(self):
+        self.index.remove(4)
+        self.index.add(1, 'djangorest')
+        self.assertEqual(self.index.search('djanga', threshold=0.2), [1])
+        self.assertEqual(self.index.search('python', threshold=0.2), [5])
+
+    def test_frequent_trigrams_skipped(self):
+        self.assertEqual(self.index.search('java', threshold=0.5), [3])
+        self.assertEqual(self.index.search('java', threshold=0.5, max_scanned=1), [])
+
+
+class SuggestionsTest(SearchIndexTestCase):
+
+    def setUp(self):
+        super().setUp()
+        question_titles.clear()
+        tag_names.clear()
+        self.question = self.create_question('Миграции django')
+        self.question.tags.add(Tags.objects.create(name='python'))
+
+    def test_question_suggestions(self):
+        resp = self.client.get(reverse('questions:searchresult') + '?search=djanga')
+        self.assertEqual(len(resp.context['object_list']), 0)
+        self.assertEqual(resp.context['suggested_questions'], [self.question])
+        self.assertContains(resp, 'Возможно, вы имели в виду')
+
+    def test_tag_suggestions(self):
+        resp = self.client.get(reverse('questions:searchresult') + '?search=tag:pyton')
+        self.assertEqual(resp.context['suggested_tags'], ['python'])
+
+    def test_no_suggestions_when_found(self):
+        resp = self.client.get(reverse('questions:searchresult') + '?search=django')
+        self.assertNotIn('suggested_questions', resp.context)
+
+    def test_new_question_suggested(self):
+        self.client.get(reverse('questions:searchresult') + '?search=flsk')
+        question = self.create_question('Шаблоны flask')
+        resp = self.client.get(reverse('questions:searchresult') + '?search=flsk')
+        self.assertEqual(resp.context['suggested_questions'], [question])
+
+    def test_api_suggestions(self):
+        credentials = base64.b64encode(b'test_user:test').decode()
+        resp = self.client.get(
+            reverse('api:searchresult') + '?search=djanga',
+            HTTP_AUTHORIZATION=f'Basic {credentials}',
+        )
+        data = resp.json()
+        self.assertEqual(data['count'], 0)
+        self.assertEqual([item['title'] for item in data['suggestions']], [self.question.title])
+        self.assertEqual(data['tag_suggestions'], [])
@@ -0,0 +1,72 @@
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+
+from search.index import InvertedIndex
+from search.stemmers import stem_russian, stem_english
+from search.tokenizer import tokenize
+
+
+class TokenizerTest(SimpleTestCase):
+
+    def test_stemmers(self):
+        self.assertEqual(stem_russian('вопросы'), stem_russian('вопросов'))
+        self.assertEqual(stem_russian('ёлки'.replace('ё', 'е')), 'елк')
+        self.assertEqual(stem_english('questions'), 'question')
+        self.assertEqual(stem_english('running'), 'run')
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize('Как жить дальше? Вопросы про Python и Django'),
+            ['жит', 'дальш', 'вопрос', 'про', 'python', 'django'],
+        )
+
+
+class InvertedIndexTest(SimpleTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.index = InvertedIndex(self.path, 'test', {'title': 3, 'body': 1})
+
+    def ids(self, query):
+        return [doc_id for doc_id, _ in self.index.search(query)]
+
+    def test_title_outweighs_body(self):
+        self.index.set_document(1, {'title': 'про базы данных', 'body': 'вопрос про django'})
+        self.index.set_document(2, {'title': 'вопрос про django', 'body': 'про базы данных'})
+        self.assertEqual(self.ids('django'), [2, 1])
+
+    def test_rare_term_outweighs_common(self):
+        self.index.set_document(1, {'title': 'python django'})
+        self.index.set_document(2, {'title': 'python flask'})
+        self.index.set_document(3, {'title': 'python'})
+        self.assertEqual(self.ids('python flask')[0], 2)
+
+    def test_replace_and_remove(self):
+        self.index.set_document(1, {'title': 'python'})
+        self.index.set_document(1, {'title': 'django'})
+        self.assertEqual(self.ids('python'), [])
+        self.assertEqual(self.ids('django'), [1])
+        self.index.remove_document(1)
+        self.assertEqual(self.ids('django'), [])
+        self.assertEqual(self.index.total_length, 0)
+
+    def test_other_process_replays_journal(self):
+        self.index.set_document(1, {'title': 'python'})
+        self.index.save()
+        self.index.set_document(2, {'title': 'python django'})
+        self.index.remove_document(1)
+        other = InvertedIndex(self.path, 'test')
+        self.assertEqual([doc_id for doc_id, _ in other.search('python')], [2])
+        self.index.set_document(3, {'title': 'python'})
+        self.assertEqual(sorted(doc_id for doc_id, _ in other.search('python')), [2, 3])
+
+    def test_other_process_reloads_snapshot(self):
+        other = InvertedIndex(self.path, 'test')
+        self.index.set_document(1, {'title': 'python'})
+        self.assertEqual(len(other.search('python')), 1)
+        self.index.load_documents([(2, {'title': 'django'})])
+        self.assertEqual(other.search('python'), [])
+        self.assertEqual(len(other.search('django')), 1)
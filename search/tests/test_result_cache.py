@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from questions.models import Tags
+from search.engine import search_result_ids
+from search.result_cache import normalize_query
+from search.tests.test_views import SearchIndexTestCase
+
+
+class NormalizeQueryTest(SimpleTestCase):
+
+    def test_text(self):
+        self.assertEqual(normalize_query(' Миграции Django '), normalize_query('django и миграция'))
+
+    def test_tag(self):
+        self.assertEqual(normalize_query('TAG: Python '), 'tag:python')
+        self.assertEqual(normalize_query('tag:Py*'), 'tag:py*')
+        self.assertNotEqual(normalize_query('tag:python'), normalize_query('python'))
+
+
+@override_settings(SEARCH_CACHE={'ENABLED': True, 'CACHE': 'default', 'TIMEOUT': 60})
+class SearchResultCacheTest(SearchIndexTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.question = self.create_question('Миграции django')
+
+    def test_repeated_search_without_queries(self):
+        self.assertEqual(search_result_ids('django'), [self.question.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(search_result_ids('Django '), [self.question.pk])
+
+    def test_new_question_invalidates(self):
+        search_result_ids('django')
+        other = self.create_question('Установка django')
+        self.assertCountEqual(search_result_ids('django'), [self.question.pk, other.pk])
+
+    def test_tagging_invalidates(self):
+        self.assertEqual(search_result_ids('tag:python'), [])
+        self.question.tags.add(Tags.objects.create(name='python'))
+        self.assertEqual(search_result_ids('tag:Python'), [self.question.pk])
@@ -0,0 +1,58 @@
+import base64
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from questions.models import Questions
+from questions.tests.test_views import TEST_IMAGE
+from registration.models import UserProfile
+
+
+class SearchIndexTestCase(TestCase):
+    """Свой каталог индекса на каждый тест: откат транзакции не откатывает индекс"""
+
+    def setUp(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        settings_override = override_settings(SEARCH_INDEX_PATH=path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='test_user', password='test')
+        photo = SimpleUploadedFile(
+            content=(base64.b64decode(TEST_IMAGE)),
+            name='tempfile.png',
+            content_type='image/png',
+        )
+        UserProfile.objects.create(user=self.user, photo=photo)
+
+    def create_question(self, title, body='текст вопроса'):
+        return Questions.objects.create(title=title, body=body, author=self.user)
+
+
+class SearchViewTest(SearchIndexTestCase):
+
+    def test_results_are_ranked(self):
+        body_match = self.create_question('Вопрос про базы данных', body='использую django orm')
+        title_match = self.create_question('Миграции django')
+        self.create_question('Вопрос про flask')
+        Questions.objects.filter(pk=body_match.pk).update(vote_count=10)
+        resp = self.client.get(reverse('questions:searchresult') + '?search=Django')
+        self.assertEqual(list(resp.context['object_list']), [title_match, body_match])
+
+    def test_morphology(self):
+        question = self.create_question('Как настроить миграции')
+        resp = self.client.get(reverse('questions:searchresult') + '?search=миграция')
+        self.assertEqual(list(resp.context['object_list']), [question])
+
+    def test_api_search(self):
+        question = self.create_question('Миграции django')
+        credentials = base64.b64encode(b'test_user:test').decode()
+        resp = self.client.get(
+            reverse('api:searchresult') + '?search=django',
+            HTTP_AUTHORIZATION=f'Basic {credentials}',
+        )
+        self.assertEqual([item['title'] for item in resp.json()['results']], [question.title])
@@ -0,0 +1,37 @@
+import re
+from functools import lru_cache
+
+from search.stemmers import stem_russian, stem_english
+
+WORD_RE = re.compile(r'[0-9a-zа-яё]+')
+CYRILLIC_RE = re.compile(r'[а-яё]')
+
+STOP_WORDS = frozenset((
+    'и', 'в', 'во', 'не', 'что', 'он', 'на', 'я', 'с', 'со', 'как', 'а', 'то', 'все', 'она', 'так', 'его',
+    'но', 'да', 'ты', 'к', 'у', 'же', 'вы', 'за', 'бы', 'по', 'ее', 'мне', 'было', 'вот', 'от', 'меня',
+    'о', 'из', 'ему', 'ли', 'если', 'уже', 'или', 'ни', 'быть', 'был', 'до', 'вас', 'нибудь', 'опять',
+    'уж', 'вам', 'ведь', 'там', 'потом', 'себя', 'ничего', 'ей', 'может', 'они', 'тут', 'где', 'есть',
+    'надо', 'ней', 'для', 'мы', 'тебя', 'их', 'чем', 'была', 'сам', 'чтоб', 'без', 'будто', 'чего',
+    'раз', 'тоже', 'себе', 'под', 'будет', 'ж', 'тогда', 'кто', 'этот', 'того', 'потому', 'этого',
+    'какой', 'ним', 'здесь', 'этом', 'один', 'почти', 'мой', 'тем', 'чтобы', 'нее', 'были',
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'if', 'in', 'into', 'is', 'it', 'no',
+    'not', 'of', 'on', 'or', 'such', 'that', 'the', 'their', 'then', 'there', 'these', 'they', 'this',
+    'to', 'was', 'will', 'with', 'how', 'what', 'why', 'do', 'does', 'i', 'my', 'can',
+))
+
+
+@lru_cache(maxsize=100000)
+def stem(word):
+    if CYRILLIC_RE.search(word):
+        return stem_russian(word)
+    return stem_english(word)
+
+
+def words(text):
+    """Слова текста в нижнем регистре без стоп-слов"""
+    return [word for word in WORD_RE.findall(text.lower().replace('ё', 'е')) if word not in STOP_WORDS]
+
+
+def tokenize(text):
+    """Список основ слов текста без стоп-слов"""
+    return [stem(word) for word in words(text)]
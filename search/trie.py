@@ -0,0 +1,46 @@
+class PrefixTrie:
+    """Префиксное дерево строк для автодополнения"""
+
+    def __init__(self, words=()):
+        self.root = {}
+        self.size = 0
+        for word in words:
+            self.insert(word)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, word):
+        node = self._find(word)
+        return node is not None and None in node
+
+    def _find(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def insert(self, word):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        if None not in node:
+            node[None] = True
+            self.size += 1
+
+    def complete(self, prefix, limit=10):
+        """До limit слов с префиксом prefix в алфавитном порядке"""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        words = []
+        stack = [(prefix, node)]
+        while stack and len(words) < limit:
+            word, node = stack.pop()
+            if None in node:
+                words.append(word)
+            chars = sorted((char for char in node if char is not None), reverse=True)
+            stack.extend((word + char, node[char]) for char in chars)
+        return words
@@ -0,0 +1,76 @@
+from array import array
+from collections import Counter
+from heapq import nlargest
+
+from search.tokenizer import WORD_RE
+
+
+def trigrams(text):
+    """Триграммы слов текста, как в pg_trgm: слово дополняется двумя пробелами слева и одним справа"""
+    grams = set()
+    for word in WORD_RE.findall(text.lower().replace('ё', 'е')):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Компактный индекс триграмм: списки позиций хранятся в array('I').
+    Документ при изменении получает новую позицию, старая считается удаленной,
+    поэтому обновление не требует перестройки списков
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.slot_docs = array('I')
+        self.slot_sizes = array('H')
+        self.doc_slots = {}
+
+    def __len__(self):
+        return len(self.doc_slots)
+
+    def add(self, doc_id, text):
+        grams = trigrams(text)
+        slot = len(self.slot_docs)
+        self.slot_docs.append(doc_id)
+        self.slot_sizes.append(min(len(grams), 0xffff))
+        self.doc_slots[doc_id] = slot
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array('I')
+            posting.append(slot)
+
+    def remove(self, doc_id):
+        self.doc_slots.pop(doc_id, None)
+
+    def search(self, query, limit=10, threshold=0.3, word=False, max_scanned=200000):
+        """
+        Документы, похожие на query, по убыванию сходства.
+        word=True - доля триграмм запроса, найденных в документе (подстрока с опечаткой),
+        иначе - коэффициент Жаккара по триграммам целиком (как similarity в pg_trgm).
+        Самые частые триграммы пропускаются, если просмотр превысил бы max_scanned позиций
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        counts = Counter()
+        scanned = 0
+        for posting in sorted((self.postings.get(gram, ()) for gram in grams), key=len):
+            if scanned + len(posting) > max_scanned:
+                break
+            counts.update(posting)
+            scanned += len(posting)
+        scores = []
+        for slot, common in counts.items():
+            doc_id = self.slot_docs[slot]
+            if self.doc_slots.get(doc_id) != slot:
+                continue
+            if word:
+                score = common / len(grams)
+            else:
+                score = common / (len(grams) + self.slot_sizes[slot] - common)
+            if score >= threshold:
+                scores.append((score, doc_id))
+        return [doc_id for _, doc_id in nlargest(limit, scores)]